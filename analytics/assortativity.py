@@ -0,0 +1,124 @@
+"""Degree correlations: assortativity, k_nn(k) and the joint degree matrix.
+
+The directed coefficient ``r(x, y)`` is the Pearson correlation, over all
+edges ``u -> v``, between the ``x``-degree of the voter ``u`` and the
+``y``-degree of the candidate ``v`` (``x, y`` in ``"out"``/``"in"``), as in
+``nx.degree_assortativity_coefficient``.  ``r(out, in)`` asks whether
+active voters vote for popular candidates.
+
+``degree_correlations`` makes one pass over the edge blocks.  Each block
+gathers the out- and in-degree of both endpoints by fancy indexing and
+feeds, for all four ``(x, y)`` pairs at once:
+
+* five running sums for the Pearson coefficient;
+* ``np.bincount`` of the target's ``y``-degree keyed by the source's
+  ``x``-degree, giving the average neighbour degree ``k_nn(k)`` (averaged
+  over edges; for ``x = "out"`` this is ``nx.average_degree_connectivity``,
+  which walks predecessors instead when the source degree is ``"in"``);
+* a joint degree matrix over logarithmic bins ``0, 1, 2-3, 4-7, ...``
+  counting edges by the binned degrees of their two ends.
+"""
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from analytics.graph import BLOCK_NNZ
+
+DEGREE_KINDS = ("out", "in")
+
+
+def _degree(graph, kind):
+    if kind == "out":
+        return graph.out_degree
+    if kind == "in":
+        return graph.in_degree
+    raise ValueError(f"degree kind must be 'out' or 'in', got {kind!r}")
+
+
+def _kind(kind):
+    if kind not in DEGREE_KINDS:
+        raise ValueError(f"degree kind must be 'out' or 'in', got {kind!r}")
+    return DEGREE_KINDS.index(kind)
+
+
+def _pearson(sums, m):
+    sa, sb, saa, sbb, sab = sums / m
+    denom = np.sqrt(max(saa - sa * sa, 0) * max(sbb - sb * sb, 0))
+    return float((sab - sa * sb) / denom) if denom > 0 else 0.0
+
+
+def degree_assortativity(graph, x="out", y="in", block_nnz=BLOCK_NNZ):
+    """``r(x, y)``: Pearson correlation of ``x``-degree(source) and ``y``-degree(target)."""
+    dx = _degree(graph, x).astype(np.float64)
+    dy = _degree(graph, y).astype(np.float64)
+    sums = np.zeros(5)
+    for src, dst in graph.iter_edge_blocks(block_nnz):
+        a, b = dx[src], dy[dst]
+        sums += (a.sum(), b.sum(), (a * a).sum(), (b * b).sum(), (a * b).sum())
+    return _pearson(sums, graph.n_edges) if graph.n_edges else 0.0
+
+
+def log_bin(degree):
+    """Bin ``0`` for degree 0, else ``floor(log2(d)) + 1`` (1, 2-3, 4-7, ...)."""
+    degree = np.asarray(degree)
+    return np.where(degree > 0, np.floor(np.log2(np.maximum(degree, 1))).astype(np.int64) + 1, 0)
+
+
+def bin_labels(n_bins):
+    labels = ["0", "1"] + [f"{1 << (b - 1)}-{(1 << b) - 1}" for b in range(2, n_bins)]
+    return labels[:n_bins]
+
+
+@dataclass(eq=False)
+class DegreeCorrelations:
+    r: np.ndarray            # 2 x 2, r[x, y] indexed like DEGREE_KINDS
+    knn_sum: np.ndarray      # 2 x 2 x (K + 1): summed y-degree of targets, by x-degree of source
+    knn_count: np.ndarray    # 2 x (K + 1): edges by x-degree of source
+    jdm: np.ndarray          # 2 x 2 x B x B: edges by log bin of (x-degree source, y-degree target)
+
+    def coefficient(self, x="out", y="in"):
+        return float(self.r[_kind(x), _kind(y)])
+
+    def knn(self, x="out", y="in"):
+        """``(k, k_nn)`` over the ``x``-degrees ``k`` that occur on some edge source."""
+        count = self.knn_count[_kind(x)]
+        k = np.flatnonzero(count)
+        return k, self.knn_sum[_kind(x), _kind(y)][k] / count[k]
+
+    def joint_degree_matrix(self, x="out", y="in"):
+        """``(labels, matrix)``: edges by binned source ``x``-degree (rows) and target ``y``-degree."""
+        return bin_labels(self.jdm.shape[-1]), self.jdm[_kind(x), _kind(y)]
+
+    def to_arrays(self):
+        return {f.name: np.asarray(getattr(self, f.name)) for f in fields(self)}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(**{f.name: arrays[f.name] for f in fields(cls)})
+
+
+def degree_correlations(graph, block_nnz=BLOCK_NNZ):
+    """``DegreeCorrelations`` of all four ``(x, y)`` pairs in one pass over the edges."""
+    degree = np.stack([graph.out_degree, graph.in_degree]).astype(np.int64)   # indexed like DEGREE_KINDS
+    k_max = int(degree.max()) if degree.size else 0
+    binned = log_bin(degree)
+    n_bins = int(binned.max()) + 1 if binned.size else 1
+    sums = np.zeros((2, 2, 5))
+    knn_sum = np.zeros((2, 2, k_max + 1))
+    knn_count = np.zeros((2, k_max + 1), dtype=np.int64)
+    jdm = np.zeros((2, 2, n_bins * n_bins), dtype=np.int64)
+    for src, dst in graph.iter_edge_blocks(block_nnz):
+        a, b = degree[:, src], degree[:, dst]            # 2 x block: out/in degree of each end
+        af, bf = a.astype(np.float64), b.astype(np.float64)
+        ba, bb = binned[:, src], binned[:, dst]
+        for x in range(2):
+            knn_count[x] += np.bincount(a[x], minlength=k_max + 1)
+            for y in range(2):
+                sums[x, y] += (af[x].sum(), bf[y].sum(), (af[x] ** 2).sum(), (bf[y] ** 2).sum(),
+                               (af[x] * bf[y]).sum())
+                knn_sum[x, y] += np.bincount(a[x], weights=bf[y], minlength=k_max + 1)
+                jdm[x, y] += np.bincount(ba[x] * n_bins + bb[y], minlength=n_bins * n_bins)
+    m = graph.n_edges
+    r = np.array([[_pearson(sums[x, y], m) if m else 0.0 for y in range(2)] for x in range(2)])
+    return DegreeCorrelations(r=r, knn_sum=knn_sum, knn_count=knn_count,
+                              jdm=jdm.reshape(2, 2, n_bins, n_bins))
@@ -0,0 +1,59 @@
+"""Level-synchronous breadth-first search over a ``CompactGraph``.
+
+Each level expands the whole frontier with one vectorized gather, so a
+search costs ``O(m)`` array work plus one Python step per level.
+"""
+import numpy as np
+
+
+def bfs_levels(graph, source, max_depth=None):
+    """Yield ``(depth, nodes)`` level by level, starting with ``(0, [source])``."""
+    seen = np.zeros(graph.n_nodes, dtype=bool)
+    frontier = np.array([source], dtype=np.int64)
+    seen[source] = True
+    depth = 0
+    while len(frontier):
+        yield depth, frontier
+        if max_depth is not None and depth >= max_depth:
+            return
+        nbrs, _ = graph.gather(frontier)
+        nbrs = np.unique(nbrs[~seen[nbrs]])
+        seen[nbrs] = True
+        frontier = nbrs.astype(np.int64)
+        depth += 1
+
+
+def bfs_distances(graph, source, dtype=np.int32):
+    """Hop distances from ``source`` to every node (-1 where unreachable)."""
+    dist = np.full(graph.n_nodes, -1, dtype=dtype)
+    for depth, level in bfs_levels(graph, source):
+        dist[level] = depth
+    return dist
+
+
+def bidirectional_distance(graph, source, target, reverse=None):
+    """Hop distance ``source -> target`` (-1 if unreachable), searching from both ends.
+
+    The smaller frontier is expanded each step (forward over ``graph``,
+    backward over ``reverse``, default ``graph.reverse``; pass ``graph``
+    itself for a symmetric graph).  The first node reached by both sides
+    closes a shortest path: no earlier level touched the other side's
+    visited set, so the distance is exactly the sum of the two depths.
+    """
+    if source == target:
+        return 0
+    reverse = graph.reverse if reverse is None else reverse
+    seen = [np.zeros(graph.n_nodes, dtype=bool), np.zeros(graph.n_nodes, dtype=bool)]
+    frontier = [np.array([source], dtype=np.int64), np.array([target], dtype=np.int64)]
+    seen[0][source] = seen[1][target] = True
+    depth = 0
+    while len(frontier[0]) and len(frontier[1]):
+        side = 0 if len(frontier[0]) <= len(frontier[1]) else 1
+        nbrs, _ = (graph if side == 0 else reverse).gather(frontier[side])
+        nbrs = np.unique(nbrs[~seen[side][nbrs]])
+        depth += 1
+        if seen[1 - side][nbrs].any():
+            return depth
+        seen[side][nbrs] = True
+        frontier[side] = nbrs.astype(np.int64)
+    return -1
@@ -0,0 +1,106 @@
+"""Thread-safe bounded LRU cache shared by the dashboard sessions."""
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Least-recently-used mapping bounded by entry count and/or bytes.
+
+    Streamlit serves every session from the same process, so one instance
+    (held with ``st.cache_resource``) is shared by all of them; the lock
+    keeps concurrent reruns from corrupting the ordering.  With
+    ``max_bytes`` set, ``sizeof(value)`` is charged per entry and cold
+    entries are evicted until the total fits (the newest entry is always
+    kept, even if it alone exceeds the budget).  ``get_or_compute`` holds a
+    per-key lock while computing, so concurrent misses on the same key wait
+    for the first result instead of computing it again.
+    """
+
+    def __init__(self, maxsize=256, max_bytes=None, sizeof=None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self._computing = {}
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self.nbytes -= self._sizes.pop(key)
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._sizes[key] = size
+            self.nbytes += size
+            while len(self._data) > 1 and (
+                    len(self._data) > self.maxsize
+                    or (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+                old, _ = self._data.popitem(last=False)
+                self.nbytes -= self._sizes.pop(old)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        """Remove ``key`` and return its value (``default`` if absent)."""
+        with self._lock:
+            if key not in self._data:
+                return default
+            self.nbytes -= self._sizes.pop(key)
+            return self._data.pop(key)
+
+    def get_or_compute(self, key, func):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            computing = self._computing.setdefault(key, threading.Lock())
+        with computing:
+            with self._lock:
+                value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                try:
+                    value = func()
+                    self.put(key, value)
+                finally:
+                    with self._lock:
+                        self._computing.pop(key, None)
+        return value
+
+    def keys(self):
+        with self._lock:
+            return list(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.hits = self.misses = self.evictions = self.nbytes = 0
+
+    def stats(self):
+        return {"entries": len(self._data), "maxsize": self.maxsize,
+                "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "bytes": self.nbytes,
+                "max_bytes": self.max_bytes}
+
+
+_MISSING = object()
@@ -0,0 +1,41 @@
+"""Global centralities computed by power iteration on ``SparseOperator``."""
+import numpy as np
+
+from analytics.spmv import SparseOperator, power_iteration
+
+
+def pagerank(graph, alpha=0.85, tol=1e-6, max_iter=100, operator=None):
+    """PageRank as an array over compact nodes (same model as ``nx.pagerank``)."""
+    op = operator or SparseOperator(graph)
+    n = graph.n_nodes
+    out_deg = graph.out_degree.astype(float)
+    inv_deg = np.divide(1.0, out_deg, out=np.zeros(n), where=out_deg > 0)
+    dangling = out_deg == 0
+
+    def step(x):
+        return alpha * (op.rmatvec(x * inv_deg) + x[dangling].sum() / n) + (1 - alpha) / n
+
+    x, _ = power_iteration(step, np.full(n, 1.0 / n), tol=tol, max_iter=max_iter)
+    return x
+
+
+def hits(graph, tol=1e-8, max_iter=100, operator=None):
+    """HITS ``(hubs, authorities)`` arrays, each normalised to sum to 1.
+
+    A good hub votes for good authorities (``h = A a``) and a good
+    authority is voted for by good hubs (``a = A.T h``).  The hub vector is
+    iterated; authorities are read off the converged hubs.
+    """
+    op = operator or SparseOperator(graph)
+    n = graph.n_nodes
+
+    def step(h):
+        h = op.matvec(op.rmatvec(h))
+        total = h.sum()
+        return h / total if total > 0 else h
+
+    h, _ = power_iteration(step, np.full(n, 1.0 / n), tol=tol, max_iter=max_iter)
+    a = op.rmatvec(h)
+    if a.sum() > 0:
+        a /= a.sum()
+    return h, a
@@ -0,0 +1,194 @@
+"""Registry of edge-list datasets with per-dataset caches.
+
+A dataset is described by a JSON file in the registry directory::
+
+    {"name": "Wikipedia Admin Elections",
+     "path": "../Wiki-Vote.txt",
+     "description": "Who-votes-for-whom in Wikipedia admin elections"}
+
+``path`` is relative to the JSON file.  Add ``"signed": true`` when the
+third column holds vote signs (-1, 0 or 1); otherwise only the first two
+columns are read.  Edge lists (``*.txt``) dropped into
+the directory without a JSON file are registered under their file name, and
+``register`` adds any other edge list for the lifetime of the registry.
+
+For each dataset the registry keeps, under ``<directory>/.cache/<key>/``,
+the compact CSR graph (built out-of-core by ``analytics.ingest``, with
+``signs.npy`` for signed datasets) and its
+``GraphSummary`` (``summary.json`` / ``summary.npz``, see
+``analytics.summary``), plus any derived arrays stored with ``artifact``
+(embeddings, ...).  All of it is rebuilt when the source file's size or
+modification time changes, or when ``BUNDLE_VERSION`` is bumped.  Loaded graphs are held in an LRU cache
+bounded by ``memory_budget`` bytes, so switching back to a warm dataset is
+instant and cold datasets are evicted first.  Cache entries are keyed by
+the source fingerprint too, and dropped before a stale bundle is deleted,
+so an edited edge list is reloaded rather than served from memory.
+
+A loaded dataset is the memory-mapped ``CompactGraph`` of its bundle, charged
+to the budget at ``CompactGraph.nbytes``; the edge list is never read into
+NetworkX.  Code that needs NetworkX builds it from the compact graph, either
+for a few nodes (``CompactGraph.subgraph``) or, for algorithms only NetworkX
+offers, for the whole graph (``CompactGraph.to_networkx``).
+"""
+import glob
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from analytics.cache import LRUCache
+from analytics.graph import CompactGraph
+from analytics.ingest import build_csr
+from analytics.summary import GraphSummary, summarize
+
+DEFAULT_MEMORY_BUDGET = int(os.environ.get("WIKIVOTE_MEMORY_BUDGET_MB", "2048")) << 20
+
+# Bump when the bundle layout changes so existing caches are rebuilt
+BUNDLE_VERSION = 4
+
+
+@dataclass
+class Dataset:
+    key: str
+    name: str
+    path: str
+    description: str = ""
+    signed: bool = False
+
+    @property
+    def fingerprint(self):
+        """Changes whenever the source file (or how it is read) changes."""
+        st = os.stat(self.path)
+        raw = f"{os.path.abspath(self.path)}:{st.st_size}:{int(st.st_mtime)}"
+        if self.signed:
+            raw += ":signed"
+        return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+@dataclass(eq=False)
+class LoadedDataset:
+    dataset: Dataset
+    compact: CompactGraph
+    summary: GraphSummary
+
+    @property
+    def nbytes(self):
+        return self.compact.nbytes
+
+
+class DatasetRegistry:
+    def __init__(self, directory, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.directory = directory
+        self.cache_dir = os.path.join(directory, ".cache")
+        self.datasets = self._discover()
+        self.loaded = LRUCache(maxsize=len(self.datasets) or 1, max_bytes=memory_budget,
+                               sizeof=lambda d: d.nbytes)
+        self._lock = threading.Lock()
+        self._artifact_locks = {}
+
+    def _discover(self):
+        found = {}
+        described = set()
+        for meta_path in sorted(glob.glob(os.path.join(self.directory, "*.json"))):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            key = os.path.splitext(os.path.basename(meta_path))[0]
+            path = os.path.normpath(os.path.join(self.directory, meta["path"]))
+            described.add(os.path.abspath(path))
+            found[key] = Dataset(key=key, name=meta.get("name", key), path=path,
+                                 description=meta.get("description", ""),
+                                 signed=bool(meta.get("signed", False)))
+        for path in sorted(glob.glob(os.path.join(self.directory, "*.txt"))):
+            if os.path.abspath(path) not in described:
+                key = os.path.splitext(os.path.basename(path))[0]
+                found.setdefault(key, Dataset(key=key, name=key, path=path))
+        return found
+
+    def keys(self):
+        return list(self.datasets)
+
+    def __getitem__(self, key):
+        return self.datasets[key]
+
+    def register(self, path, key=None, name=None, description="", signed=False):
+        """Add the edge list at ``path`` (key defaults to its file name) and return its key.
+
+        With ``signed`` its third column is read as vote signs.
+        """
+        if not os.path.isfile(path):
+            raise FileNotFoundError(path)
+        key = key or os.path.splitext(os.path.basename(path))[0]
+        with self._lock:
+            known = self.datasets.get(key)
+            if known is not None and os.path.abspath(known.path) != os.path.abspath(path):
+                raise ValueError(f"dataset key {key!r} is already used by {known.path}")
+            self.datasets[key] = Dataset(key=key, name=name or key, path=os.path.normpath(path),
+                                         description=description, signed=signed)
+            self.loaded.maxsize = max(self.loaded.maxsize, len(self.datasets))
+        return key
+
+    def _bundle_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def _ensure_bundle(self, key):
+        """Build (or rebuild if stale) the on-disk graph and summary."""
+        ds = self.datasets[key]
+        bundle = self._bundle_dir(key)
+        stamp = os.path.join(bundle, "fingerprint")
+        fingerprint = f"{ds.fingerprint} v{BUNDLE_VERSION}"
+        if os.path.exists(stamp):
+            with open(stamp) as f:
+                if f.read().strip() == fingerprint:
+                    return bundle
+        for loaded_key in self.loaded.keys():
+            if loaded_key[0] == key:
+                self.loaded.pop(loaded_key)
+        shutil.rmtree(bundle, ignore_errors=True)
+        graph = build_csr(ds.path, bundle, signed=ds.signed)
+        summarize(graph).save(bundle)
+        with open(stamp, "w") as f:
+            f.write(fingerprint)
+        return bundle
+
+    def summary(self, key):
+        """Cached ``GraphSummary`` of the dataset; builds the bundle if needed."""
+        with self._lock:
+            bundle = self._ensure_bundle(key)
+        return GraphSummary.load(bundle)
+
+    def has_artifact(self, key, name):
+        """Whether ``artifact(key, name, ...)`` would load rather than compute."""
+        with self._lock:
+            bundle = self._ensure_bundle(key)
+        return os.path.exists(os.path.join(bundle, f"{name}.npz"))
+
+    def artifact(self, key, name, compute):
+        """Dict of arrays persisted as ``<bundle>/<name>.npz``, computed on first use."""
+        with self._lock:
+            bundle = self._ensure_bundle(key)
+            lock = self._artifact_locks.setdefault((key, name), threading.Lock())
+        path = os.path.join(bundle, f"{name}.npz")
+        # Threads wait for the first computation; other processes write their own temp file
+        with lock:
+            if os.path.exists(path):
+                with np.load(path) as data:
+                    return dict(data)
+            arrays = compute()
+            with tempfile.NamedTemporaryFile(dir=bundle, suffix=".tmp.npz", delete=False) as tmp:
+                np.savez(tmp, **arrays)
+            os.replace(tmp.name, path)
+            return arrays
+
+    def load(self, key):
+        """``LoadedDataset`` for ``key``, from the shared LRU when warm and unchanged on disk."""
+        def build():
+            with self._lock:
+                bundle = self._ensure_bundle(key)
+            return LoadedDataset(self.datasets[key], CompactGraph.load(bundle), self.summary(key))
+
+        return self.loaded.get_or_compute((key, self.datasets[key].fingerprint), build)
@@ -0,0 +1,58 @@
+"""Spectral node embedding of the whole (undirected) network.
+
+Coordinates are Laplacian eigenmaps: the eigenvectors of the normalized
+Laplacian ``I - D^-1/2 A D^-1/2`` with the smallest non-zero eigenvalues,
+rescaled by ``D^-1/2``.  They are found as the largest eigenpairs of
+``D^-1/2 A D^-1/2`` on the giant weak component (a disconnected graph has
+one trivial eigenvector per component).  Both solvers need only sparse
+matrix-vector products and stop after ``maxiter`` iterations:
+
+* ``eigsh`` (moderate graphs) computes ``dim + 1`` pairs and drops the
+  trivial one (eigenvalue 1); ``maxiter`` counts Lanczos restarts;
+* ``lobpcg`` (large graphs) deflates the trivial eigenvector, known in
+  closed form as ``D^1/2 1``, by passing it as the constraint ``Y``.
+
+Nodes outside the giant component get ``NaN`` coordinates.
+"""
+import numpy as np
+import scipy.sparse as sps
+from scipy.sparse.linalg import eigsh, lobpcg
+
+from analytics.components import component_sizes, weak_component_labels
+
+LOBPCG_MIN_NODES = 200_000
+
+
+def spectral_embedding(graph, dim=3, method="auto", tol=1e-6, maxiter=1000, seed=0):
+    """Return ``(coords, eigenvalues)``: ``n x dim`` coordinates, Laplacian eigenvalues."""
+    _, labels = weak_component_labels(graph)
+    giant = np.flatnonzero(labels == np.argmax(component_sizes(labels)))
+    und = graph.undirected
+    A = und.to_csr().astype(np.float64)[giant][:, giant]
+    deg = np.asarray(A.sum(axis=1)).ravel()
+    inv_sqrt = 1.0 / np.sqrt(deg)
+    M = sps.diags(inv_sqrt) @ A @ sps.diags(inv_sqrt)
+    trivial = np.sqrt(deg) / np.linalg.norm(np.sqrt(deg))
+
+    k = min(dim, len(giant) - 2)
+    rng = np.random.default_rng(seed)
+    if method == "auto":
+        method = "lobpcg" if len(giant) >= LOBPCG_MIN_NODES else "eigsh"
+    if method == "eigsh":
+        # One extra pair for the trivial eigenvector (eigenvalue 1)
+        values, vectors = eigsh(M.tocsr(), k=k + 1, which="LA", tol=tol, maxiter=maxiter,
+                                v0=rng.standard_normal(len(giant)))
+        order = np.argsort(-values)[1:]
+        values, vectors = values[order], vectors[:, order]
+    elif method == "lobpcg":
+        X = rng.standard_normal((len(giant), k))
+        values, vectors = lobpcg(M.tocsr(), X, Y=trivial[:, None], largest=True, tol=tol, maxiter=maxiter)
+        order = np.argsort(-values)
+        values, vectors = values[order], vectors[:, order]
+    else:
+        raise ValueError(f"method must be 'auto', 'eigsh' or 'lobpcg', got {method!r}")
+
+    coords = np.full((graph.n_nodes, dim), np.nan)
+    scaled = vectors * inv_sqrt[:, None]
+    coords[giant, :k] = scaled / np.abs(scaled).max(axis=0)
+    return coords, 1.0 - values
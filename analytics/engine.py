@@ -0,0 +1,272 @@
+"""One cached analytics engine per dataset, shared by the app, notebook and report.
+
+``get_engine(key)`` returns the ``AnalyticsEngine`` of a registered
+dataset.  Every analysis the dashboard, ``main.ipynb`` and
+``analytics.report`` show is a method of the engine, so they compute the
+same numbers the same way:
+
+* results are memoized per engine in an ``LRUCache`` keyed by method name
+  and arguments, so a Streamlit session, a notebook cell and a report
+  section asking for the same thing share one computation;
+* the expensive ones (greedy communities, the distance oracle, degree
+  correlations, null-model ensembles, the spectral embedding) are also
+  persisted next to the CSR bundle with ``DatasetRegistry.artifact``, so a
+  report run warms the dashboard and vice versa;
+* engines are cached per registry and source-file fingerprint, so an
+  edited edge list gets a fresh engine.
+
+The graph itself is not held by the engine: ``compact`` goes through
+``DatasetRegistry.load`` and stays under its memory budget, and
+``subgraph`` builds NetworkX graphs of just the nodes being drawn.
+
+``top`` replaces the ``sorted(d.items(), key=..., reverse=True)[:k]``
+idiom: ``np.argpartition`` selects the ``k`` extreme scores in O(n) and
+only those are sorted.  From a notebook::
+
+    from analytics.engine import get_engine
+    engine = get_engine("wiki-vote")
+    ids, votes = engine.top(engine.compact.in_degree, 5)
+"""
+import threading
+
+import numpy as np
+
+from analytics import linkpred
+from analytics.assortativity import DegreeCorrelations, degree_correlations
+from analytics.betweenness import betweenness
+from analytics.cache import LRUCache
+from analytics.centrality import hits, pagerank
+from analytics.closeness import estimate as estimate_closeness, top_k_harmonic
+from analytics.clustering import average_clustering, transitivity
+from analytics.communities import CommunityReport, community_report
+from analytics.components import component_sizes, strong_component_labels, weak_component_labels
+from analytics.cores import core_numbers, rich_club, rich_club_null
+from analytics.datasets import DatasetRegistry
+from analytics.embedding import spectral_embedding
+from analytics.export import community_labels, louvain_labels
+from analytics.landmarks import DistanceOracle, build_oracle, extremal_distances
+from analytics.ppr import PPRService
+from analytics.significance import NullEnsemble, null_ensemble
+from analytics.signed import approval, balance_census, signed_pagerank
+from analytics.spmv import SparseOperator
+from analytics.triads import triad_census
+
+DEFAULT_DIRECTORY = "datasets"
+
+
+class AnalyticsEngine:
+    def __init__(self, registry, key, max_results=64):
+        self.registry = registry
+        self.key = key
+        self.results = LRUCache(maxsize=max_results)
+
+    def _memo(self, name, compute, *args):
+        return self.results.get_or_compute((name,) + args, compute)
+
+    def _persisted(self, name, cls, compute):
+        """``cls`` loaded from the bundle artifact ``name``, computed on first use."""
+        def load():
+            return cls.from_arrays(self.registry.artifact(self.key, name, lambda: compute().to_arrays()))
+        return self._memo(name, load)
+
+    # ------------------------------------------------------------------
+    # Data
+    # ------------------------------------------------------------------
+    @property
+    def dataset(self):
+        return self.registry[self.key]
+
+    @property
+    def compact(self):
+        return self.registry.load(self.key).compact
+
+    def subgraph(self, node_ids):
+        """NetworkX ``DiGraph`` induced by ``node_ids`` (topology only), for layouts and drawing."""
+        return self.compact.subgraph(node_ids)
+
+    @property
+    def summary(self):
+        return self.registry.load(self.key).summary
+
+    def top(self, scores, k=5, largest=True):
+        """``(ids, scores)`` of the ``k`` highest (or lowest) scores, best first.
+
+        ``scores`` is an array over compact nodes; ties keep compact order.
+        """
+        scores = np.asarray(scores)
+        k = min(k, len(scores))
+        key = -scores if largest else scores
+        if k < len(scores):
+            idx = np.argpartition(key, k - 1)[:k] if k else np.empty(0, dtype=np.int64)
+        else:
+            idx = np.arange(len(scores))
+        idx = idx[np.lexsort((idx, key[idx]))]
+        return self.compact.ids[idx], scores[idx]
+
+    # ------------------------------------------------------------------
+    # Structure
+    # ------------------------------------------------------------------
+    def component_sizes(self, kind="weak"):
+        """Component sizes, largest first (``kind`` is ``"weak"`` or ``"strong"``)."""
+        labelers = {"weak": weak_component_labels, "strong": strong_component_labels}
+        if kind not in labelers:
+            raise ValueError(f"kind must be 'weak' or 'strong', got {kind!r}")
+
+        def compute():
+            _, labels = labelers[kind](self.compact)
+            return np.sort(component_sizes(labels))[::-1]
+        return self._memo("component_sizes", compute, kind)
+
+    def transitivity(self):
+        return self._memo("transitivity", lambda: transitivity(self.compact))
+
+    def average_clustering(self):
+        return self._memo("average_clustering", lambda: average_clustering(self.compact))
+
+    def triad_census(self, fraction=1.0, seed=0):
+        return self._memo("triad_census", lambda: triad_census(self.compact, fraction=fraction, seed=seed),
+                          fraction, seed)
+
+    def core_numbers(self, mode="total"):
+        return self._memo("core_numbers", lambda: core_numbers(self.compact, mode), mode)
+
+    def rich_club(self, n_null=8):
+        """Observed rich-club curve with the mean / std over ``n_null`` rewirings."""
+        def compute():
+            null_mean, null_std = rich_club_null(self.compact, n_null=n_null)
+            return rich_club(self.compact), null_mean, null_std
+        return self._memo("rich_club", compute, n_null)
+
+    def degree_correlations(self):
+        return self._persisted("degree-correlations", DegreeCorrelations,
+                               lambda: degree_correlations(self.compact))
+
+    def null_ensemble(self, n_null=20):
+        return self._persisted(f"null-ensemble-{n_null}", NullEnsemble,
+                               lambda: null_ensemble(self.compact, n_null=n_null))
+
+    def has_null_ensemble(self, n_null=20):
+        return self.registry.has_artifact(self.key, f"null-ensemble-{n_null}")
+
+    # ------------------------------------------------------------------
+    # Distances
+    # ------------------------------------------------------------------
+    def distance_oracle(self):
+        return self._persisted("distance-oracle", DistanceOracle, lambda: build_oracle(self.compact))
+
+    def extremal_distances(self):
+        """Exact ``(diameter, radius, n_bfs)`` of the giant component."""
+        return self._memo("extremal_distances",
+                          lambda: extremal_distances(self.compact, self.distance_oracle()))
+
+    # ------------------------------------------------------------------
+    # Centrality
+    # ------------------------------------------------------------------
+    def operator(self):
+        # PageRank and HITS share the same sparse SpMV operator
+        return self._memo("operator", lambda: SparseOperator(self.compact))
+
+    def pagerank(self, alpha=0.85):
+        return self._memo("pagerank", lambda: pagerank(self.compact, alpha=alpha, operator=self.operator()),
+                          alpha)
+
+    def hits(self):
+        """``(hubs, authorities)``."""
+        return self._memo("hits", lambda: hits(self.compact, operator=self.operator()))
+
+    def betweenness(self, k=1000, seed=0):
+        return self._memo("betweenness", lambda: betweenness(self.compact, k=k, seed=seed), k, seed)
+
+    def closeness(self, k=256, seed=0):
+        """``ClosenessEstimate`` from ``k`` sampled BFS sources."""
+        return self._memo("closeness", lambda: estimate_closeness(self.compact, k=k, seed=seed), k, seed)
+
+    def top_harmonic(self, k=10):
+        """Exact top-``k`` harmonic centrality as ``(nodes, scores, n_pruned)``."""
+        return self._memo("top_harmonic", lambda: top_k_harmonic(self.compact, k=k), k)
+
+    def signed_scores(self):
+        """``(Approval, positive PageRank, net PageRank)`` of a signed dataset."""
+        def compute():
+            cg = self.compact
+            return approval(cg), signed_pagerank(cg, "positive"), signed_pagerank(cg, "net")
+        return self._memo("signed_scores", compute)
+
+    def balance_census(self):
+        return self._memo("balance_census", lambda: balance_census(self.compact))
+
+    def centrality(self, betweenness_k=1000, closeness_k=256):
+        """Per-node centrality columns (arrays over compact nodes), signed ones when available."""
+        def compute():
+            cg = self.compact
+            hub, authority = self.hits()
+            closeness = self.closeness(closeness_k)
+            columns = {
+                "in_degree": cg.in_degree,
+                "out_degree": cg.out_degree,
+                "pagerank": self.pagerank(),
+                "betweenness": self.betweenness(betweenness_k),
+                "hub": hub,
+                "authority": authority,
+                "closeness": closeness.closeness,
+                "harmonic": closeness.harmonic,
+            }
+            if cg.is_signed:
+                votes, positive_pr, net_pr = self.signed_scores()
+                columns.update(votes_for=votes.received_support, votes_against=votes.received_oppose,
+                               approval=votes.ratio, positive_pagerank=positive_pr, net_pagerank=net_pr)
+            return columns
+        return self._memo("centrality", compute, betweenness_k, closeness_k)
+
+    def ppr_service(self):
+        # One bounded per-query cache shared by every caller
+        return self._memo("ppr_service", lambda: PPRService(self.compact, LRUCache(maxsize=512),
+                                                            fingerprint=self.dataset.fingerprint))
+
+    # ------------------------------------------------------------------
+    # Communities and embeddings
+    # ------------------------------------------------------------------
+    def communities(self):
+        """Greedy-modularity ``CommunityReport``."""
+        def compute():
+            from networkx.algorithms.community import greedy_modularity_communities
+
+            cg = self.compact
+            communities = greedy_modularity_communities(cg.to_networkx(undirected=True))
+            return community_report(cg, community_labels(cg, communities))
+        return self._persisted("communities-greedy", CommunityReport, compute)
+
+    def louvain_labels(self, seed=0):
+        return self._memo("louvain_labels", lambda: louvain_labels(self.compact, seed=seed), seed)
+
+    def spectral_coordinates(self, dim=3):
+        """``{"coords", "eigenvalues"}`` of the spectral embedding."""
+        def compute():
+            coords, eigenvalues = spectral_embedding(self.compact, dim=dim)
+            return {"coords": coords, "eigenvalues": eigenvalues}
+        return self._memo("spectral", lambda: self.registry.artifact(self.key, f"spectral-{dim}d", compute), dim)
+
+    def link_prediction(self, direction="both"):
+        """Hold-out benchmark results of the link predictors."""
+        return self._memo("link_prediction",
+                          lambda: linkpred.holdout_benchmark(self.compact, direction=direction), direction)
+
+
+_registries = {}
+_engines = LRUCache(maxsize=16)
+_lock = threading.Lock()
+
+
+def get_registry(directory=DEFAULT_DIRECTORY):
+    """Process-wide ``DatasetRegistry`` of ``directory``."""
+    with _lock:
+        if directory not in _registries:
+            _registries[directory] = DatasetRegistry(directory)
+        return _registries[directory]
+
+
+def get_engine(key, registry=None):
+    """Process-wide ``AnalyticsEngine`` of dataset ``key`` (default registry: ``datasets/``)."""
+    registry = get_registry() if registry is None else registry
+    fingerprint = registry[key].fingerprint
+    return _engines.get_or_compute((id(registry), key, fingerprint), lambda: AnalyticsEngine(registry, key))
@@ -0,0 +1,50 @@
+"""Cache of rendered figures, shared by every dashboard session.
+
+Figures are keyed by ``(page, parameters, dataset fingerprint)`` and stored
+in their final serialized form: PNG bytes for matplotlib, JSON for plotly.
+A hit skips both the analysis that feeds the figure (layouts, community
+detection, ...) and the rasterization.  Entries live in a byte-bounded
+``LRUCache``; the fingerprint changes with the source file, so stale
+figures are never served and simply age out.
+"""
+import hashlib
+import io
+import json
+import os
+
+import matplotlib.pyplot as plt
+import plotly.io as pio
+
+from analytics.cache import LRUCache
+
+DEFAULT_MAX_BYTES = int(os.environ.get("WIKIVOTE_FIGURE_CACHE_MB", "256")) << 20
+
+
+def figure_key(page, params, fingerprint):
+    raw = json.dumps([page, params, fingerprint], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class FigureCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, maxsize=1024):
+        self.cache = LRUCache(maxsize=maxsize, max_bytes=max_bytes, sizeof=len)
+
+    def png(self, page, params, fingerprint, draw, dpi=200):
+        """PNG bytes of the matplotlib figure returned by ``draw()``."""
+        def render():
+            fig = draw()
+            buf = io.BytesIO()
+            # Same settings as st.pyplot
+            fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+            plt.close(fig)
+            return buf.getvalue()
+
+        return self.cache.get_or_compute(figure_key(page, params, fingerprint), render)
+
+    def plotly(self, page, params, fingerprint, build):
+        """Plotly figure returned by ``build()``, stored as JSON."""
+        key = figure_key(page, params, fingerprint)
+        return pio.from_json(self.cache.get_or_compute(key, lambda: build().to_json()))
+
+    def stats(self):
+        return self.cache.stats()
@@ -0,0 +1,306 @@
+"""Compact CSR adjacency for the voting graph.
+
+Nodes are relabelled to ``0..n-1`` in ascending order of their original
+IDs, so ``ids[i]`` is the original user ID of compact node ``i`` and
+``index_of`` is a binary search.  Out-edges are stored as CSR
+(``indptr``/``indices``) with neighbours sorted inside each row.
+
+Signed data (``src dst sign`` edge lists ingested with ``signed=True``)
+additionally carries ``signs``, one ``int8`` per edge aligned with
+``indices`` (+1 support, -1 oppose, 0 neutral); it is ``None`` for plain
+vote lists.
+
+The arrays may be memory-mapped (see ``load`` and ``analytics.ingest``);
+methods that scan every edge (degrees, ``reverse``, ``undirected``) do so
+in blocks of ``BLOCK_NNZ`` edges so they never pull a mapped edge array
+fully into memory; ``edges`` is the one exception.
+"""
+import os
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+import scipy.sparse as sps
+
+BLOCK_NNZ = 1 << 24
+
+
+@dataclass(eq=False)
+class CompactGraph:
+    ids: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    signs: np.ndarray = None     # int8 vote sign per edge, aligned with indices
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_edges(cls, src, dst, ids=None, signs=None):
+        """Build from arrays of original node IDs (duplicates are dropped).
+
+        With ``signs`` (each -1, 0 or 1, else ``ValueError``) the first sign
+        given for a duplicated edge is kept.
+        """
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        if ids is None:
+            ids = np.union1d(src, dst)
+        else:
+            ids = np.unique(np.asarray(ids, dtype=np.int64))
+        n = len(ids)
+        s = np.searchsorted(ids, src)
+        d = np.searchsorted(ids, dst)
+        keys, first = np.unique(s.astype(np.uint64) * np.uint64(max(n, 1)) + d.astype(np.uint64),
+                                return_index=True)
+        s = (keys // np.uint64(max(n, 1))).astype(np.int64)
+        d = (keys % np.uint64(max(n, 1))).astype(np.int32)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(s, minlength=n), out=indptr[1:])
+        if signs is not None:
+            signs = np.asarray(signs)
+            if not np.isin(signs, (-1, 0, 1)).all():
+                raise ValueError("Vote signs must be -1, 0 or 1")
+            signs = signs[first].astype(np.int8)
+        return cls(ids=ids, indptr=indptr, indices=d, signs=signs)
+
+    @classmethod
+    def from_networkx(cls, G):
+        ids = np.fromiter(G.nodes(), dtype=np.int64, count=G.number_of_nodes())
+        m = G.number_of_edges()
+        edges = np.fromiter((x for e in G.edges() for x in e), dtype=np.int64, count=2 * m)
+        src, dst = edges[0::2], edges[1::2]
+        if not G.is_directed():
+            src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+        return cls.from_edges(src, dst, ids=ids)
+
+    # ------------------------------------------------------------------
+    # Basic properties
+    # ------------------------------------------------------------------
+    @property
+    def n_nodes(self):
+        return len(self.indptr) - 1
+
+    @property
+    def n_edges(self):
+        return int(self.indptr[-1])
+
+    @property
+    def is_signed(self):
+        return self.signs is not None
+
+    @property
+    def nbytes(self):
+        signs = self.signs.nbytes if self.is_signed else 0
+        return int(self.ids.nbytes + self.indptr.nbytes + self.indices.nbytes + signs)
+
+    @cached_property
+    def out_degree(self):
+        return np.diff(self.indptr)
+
+    @cached_property
+    def in_degree(self):
+        deg = np.zeros(self.n_nodes, dtype=np.int64)
+        for lo in range(0, self.n_edges, BLOCK_NNZ):
+            deg += np.bincount(self.indices[lo:lo + BLOCK_NNZ], minlength=self.n_nodes)
+        return deg
+
+    @property
+    def is_mapped(self):
+        return isinstance(self.indices, np.memmap)
+
+    def to_csr(self, signed=False):
+        """Adjacency as a ``scipy.sparse.csr_matrix`` (1 = vote).
+
+        With ``signed`` the entries are the vote signs instead; neutral
+        votes are then explicit zeros, which SciPy keeps until pruned.
+        """
+        data = self.signs if signed else np.ones(self.n_edges, dtype=np.int8)
+        return sps.csr_matrix((data, self.indices, self.indptr), shape=(self.n_nodes, self.n_nodes))
+
+    def index_of(self, node_ids):
+        """Map original node IDs to compact indices (KeyError if unknown)."""
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        idx = np.searchsorted(self.ids, node_ids)
+        idx = np.minimum(idx, self.n_nodes - 1)
+        if np.any(self.ids[idx] != node_ids):
+            missing = np.atleast_1d(node_ids)[np.atleast_1d(self.ids[idx] != node_ids)]
+            raise KeyError(f"Unknown node id(s): {missing[:5].tolist()}")
+        return idx
+
+    def successors(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def has_edges(self, src, dst):
+        """Vectorized edge test: bisection inside each sorted row of ``src``."""
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst)
+        if not self.n_edges:
+            return np.zeros(src.shape, dtype=bool)
+        lo, end = self.indptr[src], self.indptr[src + 1]
+        hi = end.copy()
+        last = self.n_edges - 1
+        while True:
+            active = lo < hi
+            if not active.any():
+                break
+            mid = (lo + hi) // 2
+            less = self.indices[np.minimum(mid, last)] < dst
+            lo = np.where(active & less, mid + 1, lo)
+            hi = np.where(active & ~less, mid, hi)
+        return (lo < end) & (self.indices[np.minimum(lo, last)] == dst)
+
+    def edges(self):
+        """Return ``(src, dst)`` compact index arrays in CSR order.
+
+        Unlike the blocked methods this materializes ``O(m)`` arrays (and
+        reads a mapped edge array in full); it serves the whole-graph
+        kernels (null models, cores, ...) that need every edge at once.
+        """
+        src = np.repeat(np.arange(self.n_nodes, dtype=np.int32), self.out_degree)
+        return src, self.indices
+
+    def iter_edge_blocks(self, block_nnz=BLOCK_NNZ):
+        """Yield ``(src, dst)`` arrays covering the edges in CSR order."""
+        for lo in range(0, self.n_edges, block_nnz):
+            hi = min(lo + block_nnz, self.n_edges)
+            rows = np.searchsorted(self.indptr, np.arange(lo, hi), side="right") - 1
+            yield rows, np.asarray(self.indices[lo:hi])
+
+    def gather(self, rows):
+        """Concatenated neighbours of ``rows`` plus the row each came from."""
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self.indptr[rows]
+        counts = self.indptr[rows + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return np.empty(0, dtype=self.indices.dtype), np.empty(0, dtype=np.int64)
+        owner = np.repeat(np.arange(len(rows)), counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return self.indices[starts[owner] + offsets], rows[owner]
+
+    def subgraph(self, node_ids):
+        """Subgraph induced by original ``node_ids`` as a NetworkX ``DiGraph``.
+
+        Only the rows of ``node_ids`` are read, so drawing a few hundred
+        users never builds the whole graph in NetworkX.
+        """
+        import networkx as nx
+
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        rows = self.index_of(node_ids)
+        nbrs, owner = self.gather(rows)
+        inside = np.zeros(self.n_nodes, dtype=bool)
+        inside[rows] = True
+        keep = inside[nbrs]
+        G = nx.DiGraph()
+        G.add_nodes_from(node_ids.tolist())
+        G.add_edges_from(zip(self.ids[owner[keep]].tolist(), self.ids[nbrs[keep]].tolist()))
+        return G
+
+    def to_networkx(self, undirected=False):
+        """The whole graph in NetworkX (topology only), for algorithms only NetworkX has."""
+        import networkx as nx
+
+        G = nx.Graph() if undirected else nx.DiGraph()
+        G.add_nodes_from(self.ids.tolist())
+        for src, dst in self.iter_edge_blocks():
+            G.add_edges_from(zip(self.ids[src].tolist(), self.ids[dst].tolist()))
+        return G
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in ("ids", "indptr", "indices"):
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        if self.is_signed:
+            np.save(os.path.join(directory, "signs.npy"), self.signs)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """Open a graph written by ``save`` or ``analytics.ingest``.
+
+        With ``mmap`` the edge array stays on disk and is paged in on use.
+        """
+        mode = "r" if mmap else None
+        signs = os.path.join(directory, "signs.npy")
+        return cls(ids=np.load(os.path.join(directory, "ids.npy")),
+                   indptr=np.load(os.path.join(directory, "indptr.npy")),
+                   indices=np.load(os.path.join(directory, "indices.npy"), mmap_mode=mode),
+                   signs=np.load(signs, mmap_mode=mode) if os.path.exists(signs) else None)
+
+    # ------------------------------------------------------------------
+    # Derived views
+    # ------------------------------------------------------------------
+    @cached_property
+    def reverse(self):
+        """Transposed graph (in-edges as rows), sharing ``ids``; signs follow their edges.
+
+        A counting sort over ``iter_edge_blocks``: each block is scattered to
+        the next free slots of its targets' rows, so rows come out sorted
+        and only one block of edges is held besides the result (held in
+        memory: ``m`` indices, plus ``m`` signs for signed graphs).
+        """
+        n = self.n_nodes
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(self.in_degree, out=indptr[1:])
+        indices = np.empty(self.n_edges, dtype=np.int32)
+        signs = np.empty(self.n_edges, dtype=np.int8) if self.is_signed else None
+        fill = indptr[:-1].copy()
+        lo = 0
+        for src, dst in self.iter_edge_blocks(BLOCK_NNZ):
+            order = np.argsort(dst, kind="stable")  # rows stay ascending within a target
+            dst = dst[order]
+            pos = fill[dst] + np.arange(len(dst)) - np.searchsorted(dst, dst)
+            indices[pos] = src[order]
+            if signs is not None:
+                signs[pos] = np.asarray(self.signs[lo:lo + len(dst)])[order]
+            fill += np.bincount(dst, minlength=n)
+            lo += len(dst)
+        return CompactGraph(ids=self.ids, indptr=indptr, indices=indices, signs=signs)
+
+    @cached_property
+    def undirected(self):
+        """Symmetric simple graph (self-loops dropped, unsigned), sharing ``ids``.
+
+        Built over row blocks holding about ``BLOCK_NNZ`` out- plus in-edges:
+        each row is the de-duplicated union of its rows in ``self`` and
+        ``reverse``.  The result is held in memory.
+        """
+        n = self.n_nodes
+        reverse = self.reverse
+        both = self.indptr + reverse.indptr
+        cuts = np.searchsorted(both, np.arange(BLOCK_NNZ, int(both[-1]), BLOCK_NNZ), side="right") - 1
+        bounds = np.unique(np.concatenate([[0], cuts, [n]]))
+        degree = np.zeros(n, dtype=np.int64)
+        parts = []
+        base = np.uint64(max(n, 1))
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            rows = np.arange(start, stop)
+            out_nbrs, out_rows = self.gather(rows)
+            in_nbrs, in_rows = reverse.gather(rows)
+            keys = np.unique(np.concatenate([
+                out_rows.astype(np.uint64) * base + out_nbrs.astype(np.uint64),
+                in_rows.astype(np.uint64) * base + in_nbrs.astype(np.uint64),
+            ]))
+            src = (keys // base).astype(np.int64)
+            dst = (keys % base).astype(np.int32)
+            keep = src != dst
+            degree += np.bincount(src[keep], minlength=n)
+            parts.append(dst[keep])
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(degree, out=indptr[1:])
+        indices = np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+        return CompactGraph(ids=self.ids, indptr=indptr, indices=indices)
+
+    def oriented(self, direction):
+        """Pick the adjacency to walk: ``"out"``, ``"in"`` or ``"both"``."""
+        if direction == "out":
+            return self
+        if direction == "in":
+            return self.reverse
+        if direction == "both":
+            return self.undirected
+        raise ValueError(f"direction must be 'out', 'in' or 'both', got {direction!r}")
@@ -0,0 +1,225 @@
+"""Out-of-core edge-list ingestion into an on-disk ``CompactGraph``.
+
+The text file is read in fixed-size byte chunks and each chunk is parsed
+in one call to ``np.fromstring``.  Ingestion is an external-memory sort:
+
+1. every chunk is sorted by ``(src, dst)`` and spilled to a run file while
+   the sorted set of distinct node IDs is accumulated;
+2. the runs are k-way merged block by block, mapped to compact indices,
+   de-duplicated and appended to the CSR edge array, counting out-degrees
+   on the way.
+
+Signs are opt-in: with ``signed=True`` the third column is read as the
+vote sign (``src dst sign``, each one of -1, 0 or 1) and travels with its
+edge through the runs and the merge into an ``int8`` ``signs.npy`` aligned
+with ``indices.npy``; of duplicated edges the first one in the file keeps
+its sign.  Otherwise extra columns (weights, timestamps, ...) are ignored.
+
+Relabelling preserves ID order, so runs sorted by original IDs are already
+sorted by compact index.  Peak memory is ``O(n + chunk)``: a few arrays per
+node plus one chunk of edges, independent of the number of edges.  The
+result is opened with ``CompactGraph.load`` (memory-mapped by default).
+
+Command line::
+
+    python -m analytics.ingest edges.txt out_dir [--chunk-mb 64]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from analytics.graph import CompactGraph
+
+DEFAULT_CHUNK_BYTES = 64 << 20
+_COPY_BLOCK = 1 << 24
+
+
+def _parse(buf, n_cols):
+    if b"#" in buf or b"%" in buf:
+        buf = b"\n".join(line for line in buf.split(b"\n")
+                         if not line.lstrip().startswith((b"#", b"%")))
+    values = np.fromstring(buf, dtype=np.int64, sep=" ")
+    if len(values) % n_cols:
+        raise ValueError(f"Malformed edge list chunk: {len(values)} values is not a multiple of {n_cols}")
+    return values.reshape(-1, n_cols)
+
+
+def edge_columns(path):
+    """Number of whitespace-separated columns on the first data line (0 if none)."""
+    with open(path, "rb") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith((b"#", b"%")):
+                return len(line.split())
+    return 0
+
+
+def iter_edge_chunks(path, chunk_bytes=DEFAULT_CHUNK_BYTES, n_cols=None):
+    """Yield ``(k, n_cols)`` int64 arrays, one per chunk of whole lines.
+
+    ``n_cols`` defaults to the column count of the first data line.
+    """
+    n_cols = n_cols or max(edge_columns(path), 2)
+    with open(path, "rb") as f:
+        carry = b""
+        while True:
+            block = f.read(chunk_bytes)
+            if not block:
+                break
+            block = carry + block
+            cut = block.rfind(b"\n") + 1
+            if cut == 0:
+                carry = block
+                continue
+            carry = block[cut:]
+            rows = _parse(block[:cut], n_cols)
+            if len(rows):
+                yield rows
+        if carry.strip():
+            rows = _parse(carry, n_cols)
+            if len(rows):
+                yield rows
+
+
+class _Run:
+    """Cursor over one sorted run file."""
+
+    def __init__(self, path):
+        self.data = np.load(path, mmap_mode="r")
+        self.pos = 0
+
+    @property
+    def done(self):
+        return self.pos >= len(self.data)
+
+
+def _merge_runs(runs, ids, out, block_edges, sign_out=None):
+    """Merge sorted runs into ``out`` (raw int32 dst stream); return out-degree.
+
+    With ``sign_out`` the runs carry a third column whose sign is written
+    there as a raw int8 stream, one byte per kept edge.
+    """
+    n = len(ids)
+    base = np.uint64(n)
+    out_degree = np.zeros(n, dtype=np.int64)
+    last_key = None
+    per_run = max(block_edges // max(len(runs), 1), 1)
+    while True:
+        live = [r for r in runs if not r.done]
+        if not live:
+            break
+        blocks = [np.asarray(r.data[r.pos:r.pos + per_run]) for r in live]
+        keys = [np.searchsorted(ids, b[:, 0]).astype(np.uint64) * base
+                + np.searchsorted(ids, b[:, 1]).astype(np.uint64) for b in blocks]
+        # Everything up to the smallest "last loaded key" of an unfinished
+        # run is final: no run can still produce a smaller key.
+        bounds = [k[-1] for r, k in zip(live, keys) if r.pos + len(k) < len(r.data)]
+        bound = min(bounds) if bounds else None
+        taken, taken_signs = [], []
+        for r, b, k in zip(live, blocks, keys):
+            cnt = len(k) if bound is None else int(np.searchsorted(k, bound, side="right"))
+            taken.append(k[:cnt])
+            if sign_out is not None:
+                taken_signs.append(b[:cnt, 2])
+            r.pos += cnt
+        merged, first = np.unique(np.concatenate(taken), return_index=True)
+        if last_key is not None and len(merged) and merged[0] == last_key:
+            merged, first = merged[1:], first[1:]
+        if not len(merged):
+            continue
+        last_key = merged[-1]
+        src = (merged // base).astype(np.int64)
+        out_degree += np.bincount(src, minlength=n)
+        out.write((merged % base).astype(np.int32).tobytes())
+        if sign_out is not None:
+            sign_out.write(np.concatenate(taken_signs)[first].astype(np.int8).tobytes())
+    return out_degree
+
+
+def _wrap_raw(raw_path, npy_path, dtype, m):
+    """Copy a raw stream of ``m`` values into an ``.npy`` file, block by block."""
+    raw = np.memmap(raw_path, dtype=dtype, mode="r", shape=(m,)) if m else np.empty(0, dtype)
+    dst = np.lib.format.open_memmap(npy_path, mode="w+", dtype=dtype, shape=(m,))
+    for lo in range(0, m, _COPY_BLOCK):
+        dst[lo:lo + _COPY_BLOCK] = raw[lo:lo + _COPY_BLOCK]
+    dst.flush()
+    del dst, raw
+
+
+def build_csr(path, out_dir, chunk_bytes=DEFAULT_CHUNK_BYTES, n_cols=None, tmp_dir=None, signed=False):
+    """Ingest an edge list into ``out_dir``; returns the memory-mapped graph.
+
+    ``n_cols`` defaults to the column count of the first data line.  With
+    ``signed`` the third column holds vote signs; any value outside
+    {-1, 0, 1} raises ``ValueError``.
+    """
+    n_cols = n_cols or max(edge_columns(path), 2)
+    if signed and n_cols < 3:
+        raise ValueError("Signed ingestion needs a third 'sign' column")
+    os.makedirs(out_dir, exist_ok=True)
+    stale = os.path.join(out_dir, "signs.npy")
+    if os.path.exists(stale):
+        os.remove(stale)
+    work = tempfile.mkdtemp(prefix="ingest-", dir=tmp_dir or out_dir)
+    try:
+        # Pass 1: sorted runs + distinct IDs
+        ids = np.empty(0, dtype=np.int64)
+        run_paths = []
+        for i, rows in enumerate(iter_edge_chunks(path, chunk_bytes, n_cols)):
+            edges = rows[:, :3] if signed else rows[:, :2]
+            if signed and not np.isin(edges[:, 2], (-1, 0, 1)).all():
+                bad = np.unique(edges[~np.isin(edges[:, 2], (-1, 0, 1)), 2])[:5].tolist()
+                raise ValueError(f"Vote signs must be -1, 0 or 1, found {bad} in {path}")
+            edges = edges[np.lexsort((edges[:, 1], edges[:, 0]))]
+            run_path = os.path.join(work, f"run_{i:05d}.npy")
+            np.save(run_path, edges)
+            run_paths.append(run_path)
+            ids = np.union1d(ids, np.unique(edges[:, :2]))
+        if len(ids) >= 1 << 31:
+            raise ValueError("Graphs with 2^31 or more nodes are not supported")
+
+        # Pass 2: k-way merge into the CSR edge stream
+        raw_path = os.path.join(work, "indices.raw")
+        sign_path = os.path.join(work, "signs.raw")
+        block_edges = max(chunk_bytes // 16, 1)
+        with open(raw_path, "wb") as out, open(sign_path, "wb") as sign_out:
+            out_degree = _merge_runs([_Run(p) for p in run_paths], ids, out, block_edges,
+                                     sign_out if signed else None)
+
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(out_degree, out=indptr[1:])
+        np.save(os.path.join(out_dir, "ids.npy"), ids)
+        np.save(os.path.join(out_dir, "indptr.npy"), indptr)
+
+        m = int(indptr[-1])
+        _wrap_raw(raw_path, os.path.join(out_dir, "indices.npy"), np.int32, m)
+        if signed:
+            _wrap_raw(sign_path, os.path.join(out_dir, "signs.npy"), np.int8, m)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return CompactGraph.load(out_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build an on-disk CSR graph from an edge list.")
+    parser.add_argument("edges", help="whitespace-separated edge list (one 'src dst [sign]' per line)")
+    parser.add_argument("out_dir", help="directory for ids.npy / indptr.npy / indices.npy [/ signs.npy]")
+    parser.add_argument("--chunk-mb", type=int, default=DEFAULT_CHUNK_BYTES >> 20,
+                        help="bytes of text parsed per chunk, in MiB (default: %(default)s)")
+    parser.add_argument("--signed", action="store_true",
+                        help="read the third column as vote signs (-1, 0 or 1)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    graph = build_csr(args.edges, args.out_dir, chunk_bytes=args.chunk_mb << 20, signed=args.signed)
+    kind = "signed edges" if graph.is_signed else "edges"
+    print(f"{graph.n_nodes:,} nodes, {graph.n_edges:,} {kind} written to {args.out_dir} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Landmark distance oracle for hop distances in the undirected view.
+
+``build_oracle`` runs one BFS per landmark over ``graph.undirected``
+(spread over the process pool) and keeps the distances as an ``L x n``
+``uint8`` matrix (``UNREACHABLE`` where a node is in another component),
+which is persisted per dataset.  Two kinds of landmark share the matrix:
+
+* *chosen* landmarks, the top nodes by degree or PageRank, which sit on
+  many shortest paths and give tight bounds;
+* *sampled* landmarks, drawn uniformly from the giant component, whose
+  rows are exact single-source distances from random sources.
+
+For a pair ``(u, v)`` the triangle inequality over every landmark ``l``
+gives ``|d(l,u) - d(l,v)| <= d(u,v) <= d(l,u) + d(l,v)``; ``bounds``
+evaluates both for arrays of pairs in one vectorized step, and ``query``
+can refine a gap exactly with a bidirectional BFS.
+
+The sampled rows make the average shortest-path length of the giant
+component an estimate over random sources (exact over targets), with a
+confidence interval.  The same rows seed eccentricity bounds, from which
+``extremal_distances`` finds the exact diameter and radius with a few
+extra BFS (Takes & Kosters' bounding diameters) instead of one per node.
+"""
+from dataclasses import dataclass, fields
+
+import numpy as np
+from scipy.sparse.csgraph import connected_components
+
+from analytics import parallel
+from analytics.bfs import bfs_distances, bidirectional_distance
+from analytics.centrality import pagerank
+from analytics.closeness import Z_95
+
+UNREACHABLE = np.iinfo(np.uint8).max
+STRATEGIES = ("degree", "pagerank")
+
+
+@dataclass(eq=False)
+class DistanceOracle:
+    landmarks: np.ndarray    # compact node of each row
+    sampled: np.ndarray      # row's landmark was drawn uniformly from the giant component
+    dist: np.ndarray         # L x n uint8 hop distances, UNREACHABLE across components
+
+    @property
+    def n_landmarks(self):
+        return len(self.landmarks)
+
+    @property
+    def nbytes(self):
+        return int(self.dist.nbytes)
+
+    @property
+    def giant(self):
+        """Mask of the component the sampled landmarks were drawn from."""
+        reach = self.dist != UNREACHABLE
+        row = int(np.argmax(self.sampled)) if self.sampled.any() else int(np.argmax(reach.sum(axis=1)))
+        return reach[row]
+
+    def bounds(self, u, v):
+        """``(lower, upper)`` float arrays bounding ``d(u, v)`` (``inf`` if disconnected)."""
+        u = np.atleast_1d(np.asarray(u, dtype=np.int64))
+        v = np.atleast_1d(np.asarray(v, dtype=np.int64))
+        du = self.dist[:, u].astype(np.int16)
+        dv = self.dist[:, v].astype(np.int16)
+        ru, rv = du != UNREACHABLE, dv != UNREACHABLE
+        both = ru & rv
+        upper = np.where(both, du + dv, np.iinfo(np.int16).max).min(axis=0).astype(float)
+        upper[~both.any(axis=0)] = np.inf
+        lower = np.where(both, np.abs(du - dv), 0).max(axis=0).astype(float)
+        lower = np.maximum(lower, (u != v).astype(float))
+        # A landmark that reaches exactly one end proves they are disconnected
+        split = (ru ^ rv).any(axis=0)
+        lower[split] = upper[split] = np.inf
+        same = u == v
+        lower[same] = upper[same] = 0.0
+        return lower, upper
+
+    def query(self, graph, u, v, exact=False):
+        """``(lower, upper, distance)`` for one pair of compact nodes.
+
+        ``distance`` is ``None`` unless the bounds meet or ``exact`` asks
+        for a bidirectional BFS on ``graph.undirected`` (``inf`` if disconnected).
+        """
+        lower, upper = (float(b[0]) for b in self.bounds(u, v))
+        if lower == upper:
+            return lower, upper, lower
+        if not exact:
+            return lower, upper, None
+        und = graph.undirected
+        d = bidirectional_distance(und, int(u), int(v), reverse=und)
+        return lower, upper, float(d) if d >= 0 else np.inf
+
+    def average_distance(self, z=Z_95):
+        """Mean shortest-path length of the giant component as ``(value, half_width, n_sources)``.
+
+        Each sampled row gives the exact mean distance from one uniformly
+        drawn source; their mean is unbiased for the average over all pairs.
+        """
+        rows = self.dist[self.sampled]
+        if not len(rows):
+            raise ValueError("The oracle has no sampled landmarks")
+        reach = rows != UNREACHABLE
+        size = int(reach[0].sum())
+        means = np.where(reach, rows, 0).sum(axis=1) / max(size - 1, 1)
+        k = len(means)
+        fpc = np.sqrt(max(size - k, 0) / max(size - 1, 1))
+        half = z * means.std(ddof=1) / np.sqrt(k) * fpc if k > 1 else np.inf
+        return float(means.mean()), float(half), k
+
+    def eccentricity_bounds(self):
+        """Per-node ``(lower, upper)`` eccentricity bounds inside the giant component."""
+        giant = self.giant
+        rows = self.dist[:, giant].astype(np.int64)
+        inside = (rows != UNREACHABLE).all(axis=1)
+        rows = rows[inside]
+        ecc = rows.max(axis=1)
+        return rows.max(axis=0), (rows + ecc[:, None]).min(axis=0)
+
+    def to_arrays(self):
+        return {f.name: np.asarray(getattr(self, f.name)) for f in fields(self)}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(**{f.name: arrays[f.name] for f in fields(cls)})
+
+
+def _landmark_rows(graph, sources):
+    rows = np.empty((len(sources), graph.n_nodes), dtype=np.uint8)
+    for i, s in enumerate(sources):
+        d = bfs_distances(graph, int(s))
+        if d.max() >= UNREACHABLE:
+            raise ValueError(f"Hop distances of {UNREACHABLE} or more do not fit the uint8 oracle")
+        rows[i] = np.where(d < 0, UNREACHABLE, d)
+    return rows
+
+
+def choose_landmarks(graph, n, strategy="degree"):
+    """Top-``n`` compact nodes by undirected degree or by PageRank."""
+    if strategy == "degree":
+        score = graph.undirected.out_degree
+    elif strategy == "pagerank":
+        score = pagerank(graph)
+    else:
+        raise ValueError(f"strategy must be one of {STRATEGIES}, got {strategy!r}")
+    return np.argsort(-score, kind="stable")[:n]
+
+
+def build_oracle(graph, n_landmarks=32, n_sampled=128, strategy="degree", seed=0, workers=None):
+    """``DistanceOracle`` over ``graph.undirected`` with chosen + sampled landmarks."""
+    und = graph.undirected
+    _, labels = connected_components(und.to_csr(), directed=False)
+    giant = np.flatnonzero(labels == np.argmax(np.bincount(labels)))
+    rng = np.random.default_rng(seed)
+    sampled = np.sort(rng.choice(giant, size=min(n_sampled, len(giant)), replace=False))
+    chosen = choose_landmarks(graph, min(n_landmarks, graph.n_nodes), strategy)
+    landmarks = np.concatenate([chosen, sampled]).astype(np.int64)
+
+    workers = parallel.DEFAULT_WORKERS if workers is None else workers
+    rows = parallel.map_chunks(_landmark_rows, und, parallel.split(landmarks, workers * 2),
+                               workers=workers)
+    return DistanceOracle(
+        landmarks=landmarks,
+        sampled=np.arange(len(landmarks)) >= len(chosen),
+        dist=np.concatenate(rows) if rows else np.empty((0, graph.n_nodes), dtype=np.uint8),
+    )
+
+
+def extremal_distances(graph, oracle):
+    """Exact ``(diameter, radius, n_bfs)`` of the giant component of ``graph.undirected``.
+
+    Eccentricity bounds start from the oracle; each extra BFS from the
+    node with the widest open bound tightens every node's bounds
+    (``max(ecc(w) - d(w,v), d(w,v)) <= ecc(v) <= ecc(w) + d(w,v)``) until
+    both extremes are settled.
+    """
+    und = graph.undirected
+    giant = np.flatnonzero(oracle.giant)
+    lower, upper = oracle.eccentricity_bounds()
+    ecc = oracle.dist[:, giant].max(axis=1)
+    inside = (oracle.dist[:, giant] != UNREACHABLE).all(axis=1)
+    d_low, r_high = int(ecc[inside].max()), int(ecc[inside].min())
+    open_ = lower != upper
+    n_bfs, pick_high = 0, True
+    while True:
+        d_high = min(int(upper.max()), 2 * r_high)
+        r_low = int(lower.min())
+        if d_low == d_high and r_low == r_high:
+            break
+        # Nodes that can no longer change either extreme are dropped
+        open_ &= ~((upper <= d_low) & (lower >= r_high))
+        if not open_.any():
+            d_low, r_high = max(d_low, int(upper.max())), min(r_high, int(lower.min()))
+            break
+        candidates = np.flatnonzero(open_)
+        w = candidates[np.argmax(upper[candidates])] if pick_high else candidates[np.argmin(lower[candidates])]
+        pick_high = not pick_high
+        d = bfs_distances(und, int(giant[w]))[giant].astype(np.int64)
+        e = int(d.max())
+        n_bfs += 1
+        lower = np.maximum(lower, np.maximum(e - d, d))
+        upper = np.minimum(upper, e + d)
+        lower[w] = upper[w] = e
+        d_low, r_high = max(d_low, e), min(r_high, e)
+        open_ &= lower != upper
+    return d_low, r_high, n_bfs
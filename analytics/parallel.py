@@ -0,0 +1,181 @@
+"""Process-pool helpers for running graph kernels over chunks of work.
+
+Graphs reach the workers through shared memory (``analytics.shm``): the
+parent copies a graph's arrays into named segments once, and every task
+carries only a small handle that workers attach to without copying (and
+keep attached for later tasks).  The pool itself is created on first use
+and reused by every call, so worker start-up is paid once per process
+rather than once per analysis.  ``measure_overhead`` reports both costs.
+"""
+import argparse
+import atexit
+import multiprocessing as mp
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from analytics import shm
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+PARENT_POLL_SECONDS = 1.0
+
+
+def _context():
+    method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+    return mp.get_context(method)
+
+
+def get_pool(workers):
+    """Shared pool with at least ``workers`` processes (created on first use)."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers < workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=_context(),
+                                        initializer=_watch_parent, initargs=(os.getpid(),))
+            _pool_workers = workers
+        return _pool
+
+
+@atexit.register
+def shutdown():
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool, _pool_workers = None, 0
+
+
+def _discard(pool):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is pool:
+            _pool, _pool_workers = None, 0
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _watch_parent(pid):
+    # Idle workers would otherwise outlive a killed server, keeping its
+    # shared segments mapped and the resource tracker from unlinking them
+    def watch():
+        while True:
+            time.sleep(PARENT_POLL_SECONDS)
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                os._exit(1)
+
+    threading.Thread(target=watch, daemon=True).start()
+
+
+def _run_chunk(func, handle, chunk, kwargs):
+    return func(shm.attach_obj(handle), chunk, **kwargs)
+
+
+def split(items, n_chunks):
+    """Split an array into at most ``n_chunks`` non-empty contiguous pieces."""
+    items = np.asarray(items)
+    n_chunks = max(1, min(n_chunks, len(items)))
+    return [c for c in np.array_split(items, n_chunks) if len(c)]
+
+
+def map_chunks(func, graph, chunks, workers=None, **kwargs):
+    """Run ``func(graph, chunk, **kwargs)`` for every chunk, in order.
+
+    ``graph`` is a ``CompactGraph`` or a tuple of them.  ``func`` must be a
+    module-level function so it can be pickled.  With one worker (or one
+    chunk) everything runs in-process.  A pool broken by a crashed worker
+    is replaced and the call retried once.
+    """
+    workers = DEFAULT_WORKERS if workers is None else workers
+    chunks = list(chunks)
+    if workers <= 1 or len(chunks) <= 1:
+        return [func(graph, c, **kwargs) for c in chunks]
+    handle = shm.share_obj(graph)
+    for attempt in range(2):
+        pool = get_pool(workers)
+        try:
+            futures = [pool.submit(_run_chunk, func, handle, c, kwargs) for c in chunks]
+            return [f.result() for f in futures]
+        except BrokenProcessPool:
+            _discard(pool)
+            if attempt:
+                raise
+
+
+# ----------------------------------------------------------------------
+# Overhead measurement
+# ----------------------------------------------------------------------
+def _noop(graph, chunk):
+    return graph.n_edges
+
+
+def _attach_time(handle, chunk):
+    start = time.perf_counter()
+    shm.attach_obj(handle)
+    return time.perf_counter() - start
+
+
+def measure_overhead(graph, workers=None, n_tasks=64):
+    """Costs of the parallel machinery itself, with a no-op kernel.
+
+    Returns a dict with pool start-up and first-attach times, the mean
+    round trip of a task once the graph is attached (all in ms), and the
+    bytes a task carries compared with pickling the graph.
+    """
+    workers = DEFAULT_WORKERS if workers is None else workers
+    shutdown()
+    start = time.perf_counter()
+    pool = get_pool(workers)
+    list(pool.map(int, range(workers)))
+    startup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    handle = shm.share_obj(graph)
+    share_time = time.perf_counter() - start
+    attach = list(pool.map(_attach_time, [handle] * workers, range(workers)))
+
+    map_chunks(_noop, graph, range(workers), workers=workers)
+    start = time.perf_counter()
+    map_chunks(_noop, graph, range(n_tasks), workers=workers)
+    per_task = (time.perf_counter() - start) / n_tasks
+    return {
+        "workers": workers,
+        "pool_startup_ms": startup * 1e3,
+        "share_ms": share_time * 1e3,
+        "attach_ms": max(attach) * 1e3,
+        "task_round_trip_ms": per_task * 1e3,
+        "handle_bytes": len(pickle.dumps(handle)),
+        "pickled_graph_bytes": len(pickle.dumps(graph)),
+        "shared_bytes": shm.shared_bytes(),
+    }
+
+
+def main(argv=None):
+    from analytics.datasets import DatasetRegistry
+
+    parser = argparse.ArgumentParser(description="Measure process-pool overhead on a dataset's graph.")
+    parser.add_argument("dataset", help="dataset key (see datasets/*.json)")
+    parser.add_argument("--datasets", default="datasets", help="dataset directory")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--tasks", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    graph = DatasetRegistry(args.datasets).load(args.dataset).compact
+    for key, value in measure_overhead(graph, args.workers, args.tasks).items():
+        print(f"{key:>22}: {value:,.3f}" if isinstance(value, float) else f"{key:>22}: {value:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Approximate personalized PageRank (PPR) on a ``CompactGraph``.
+
+Two estimators are offered:
+
+* ``push``: Andersen-Chung-Lang forward push.  Every node whose residual
+  exceeds ``epsilon * degree`` pushes at once (a synchronous round), so the
+  work per query is ``O(1 / (epsilon * (1 - alpha)))`` edge visits; only
+  the rows of pushing nodes are read, but the estimate and residual are
+  dense ``O(n)`` arrays allocated per query.  Estimates are lower bounds,
+  and the residual mass left behind on each node is below
+  ``epsilon * degree``.
+* ``montecarlo``: ``alpha``-terminated random walks simulated in lockstep;
+  ``epsilon`` sets the walk count (``~ log(1/delta) / epsilon``).
+
+``alpha`` is the damping factor, as in ``nx.pagerank``.  Walkers that reach
+a node without out-links jump back to the seed.
+"""
+import math
+
+import numpy as np
+
+from analytics import parallel
+
+
+def forward_push(graph, seed, alpha=0.85, epsilon=1e-5, max_rounds=10_000):
+    """Return dense ``(estimate, residual)`` arrays for one seed."""
+    n = graph.n_nodes
+    deg = graph.out_degree
+    threshold = epsilon * np.maximum(deg, 1)
+    p = np.zeros(n)
+    r = np.zeros(n)
+    r[seed] = 1.0
+    active = np.array([seed])
+    for _ in range(max_rounds):
+        active = active[r[active] >= threshold[active]]
+        if len(active) == 0:
+            break
+        mass = r[active]
+        r[active] = 0.0
+        p[active] += (1.0 - alpha) * mass
+        dangling = deg[active] == 0
+        if dangling.any():
+            r[seed] += alpha * mass[dangling].sum()
+        nbrs, owner = graph.gather(active[~dangling])
+        if len(nbrs):
+            share = alpha * mass[~dangling] / deg[active[~dangling]]
+            np.add.at(r, nbrs, np.repeat(share, deg[active[~dangling]]))
+        touched = np.concatenate([nbrs.astype(np.int64), [seed]])
+        active = np.unique(touched)
+    return p, r
+
+
+def monte_carlo(graph, seed, alpha=0.85, epsilon=1e-5, delta=0.01, rng=None):
+    """Estimate PPR from the end points of ``alpha``-terminated walks."""
+    rng = np.random.default_rng(rng)
+    n_walks = int(math.ceil(math.log(1.0 / delta) / epsilon))
+    deg = graph.out_degree
+    pos = np.full(n_walks, seed, dtype=np.int64)
+    counts = np.zeros(graph.n_nodes)
+    if graph.n_edges == 0:
+        # Every walk stays on (or jumps back to) the seed
+        counts[seed] = 1.0
+        return counts
+    while len(pos):
+        stop = rng.random(len(pos)) >= alpha
+        np.add.at(counts, pos[stop], 1.0)
+        pos = pos[~stop]
+        d = deg[pos]
+        step = graph.indptr[pos] + (rng.random(len(pos)) * d).astype(np.int64)
+        pos = np.where(d > 0, graph.indices[np.minimum(step, graph.n_edges - 1)], seed)
+    return counts / n_walks
+
+
+def _top_k(scores, k, exclude=None):
+    scores = scores.copy()
+    if exclude is not None:
+        scores[exclude] = 0.0
+    nz = np.flatnonzero(scores > 0)
+    if len(nz) > k:
+        nz = nz[np.argpartition(scores[nz], -k)[-k:]]
+    order = nz[np.argsort(-scores[nz], kind="stable")]
+    return order, scores[order]
+
+
+def ppr_top_k(graph, seed, k=20, alpha=0.85, epsilon=1e-5, method="push",
+              include_seed=False, rng=0):
+    """Top-``k`` PPR scores for compact node ``seed``.
+
+    Returns ``(nodes, scores)`` as compact indices sorted by score.
+    """
+    if method == "push":
+        scores, _ = forward_push(graph, seed, alpha=alpha, epsilon=epsilon)
+    elif method == "montecarlo":
+        scores = monte_carlo(graph, seed, alpha=alpha, epsilon=epsilon, rng=rng)
+    else:
+        raise ValueError(f"method must be 'push' or 'montecarlo', got {method!r}")
+    return _top_k(scores, k, exclude=None if include_seed else seed)
+
+
+def _ppr_chunk(graph, seeds, **kwargs):
+    return [ppr_top_k(graph, int(s), **kwargs) for s in seeds]
+
+
+def ppr_batch(graph, seeds, k=20, alpha=0.85, epsilon=1e-5, method="push",
+              direction="out", workers=None):
+    """Top-``k`` PPR for many seeds, spread over a process pool.
+
+    Returns ``{seed: (nodes, scores)}`` keyed by compact index.
+    """
+    walk_graph = graph.oriented(direction)
+    seeds = np.asarray(seeds, dtype=np.int64)
+    workers = parallel.DEFAULT_WORKERS if workers is None else workers
+    chunks = parallel.split(seeds, workers * 4)
+    results = parallel.map_chunks(_ppr_chunk, walk_graph, chunks, workers=workers,
+                                  k=k, alpha=alpha, epsilon=epsilon, method=method)
+    return {int(s): res for chunk, out in zip(chunks, results) for s, res in zip(chunk, out)}
+
+
+class PPRService:
+    """Per-query PPR with results memoised in a bounded LRU cache.
+
+    Cache keys start with ``fingerprint`` (the dataset's, see
+    ``Dataset.fingerprint``), so a cache shared between services never
+    serves results computed on another graph.
+    """
+
+    def __init__(self, graph, cache, fingerprint=None):
+        self.graph = graph
+        self.cache = cache
+        self.fingerprint = fingerprint
+
+    def query(self, node_id, k=20, alpha=0.85, epsilon=1e-5, method="push",
+              direction="out"):
+        """Top-``k`` PPR for an original node ID, as ``(node_ids, scores)``."""
+        seed = int(self.graph.index_of(node_id))
+        key = (self.fingerprint, seed, k, alpha, epsilon, method, direction)
+
+        def compute():
+            nodes, scores = ppr_top_k(self.graph.oriented(direction), seed, k=k,
+                                      alpha=alpha, epsilon=epsilon, method=method)
+            return self.graph.ids[nodes], scores
+
+        return self.cache.get_or_compute(key, compute)
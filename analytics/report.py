@@ -0,0 +1,382 @@
+"""Self-contained static HTML report of a dataset, computed in one batch run.
+
+Command line::
+
+    python -m analytics.report wiki-vote report.html
+    python -m analytics.report path/to/edges.txt report.html [--null 20] [--workers 4]
+
+The first argument is a dataset key of the registry or the path of any
+edge list (``src dst`` lines, or ``src dst sign`` lines with ``--signed``),
+which is registered on the fly and bundled under
+``<datasets>/.cache/<key>/`` like the others.
+
+Every number comes from the dataset's ``AnalyticsEngine``, the same one
+the dashboard and the notebook use.  The analyses the report needs are
+independent engine calls; ``warm`` runs them on a thread pool while the
+heavy kernels fan their own work out to the process pool
+(``analytics.parallel``), so BFS batches, rewirings and the NetworkX
+community search overlap.  The engine memoizes and persists the results,
+so the dashboard opens the same dataset warm afterwards.
+
+The sections are then rendered from the warm engine into one HTML file
+with inline CSS and inline SVG charts; it references no scripts, fonts or
+other files, so it can be mailed or archived as is.
+"""
+import argparse
+import html
+import io
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from matplotlib import rc_context
+from matplotlib.figure import Figure
+from networkx.algorithms.triads import TRIAD_NAMES
+
+from analytics import parallel
+from analytics.engine import get_engine, get_registry
+from analytics.landmarks import UNREACHABLE
+from analytics.significance import STATISTICS
+from analytics.signed import BALANCED, TRIAD_TYPES
+from analytics.triads import motif_counts
+
+TOP = 10
+MIN_VOTES = 10     # decisive votes received to enter the approval ranking
+
+CSS = """
+body { font-family: -apple-system, 'Segoe UI', Helvetica, Arial, sans-serif; color: #333;
+       max-width: 1100px; margin: 0 auto; padding: 24px; }
+h1 { color: #764ba2; margin-bottom: 4px; }
+h2 { color: #667eea; border-bottom: 2px solid #667eea; padding-bottom: 4px; margin-top: 40px; }
+.subtitle { color: #666; margin-top: 0; }
+.metrics { display: flex; flex-wrap: wrap; gap: 12px; }
+.metric { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white;
+          border-radius: 8px; padding: 12px 16px; min-width: 150px; }
+.metric .label { font-size: 12px; opacity: 0.85; }
+.metric .value { font-size: 22px; font-weight: 700; }
+.insight-box { background: #f0f4ff; border-left: 4px solid #667eea; padding: 12px 16px;
+               border-radius: 4px; margin: 16px 0; }
+.columns { display: flex; flex-wrap: wrap; gap: 24px; }
+.columns > div { flex: 1; min-width: 300px; }
+table { border-collapse: collapse; margin: 8px 0; font-size: 14px; }
+th, td { border: 1px solid #ddd; padding: 4px 10px; text-align: right; }
+th { background: #f5f5f5; }
+td:first-child, th:first-child { text-align: left; }
+footer { color: #999; font-size: 12px; margin-top: 40px; }
+"""
+
+
+# ----------------------------------------------------------------------
+# Parallel computation
+# ----------------------------------------------------------------------
+def jobs(engine, n_null=20, triad_fraction=1.0):
+    """Independent engine calls behind the report sections, by name."""
+    work = {
+        "centrality": engine.centrality,
+        "components": lambda: (engine.component_sizes("weak"), engine.component_sizes("strong")),
+        "clustering": lambda: (engine.transitivity(), engine.average_clustering()),
+        "triad census": lambda: engine.triad_census(triad_fraction),
+        "distances": lambda: _extremal_distances(engine),
+        "degree correlations": engine.degree_correlations,
+        "communities": engine.communities,
+    }
+    if n_null:
+        work["null models"] = lambda: engine.null_ensemble(n_null)
+    if engine.compact.is_signed:
+        work["structural balance"] = engine.balance_census
+    return work
+
+
+def warm(engine, work, workers=parallel.DEFAULT_WORKERS):
+    """Run every job of ``work`` on ``workers`` threads; seconds taken per job."""
+    engine.compact  # load the dataset once, before the threads race for it
+
+    def run(item):
+        name, job = item
+        start = time.perf_counter()
+        job()
+        return name, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return dict(pool.map(run, work.items()))
+
+
+# ----------------------------------------------------------------------
+# HTML building blocks
+# ----------------------------------------------------------------------
+def _fmt(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, np.integer)):
+        return f"{value:,}"
+    if not np.isfinite(value):
+        return "–"
+    return f"{value:,.4f}" if abs(value) < 1000 else f"{value:,.0f}"
+
+
+def _metrics(items):
+    cards = "".join(f"<div class='metric'><div class='label'>{html.escape(label)}</div>"
+                    f"<div class='value'>{html.escape(_fmt(value))}</div></div>" for label, value in items)
+    return f"<div class='metrics'>{cards}</div>"
+
+
+def _table(headers, rows):
+    head = "".join(f"<th>{html.escape(h)}</th>" for h in headers)
+    body = "".join("<tr>" + "".join(f"<td>{html.escape(_fmt(v))}</td>" for v in row) + "</tr>" for row in rows)
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def _insight(text):
+    return f"<div class='insight-box'>{text}</div>"
+
+
+def _columns(*blocks):
+    return "<div class='columns'>" + "".join(f"<div>{b}</div>" for b in blocks) + "</div>"
+
+
+def _svg(fig):
+    # matplotlib's object API (no pyplot), so rendering needs no GUI backend; text
+    # stays text instead of glyph paths whose ids would clash between charts
+    buf = io.StringIO()
+    with rc_context({"svg.fonttype": "none"}):
+        fig.savefig(buf, format="svg", bbox_inches="tight")
+    svg = buf.getvalue()
+    return svg[svg.index("<svg"):]
+
+
+def _ranking(engine, title, scores, header):
+    ids, values = engine.top(scores, TOP)
+    rows = [(str(rank), str(node), value) for rank, (node, value) in enumerate(zip(ids, values), start=1)]
+    return f"<h3>{html.escape(title)}</h3>" + _table(["Rank", "User ID", header], rows)
+
+
+# ----------------------------------------------------------------------
+# Sections
+# ----------------------------------------------------------------------
+def _overview(engine, options):
+    s = engine.summary
+    weak, strong = engine.component_sizes("weak"), engine.component_sizes("strong")
+    giant_weak = int(weak[0]) if len(weak) else 0
+    giant_strong = int(strong[0]) if len(strong) else 0
+    verdict = "very sparse, as social networks typically are" if s.density < 0.05 else "dense"
+    return _metrics([
+        ("Users", s.nodes), ("Votes", s.edges), ("Density", s.density),
+        ("Reciprocity", f"{s.reciprocity * 100:.2f}%"), ("Average degree (in + out)", s.mean_degree),
+        ("Silent voters", s.zero_in_degree), ("Self-loops", int(s.self_loops)),
+    ]) + _table(["Connectivity", "Components", "Giant component", "Share of users"], [
+        ("Weak", len(weak), giant_weak, f"{giant_weak / max(s.nodes, 1):.1%}"),
+        ("Strong", len(strong), giant_strong, f"{giant_strong / max(s.nodes, 1):.1%}"),
+    ]) + _insight(f"The network is <strong>{verdict}</strong>: {s.edges:,} of "
+                  f"{s.nodes * (s.nodes - 1):,} possible votes were cast.")
+
+
+def _degrees(engine, options):
+    cg = engine.compact
+    fig = Figure(figsize=(7, 4))
+    ax = fig.subplots()
+    for degree, label, color in ((cg.in_degree, "In-degree (votes received)", "#667eea"),
+                                 (cg.out_degree, "Out-degree (votes cast)", "#764ba2")):
+        values, counts = np.unique(degree[degree > 0], return_counts=True)
+        ax.scatter(values, counts, s=10, alpha=0.6, color=color, label=label)
+    ax.set_xscale("log")
+    ax.set_yscale("log")
+    ax.set_xlabel("Degree (log scale)")
+    ax.set_ylabel("Users (log scale)")
+    ax.set_title("Degree Distribution")
+    ax.legend()
+    return _columns(_ranking(engine, f"Top {TOP} Most Voted Users", cg.in_degree, "Votes Received"),
+                    _ranking(engine, f"Top {TOP} Most Active Voters", cg.out_degree, "Votes Cast")) + _svg(fig)
+
+
+def _structure(engine, options):
+    transitivity, avg_clustering = engine.transitivity(), engine.average_clustering()
+    census = engine.triad_census(options["triad_fraction"])
+    correlations = engine.degree_correlations()
+    pairs = [(x, y) for x in ("out", "in") for y in ("out", "in")]
+    k, knn = correlations.knn("out", "in")
+    fig = Figure(figsize=(7, 4))
+    ax = fig.subplots()
+    if len(k):
+        ax.scatter(k, knn, s=10, alpha=0.6, color="#667eea")
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+    ax.set_xlabel("Out-degree of voter (log scale)")
+    ax.set_ylabel("Mean in-degree of candidates (log scale)")
+    ax.set_title(f"k_nn(k), out → in (r = {correlations.coefficient('out', 'in'):.3f})")
+    return _metrics([
+        ("Reciprocity", engine.summary.reciprocity), ("Transitivity", transitivity),
+        ("Average clustering", avg_clustering),
+    ]) + _columns(
+        "<h3>Triad Census</h3>" + _table(["Type", "Count"], [(name, float(c)) for name, c in zip(TRIAD_NAMES, census.counts)]),
+        "<h3>Motifs</h3>" + _table(["Motif", "Count"], list(motif_counts(census).items()))
+        + "<h3>Degree Assortativity</h3>"
+        + _table(["Voter degree", "Candidate degree", "r"],
+                 [(x, y, correlations.coefficient(x, y)) for x, y in pairs]),
+    ) + _svg(fig)
+
+
+def _extremal_distances(engine):
+    """``engine.extremal_distances()``, or ``None`` when hops overflow the uint8 oracle."""
+    try:
+        return engine.extremal_distances()
+    except ValueError:
+        return None
+
+
+def _distances(engine, options):
+    extremes = _extremal_distances(engine)
+    if extremes is None:
+        return _insight(f"Skipped: the giant component has shortest paths of {UNREACHABLE} hops or more, "
+                        f"beyond the uint8 landmark index.")
+    diameter, radius, n_bfs = extremes
+    oracle = engine.distance_oracle()
+    avg, half, n_sources = oracle.average_distance()
+    giant = int(oracle.giant.sum())
+    log_n = math.log(giant) if giant > 1 else 0.0
+    verdict = "a small world" if avg <= log_n else "a large world"
+    return _metrics([
+        ("Diameter", int(diameter)), ("Radius", int(radius)),
+        ("Average path length", f"{avg:.2f} ± {half:.2f}"), ("log N", log_n),
+    ]) + _insight(f"Over the giant component of the undirected view ({giant:,} users), the average path "
+                  f"({n_sources} sampled sources, 95% interval) is {'below' if avg <= log_n else 'above'} "
+                  f"log N, so the network is <strong>{verdict}</strong>. Diameter and radius are exact "
+                  f"({oracle.n_landmarks} landmark BFS + {n_bfs} extra).")
+
+
+def _centrality(engine, options):
+    columns = engine.centrality()
+    rankings = [
+        ("Top PageRank (Influence)", columns["pagerank"], "PageRank"),
+        ("Top Betweenness (Brokers)", columns["betweenness"], "Betweenness"),
+        ("Top Authorities (HITS)", columns["authority"], "Authority"),
+        ("Top Hubs (HITS)", columns["hub"], "Hub"),
+        ("Top Harmonic Centrality (Reach)", columns["harmonic"], "Harmonic"),
+    ]
+    if "approval" in columns:
+        rankings.append(("Top Net PageRank (Support minus Opposition)", columns["net_pagerank"], "Net PageRank"))
+    blocks = [_ranking(engine, title, scores, header) for title, scores, header in rankings]
+    return _insight("Betweenness uses 1,000 sampled sources and closeness / harmonic centrality 256, "
+                    "as in the dashboard.") + _columns(*blocks)
+
+
+def _communities(engine, options):
+    report = engine.communities()
+    order = np.argsort(-report.size, kind="stable")[:TOP]
+    rows = [(str(rank), int(report.size[c]), float(report.density[c]), float(report.conductance[c]),
+             float(report.reciprocity[c]), ", ".join(str(m) for m in report.top_members[c] if m >= 0))
+            for rank, c in enumerate(order, start=1)]
+    fig = Figure(figsize=(7, 3))
+    ax = fig.subplots()
+    ax.bar(range(1, len(order) + 1), report.size[order], color="#764ba2")
+    ax.set_xlabel("Community (by size)")
+    ax.set_ylabel("Users")
+    ax.set_title("Largest Communities")
+    return _metrics([("Communities", report.n_communities), ("Modularity", report.modularity)]) \
+        + _table(["#", "Users", "Density", "Conductance", "Reciprocity", "Top members"], rows) + _svg(fig)
+
+
+def _significance(engine, options):
+    ensemble = engine.null_ensemble(options["n_null"])
+    rows = [(name, float(o), float(m), float(sd), float(z), float(p))
+            for name, o, m, sd, z, p in zip(STATISTICS, ensemble.observed, ensemble.mean, ensemble.std,
+                                            ensemble.z, ensemble.p_value)]
+    return _insight(f"Each statistic against {ensemble.n_null} degree-preserving rewirings "
+                    f"({ensemble.swaps_per_edge} swaps per edge); the smallest possible p-value is "
+                    f"{1 / (1 + ensemble.n_null):.3f}.") \
+        + _table(["Statistic", "Observed", "Random mean", "Random std", "z-score", "p-value"], rows)
+
+
+def _balance(engine, options):
+    votes, _, _ = engine.signed_scores()
+    census = engine.balance_census()
+    rows = [(t, int(c), float(e), "yes" if BALANCED[t] else "no")
+            for t, c, e in zip(TRIAD_TYPES, census.counts, census.expected)]
+    return _metrics([
+        ("Support votes", int(votes.received_support.sum())), ("Oppose votes", int(votes.received_oppose.sum())),
+        ("Balanced triangles", f"{census.balanced_fraction:.1%}"),
+    ]) + _table(["Triangle", "Observed", "Expected (shuffled)", "Balanced"], rows) \
+        + _ranking(engine, f"Top Approval (Share of Support, {MIN_VOTES}+ Decisive Votes)",
+                   votes.ratio * (votes.decisive_received >= MIN_VOTES), "Approval")
+
+
+SECTIONS = (
+    ("Overview", _overview),
+    ("Node Degrees", _degrees),
+    ("Social Structure", _structure),
+    ("Distances", _distances),
+    ("Centrality", _centrality),
+    ("Communities", _communities),
+    ("Null-Model Significance", _significance),
+    ("Structural Balance", _balance),
+)
+
+
+def render(engine, n_null=20, triad_fraction=1.0, timings=None):
+    """The report as one HTML string, from a (preferably warm) engine."""
+    ds = engine.dataset
+    options = {"n_null": n_null, "triad_fraction": triad_fraction}
+    parts = []
+    for title, section in SECTIONS:
+        if section is _significance and not n_null:
+            continue
+        if section is _balance and not engine.compact.is_signed:
+            continue
+        parts.append(f"<h2>{html.escape(title)}</h2>" + section(engine, options))
+    footer = ""
+    if timings:
+        footer = "Computed in parallel: " + ", ".join(f"{html.escape(name)} {seconds:.1f}s"
+                                                     for name, seconds in timings.items())
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(ds.name)} | Network Report</title>
+<style>{CSS}</style>
+</head>
+<body>
+<h1>{html.escape(ds.name)}</h1>
+<p class="subtitle">{html.escape(ds.description or os.path.basename(ds.path))}
+ &middot; generated {time.strftime("%Y-%m-%d %H:%M")}</p>
+{"".join(parts)}
+<footer>{footer}</footer>
+</body>
+</html>
+"""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a self-contained HTML report of a dataset.")
+    parser.add_argument("dataset", help="dataset key in the registry (e.g. wiki-vote) or path of an edge list")
+    parser.add_argument("out", help="HTML file to write")
+    parser.add_argument("--datasets", default="datasets", help="registry directory (default: %(default)s)")
+    parser.add_argument("--null", type=int, default=20,
+                        help="degree-preserving rewirings for the significance section, 0 to skip "
+                             "(default: %(default)s)")
+    parser.add_argument("--triad-fraction", type=float, default=1.0,
+                        help="share of nodes enumerating triangles in the triad census (default: %(default)s)")
+    parser.add_argument("--signed", action="store_true",
+                        help="read the third column of an edge-list path as vote signs (-1, 0 or 1)")
+    parser.add_argument("--workers", type=int, default=parallel.DEFAULT_WORKERS,
+                        help="analyses run at the same time (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    registry = get_registry(args.datasets)
+    key = args.dataset
+    if key not in registry.keys():
+        if not os.path.isfile(key):
+            parser.error(f"unknown dataset {key!r} and no such file; available: {', '.join(registry.keys())}")
+        key = registry.register(key, signed=args.signed)
+    start = time.perf_counter()
+    engine = get_engine(key, registry)
+    timings = warm(engine, jobs(engine, n_null=args.null, triad_fraction=args.triad_fraction), args.workers)
+    page = render(engine, n_null=args.null, triad_fraction=args.triad_fraction, timings=timings)
+    with open(args.out, "w", encoding="utf-8") as f:
+        f.write(page)
+    print(f"{engine.summary.nodes:,} nodes, {engine.summary.edges:,} edges: report written to {args.out} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
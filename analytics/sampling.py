@@ -0,0 +1,146 @@
+"""Representative node samples for drawing the network.
+
+All samplers work on the undirected view of a ``CompactGraph``, run in
+time linear in the edges they touch, and are deterministic for a given
+``seed``.  Each returns a sorted array of compact node indices; induce the
+subgraph on those nodes to draw it.
+
+* ``random_walk``: many restarting walkers advanced in lockstep.
+* ``forest_fire``: Leskovec-Faloutsos burning with forward probability
+  ``p_forward``; a fresh fire is lit whenever the current one dies out.
+* ``induced_edges``: TIES - nodes of uniformly sampled edges (the graph is
+  then drawn with every edge among them).
+* ``stratified``: proportional allocation over strata (log-binned degree by
+  default, or any labels such as communities) with every stratum
+  represented, so both hubs and the periphery appear.
+"""
+import numpy as np
+
+
+def _fill(chosen, size, n, rng):
+    # Top up with uniform nodes (e.g. when the walkers were trapped)
+    if len(chosen) < size:
+        rest = np.setdiff1d(np.arange(n), chosen)
+        extra = rng.choice(rest, size=min(size - len(chosen), len(rest)), replace=False)
+        chosen = np.concatenate([chosen, extra])
+    return np.sort(chosen)
+
+
+def random_walk(graph, size, seed=0, restart=0.15, walkers=32, max_steps=None):
+    g = graph.undirected
+    n = g.n_nodes
+    size = min(size, n)
+    rng = np.random.default_rng(seed)
+    deg = g.out_degree
+    starts = rng.choice(np.flatnonzero(deg > 0) if (deg > 0).any() else np.arange(n),
+                        size=walkers)
+    pos = starts.copy()
+    seen = np.zeros(n, dtype=bool)
+    seen[pos] = True
+    order = list(np.unique(pos))
+    max_steps = max_steps or 50 * size
+    for _ in range(max_steps):
+        if len(order) >= size:
+            break
+        jump = (rng.random(walkers) < restart) | (deg[pos] == 0)
+        step = g.indptr[pos] + (rng.random(walkers) * deg[pos]).astype(np.int64)
+        pos = np.where(jump, starts, g.indices[np.minimum(step, max(g.n_edges - 1, 0))])
+        new = np.unique(pos[~seen[pos]])
+        seen[new] = True
+        order.extend(new)
+    return _fill(np.array(order[:size], dtype=np.int64), size, n, rng)
+
+
+def forest_fire(graph, size, seed=0, p_forward=0.7):
+    g = graph.undirected
+    n = g.n_nodes
+    size = min(size, n)
+    rng = np.random.default_rng(seed)
+    burned = np.zeros(n, dtype=bool)
+    count = 0
+    frontier = np.empty(0, dtype=np.int64)
+    while count < size:
+        if not len(frontier):
+            # Light a new fire at an unburned node
+            start = rng.choice(np.flatnonzero(~burned))
+            burned[start] = True
+            count += 1
+            frontier = np.array([start])
+            continue
+        # Each burning node spreads to Geometric(1 - p) - 1 random neighbours
+        quota = rng.geometric(1.0 - p_forward, size=len(frontier)) - 1
+        nbrs, owner = g.gather(frontier)
+        fresh = ~burned[nbrs]
+        nbrs, owner = nbrs[fresh], owner[fresh]
+        limit = quota[np.searchsorted(frontier, owner)]
+        order = np.lexsort((rng.random(len(nbrs)), owner))
+        nbrs, owner, limit = nbrs[order], owner[order], limit[order]
+        first = np.r_[True, owner[1:] != owner[:-1]] if len(owner) else np.empty(0, dtype=bool)
+        rank = np.arange(len(owner)) - np.maximum.accumulate(np.where(first, np.arange(len(owner)), 0))
+        take = rank < limit
+        new = np.unique(nbrs[take])[:size - count]
+        burned[new] = True
+        count += len(new)
+        frontier = new.astype(np.int64)
+    return np.flatnonzero(burned)
+
+
+def induced_edges(graph, size, seed=0):
+    g = graph.undirected
+    n = g.n_nodes
+    size = min(size, n)
+    rng = np.random.default_rng(seed)
+    seen = np.zeros(n, dtype=bool)
+    order = []
+    remaining = size
+    while remaining > 0 and g.n_edges:
+        picks = rng.integers(0, g.n_edges, size=max(remaining, 16))
+        src = np.searchsorted(g.indptr, picks, side="right") - 1
+        ends = np.column_stack([src, g.indices[picks]]).ravel()
+        # Keep first appearances, in sampling order
+        _, first = np.unique(ends, return_index=True)
+        ends = ends[np.sort(first)]
+        ends = ends[~seen[ends]][:remaining]
+        seen[ends] = True
+        order.extend(ends)
+        remaining = size - len(order)
+    return _fill(np.array(order, dtype=np.int64), size, n, rng)
+
+
+def degree_strata(graph):
+    """Log2 bins of total degree (0 = isolated)."""
+    deg = graph.in_degree + graph.out_degree
+    return np.where(deg > 0, np.floor(np.log2(np.maximum(deg, 1))).astype(np.int64) + 1, 0)
+
+
+def stratified(graph, size, seed=0, strata=None):
+    n = graph.n_nodes
+    size = min(size, n)
+    rng = np.random.default_rng(seed)
+    strata = degree_strata(graph) if strata is None else np.asarray(strata)
+    _, labels = np.unique(strata, return_inverse=True)
+    counts = np.bincount(labels)
+    # Proportional allocation, but at least one node per stratum
+    alloc = np.maximum(np.floor(counts * size / n).astype(np.int64), 1)
+    alloc = np.minimum(alloc, counts)
+    while alloc.sum() > size:
+        alloc[np.argmax(alloc)] -= 1
+    spare = size - alloc.sum()
+    if spare > 0:
+        room = counts - alloc
+        extra = np.floor(room * spare / max(room.sum(), 1)).astype(np.int64)
+        extra[np.argsort(-room)[:spare - extra.sum()]] += 1
+        alloc += np.minimum(extra, room)
+    order = np.lexsort((rng.random(n), labels))
+    group_start = np.r_[0, np.cumsum(counts)[:-1]]
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n) - np.repeat(group_start, counts)
+    return np.flatnonzero(rank < alloc[labels])
+
+
+SAMPLERS = {
+    "Random walk": random_walk,
+    "Forest fire": forest_fire,
+    "Induced edges": induced_edges,
+    "Stratified by degree": stratified,
+}
@@ -0,0 +1,192 @@
+"""Zero-copy sharing of ``CompactGraph`` arrays with worker processes.
+
+``share(graph)`` places the graph's arrays (ids, CSR offsets and indices,
+in/out degree, vote signs when present, plus any derived ``reverse`` / ``undirected`` views already
+built) in ``multiprocessing.shared_memory`` segments and returns a small
+picklable ``GraphHandle``.  Arrays that are already memory-mapped files
+(see ``CompactGraph.load``) are referenced by path instead of copied.
+``attach(handle)`` rebuilds the graph in a worker on top of those buffers
+without copying, and caches it for the worker's lifetime.
+
+Segments belong to the process that called ``share``: they are unlinked
+when the graph is garbage collected, by ``release``, or at interpreter
+exit.  If that process dies without running any of these (a crashed or
+killed Streamlit server), the multiprocessing resource tracker, which
+outlives it, unlinks every segment still registered.  Workers share the
+parent's resource tracker, so a crashing worker leaves nothing behind
+either.
+"""
+import atexit
+import threading
+import uuid
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from analytics.graph import CompactGraph
+
+_ARRAYS = ("ids", "indptr", "indices", "out_degree", "in_degree")
+_VIEWS = ("reverse", "undirected")
+
+
+@dataclass(frozen=True)
+class ArraySpec:
+    kind: str            # "shm" or "file"
+    name: str            # segment name or file path
+    shape: tuple
+    dtype: str
+    offset: int = 0
+
+
+@dataclass(frozen=True)
+class GraphHandle:
+    token: str
+    arrays: dict
+    views: dict = field(default_factory=dict)
+
+
+# ----------------------------------------------------------------------
+# Owner side
+# ----------------------------------------------------------------------
+class _Owned:
+    """Segments holding one graph's arrays in the sharing process."""
+
+    def __init__(self, graph):
+        self.token = uuid.uuid4().hex[:12]
+        self.segments = []
+        self.specs = {}
+        for name in _ARRAYS:
+            self.specs[name] = self._export(name, getattr(graph, name))
+        if graph.is_signed:
+            self.specs["signs"] = self._export("signs", graph.signs)
+
+    def _export(self, name, arr):
+        if isinstance(arr, np.memmap) and arr.filename and arr.flags.c_contiguous:
+            return ArraySpec("file", arr.filename, arr.shape, arr.dtype.str, int(arr.offset))
+        seg = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1),
+                                         name=f"wv_{self.token}_{name}")
+        arr = np.ascontiguousarray(arr)
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=seg.buf)[...] = arr
+        self.segments.append(seg)
+        return ArraySpec("shm", seg.name, arr.shape, arr.dtype.str)
+
+    @property
+    def nbytes(self):
+        return sum(seg.size for seg in self.segments)
+
+    def close(self):
+        for seg in self.segments:
+            try:
+                seg.close()
+                seg.unlink()
+            except FileNotFoundError:
+                pass
+        self.segments = []
+
+
+_owned = {}
+_lock = threading.Lock()
+
+
+def _forget(key):
+    with _lock:
+        owned = _owned.pop(key, None)
+    if owned is not None:
+        owned.close()
+
+
+def share(graph):
+    """Handle for ``graph``; its arrays are copied into shared memory once."""
+    key = id(graph)
+    with _lock:
+        owned = _owned.get(key)
+        if owned is None:
+            owned = _owned[key] = _Owned(graph)
+            weakref.finalize(graph, _forget, key)
+    views = {name: share(graph.__dict__[name]) for name in _VIEWS
+             if name in graph.__dict__ and graph.__dict__[name] is not graph}
+    return GraphHandle(owned.token, owned.specs, views)
+
+
+def release(graph):
+    """Unlink the segments of ``graph`` (and of its shared views) now."""
+    for name in _VIEWS:
+        if name in graph.__dict__ and graph.__dict__[name] is not graph:
+            release(graph.__dict__[name])
+    _forget(id(graph))
+
+
+def shared_bytes():
+    with _lock:
+        return sum(o.nbytes for o in _owned.values())
+
+
+@atexit.register
+def _release_all():
+    for key in list(_owned):
+        _forget(key)
+
+
+# ----------------------------------------------------------------------
+# Worker side
+# ----------------------------------------------------------------------
+_attached = OrderedDict()
+_MAX_ATTACHED = 16
+
+
+def _import(spec, keep):
+    if spec.kind == "file":
+        if not int(np.prod(spec.shape)):
+            return np.empty(spec.shape, dtype=spec.dtype)
+        return np.memmap(spec.name, dtype=spec.dtype, mode="r", offset=spec.offset, shape=spec.shape)
+    seg = shared_memory.SharedMemory(name=spec.name)
+    keep.append(seg)
+    arr = np.ndarray(spec.shape, dtype=spec.dtype, buffer=seg.buf)
+    arr.flags.writeable = False
+    return arr
+
+
+def attach(handle):
+    """``CompactGraph`` backed by the shared buffers of ``handle`` (cached)."""
+    if handle.token in _attached:
+        _attached.move_to_end(handle.token)
+        graph = _attached[handle.token][0]
+    else:
+        keep = []
+        arrays = {name: _import(spec, keep) for name, spec in handle.arrays.items()}
+        graph = CompactGraph(ids=arrays["ids"], indptr=arrays["indptr"], indices=arrays["indices"],
+                             signs=arrays.get("signs"))
+        graph.__dict__["out_degree"] = arrays["out_degree"]
+        graph.__dict__["in_degree"] = arrays["in_degree"]
+        _attached[handle.token] = (graph, keep)
+        while len(_attached) > _MAX_ATTACHED:
+            old_graph, old_keep = _attached.popitem(last=False)[1]
+            del old_graph
+            for seg in old_keep:
+                try:
+                    seg.close()
+                except BufferError:
+                    pass
+    for name, view in handle.views.items():
+        graph.__dict__[name] = attach(view)
+    return graph
+
+
+def share_obj(obj):
+    """``share`` every ``CompactGraph`` inside ``obj`` (a graph or tuple of them)."""
+    if isinstance(obj, CompactGraph):
+        return share(obj)
+    if isinstance(obj, tuple):
+        return tuple(share_obj(o) for o in obj)
+    return obj
+
+
+def attach_obj(obj):
+    if isinstance(obj, GraphHandle):
+        return attach(obj)
+    if isinstance(obj, tuple):
+        return tuple(attach_obj(o) for o in obj)
+    return obj
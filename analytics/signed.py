@@ -0,0 +1,193 @@
+"""Signed votes: approval ratios, signed PageRank and structural balance.
+
+Everything here reads the ``int8`` ``CompactGraph.signs`` array (+1
+support, -1 oppose, 0 neutral) next to the CSR, so no per-edge Python
+objects are created:
+
+* ``approval`` counts support / oppose / neutral votes cast and received
+  per user with ``np.bincount`` over edge blocks; the approval ratio is
+  support over decisive (non-neutral) votes received.
+* ``signed_pagerank`` runs ``centrality.pagerank`` on the support-only or
+  oppose-only subgraph ("positive" / "negative"), or returns their
+  difference ("net"): prestige earned from support minus prestige lost to
+  opposition.
+* ``balance_census`` classifies undirected triangles by sign.  A pair's
+  sign is the sign of the sum of its votes in both directions (pairs that
+  cancel out, or only cast neutral votes, are left out).  With ``P`` and
+  ``N`` the symmetric support / oppose adjacencies, the four triangle
+  types are the masked products ``P o P^2 / 6`` (+++), ``N o P^2 / 2``
+  (++-), ``P o N^2 / 2`` (+--) and ``N o N^2 / 6`` (---), summed one block
+  of rows at a time.  Structural balance theory calls +++ and +-- balanced
+  ("the enemy of my enemy is my friend"); the counts are compared with
+  those expected if the same signs were shuffled over the same triangles.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.sparse as sps
+
+from analytics.centrality import pagerank
+from analytics.graph import BLOCK_NNZ, CompactGraph
+
+SIGNED_PAGERANK = ("positive", "negative", "net")
+TRIAD_TYPES = ("+++", "++-", "+--", "---")
+BALANCED = {"+++": True, "++-": False, "+--": True, "---": False}
+
+
+def _require_signs(graph):
+    if not graph.is_signed:
+        raise ValueError("This analysis needs a signed graph (an edge list with a 'sign' column)")
+
+
+def _sign_blocks(graph, block_nnz):
+    """``(src, dst, sign)`` arrays covering the edges in CSR order."""
+    lo = 0
+    for src, dst in graph.iter_edge_blocks(block_nnz):
+        yield src, dst, np.asarray(graph.signs[lo:lo + len(dst)])
+        lo += len(dst)
+
+
+# ----------------------------------------------------------------------
+# Approval
+# ----------------------------------------------------------------------
+@dataclass(eq=False)
+class Approval:
+    received_support: np.ndarray
+    received_oppose: np.ndarray
+    received_neutral: np.ndarray
+    cast_support: np.ndarray
+    cast_oppose: np.ndarray
+    cast_neutral: np.ndarray
+
+    @property
+    def decisive_received(self):
+        return self.received_support + self.received_oppose
+
+    @property
+    def ratio(self):
+        """Share of support among the decisive votes received (0 with none)."""
+        decisive = self.decisive_received
+        return np.divide(self.received_support, decisive, out=np.zeros(len(decisive)),
+                         where=decisive > 0)
+
+    @property
+    def support_given(self):
+        """Share of support among the decisive votes cast (0 with none)."""
+        decisive = self.cast_support + self.cast_oppose
+        return np.divide(self.cast_support, decisive, out=np.zeros(len(decisive)),
+                         where=decisive > 0)
+
+
+def approval(graph, block_nnz=BLOCK_NNZ):
+    """Per-user ``Approval`` counts of a signed graph."""
+    _require_signs(graph)
+    n = graph.n_nodes
+    counts = {key: np.zeros(n, dtype=np.int64)
+              for key in ("received_support", "received_oppose", "cast_support", "cast_oppose")}
+    for src, dst, sign in _sign_blocks(graph, block_nnz):
+        support, oppose = sign > 0, sign < 0
+        counts["received_support"] += np.bincount(dst[support], minlength=n)
+        counts["received_oppose"] += np.bincount(dst[oppose], minlength=n)
+        counts["cast_support"] += np.bincount(src[support], minlength=n)
+        counts["cast_oppose"] += np.bincount(src[oppose], minlength=n)
+    return Approval(
+        received_neutral=graph.in_degree - counts["received_support"] - counts["received_oppose"],
+        cast_neutral=graph.out_degree - counts["cast_support"] - counts["cast_oppose"],
+        **counts,
+    )
+
+
+# ----------------------------------------------------------------------
+# Signed PageRank
+# ----------------------------------------------------------------------
+def sign_subgraph(graph, sign):
+    """Unsigned ``CompactGraph`` of the edges whose sign is ``sign`` (same ``ids``)."""
+    _require_signs(graph)
+    src, dst = graph.edges()
+    keep = np.asarray(graph.signs) == sign
+    indptr = np.zeros(graph.n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src[keep], minlength=graph.n_nodes), out=indptr[1:])
+    return CompactGraph(ids=graph.ids, indptr=indptr, indices=np.asarray(dst[keep]))
+
+
+def signed_pagerank(graph, variant="net", alpha=0.85, tol=1e-6, max_iter=100):
+    """PageRank over support votes, oppose votes, or their difference.
+
+    ``"positive"`` and ``"negative"`` are ordinary PageRank vectors of the
+    support-only and oppose-only subgraphs; ``"net"`` is positive minus
+    negative, so it ranges over ``[-1, 1]`` and sums to zero.
+    """
+    if variant not in SIGNED_PAGERANK:
+        raise ValueError(f"variant must be one of {SIGNED_PAGERANK}, got {variant!r}")
+    if variant == "net":
+        return (signed_pagerank(graph, "positive", alpha, tol, max_iter)
+                - signed_pagerank(graph, "negative", alpha, tol, max_iter))
+    sub = sign_subgraph(graph, 1 if variant == "positive" else -1)
+    return pagerank(sub, alpha=alpha, tol=tol, max_iter=max_iter)
+
+
+# ----------------------------------------------------------------------
+# Structural balance
+# ----------------------------------------------------------------------
+@dataclass(eq=False)
+class BalanceCensus:
+    counts: np.ndarray          # triangles per TRIAD_TYPES entry
+    expected: np.ndarray        # same, with pair signs shuffled
+    positive_pairs: int
+    negative_pairs: int
+
+    @property
+    def triangles(self):
+        return int(self.counts.sum())
+
+    @property
+    def balanced_fraction(self):
+        balanced = np.array([BALANCED[t] for t in TRIAD_TYPES])
+        return float(self.counts[balanced].sum() / self.triangles) if self.triangles else 0.0
+
+    def as_dict(self):
+        return {t: int(c) for t, c in zip(TRIAD_TYPES, self.counts)}
+
+
+def _pair_signs(graph):
+    """Symmetric 0/1 support and oppose adjacencies of the undirected pairs."""
+    n = graph.n_nodes
+    src, dst = graph.edges()
+    sign = np.asarray(graph.signs).astype(np.int64)
+    keep = src != dst
+    src, dst, sign = src[keep].astype(np.int64), np.asarray(dst[keep], dtype=np.int64), sign[keep]
+    lo, hi = np.minimum(src, dst), np.maximum(src, dst)
+    keys, inverse = np.unique(lo * max(n, 1) + hi, return_inverse=True)
+    pair = np.sign(np.bincount(inverse, weights=sign, minlength=len(keys)))
+    a, b = keys // max(n, 1), keys % max(n, 1)
+
+    def sym(mask):
+        rows = np.concatenate([a[mask], b[mask]])
+        cols = np.concatenate([b[mask], a[mask]])
+        return sps.csr_matrix((np.ones(len(rows), dtype=np.int64), (rows, cols)), shape=(n, n))
+
+    return sym(pair > 0), sym(pair < 0)
+
+
+def _masked_sum(mask, left, right, block_rows):
+    """``sum(mask o (left @ right))`` computed one block of rows at a time."""
+    total = 0
+    for lo in range(0, mask.shape[0], block_rows):
+        total += int((left[lo:lo + block_rows] @ right).multiply(mask[lo:lo + block_rows]).sum())
+    return total
+
+
+def balance_census(graph, block_rows=4096):
+    """``BalanceCensus`` of the undirected signed triangles of ``graph``."""
+    _require_signs(graph)
+    P, N = _pair_signs(graph)
+    counts = np.array([
+        _masked_sum(P, P, P, block_rows) // 6,
+        _masked_sum(N, P, P, block_rows) // 2,
+        _masked_sum(P, N, N, block_rows) // 2,
+        _masked_sum(N, N, N, block_rows) // 6,
+    ], dtype=np.int64)
+    n_pos, n_neg = P.nnz // 2, N.nnz // 2
+    p = n_pos / (n_pos + n_neg) if n_pos + n_neg else 0.0
+    expected = counts.sum() * np.array([p ** 3, 3 * p ** 2 * (1 - p), 3 * p * (1 - p) ** 2, (1 - p) ** 3])
+    return BalanceCensus(counts=counts, expected=expected, positive_pairs=n_pos, negative_pairs=n_neg)
@@ -0,0 +1,75 @@
+"""Sparse matrix-vector products and power iteration over a ``CompactGraph``.
+
+``SparseOperator`` exposes ``A @ x`` and ``A.T @ x`` for the adjacency
+matrix ``A`` (``A[i, j] = 1`` for a vote ``i -> j``).  The CSR arrays are
+walked in row blocks of at most ``block_nnz`` edges, so the same kernel
+serves graphs held in memory and graphs whose arrays are memory-mapped.
+PageRank and HITS are both written against this operator and share
+``power_iteration`` for convergence handling.
+"""
+import networkx as nx
+import numpy as np
+import scipy.sparse as sps
+
+from analytics.graph import BLOCK_NNZ as DEFAULT_BLOCK_NNZ
+
+
+class SparseOperator:
+    def __init__(self, graph, block_nnz=DEFAULT_BLOCK_NNZ, cache_blocks=None):
+        self.graph = graph
+        self.shape = (graph.n_nodes, graph.n_nodes)
+        # Keep the scipy blocks around unless that would load a mapped graph
+        self.cache_blocks = not graph.is_mapped if cache_blocks is None else cache_blocks
+        self._blocks = self._plan(graph.indptr, block_nnz)
+        self._matrices = {}
+
+    @staticmethod
+    def _plan(indptr, block_nnz):
+        # Row boundaries so that each block holds at most ~block_nnz edges
+        n = len(indptr) - 1
+        targets = np.arange(block_nnz, int(indptr[-1]), block_nnz)
+        cuts = np.searchsorted(indptr, targets, side="right") - 1
+        bounds = np.unique(np.concatenate([[0], cuts, [n]]))
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def _block(self, start, stop):
+        mat = self._matrices.get(start)
+        if mat is None:
+            indptr = np.asarray(self.graph.indptr[start:stop + 1])
+            lo, hi = int(indptr[0]), int(indptr[-1])
+            indices = np.asarray(self.graph.indices[lo:hi])
+            mat = sps.csr_matrix((np.ones(hi - lo), indices, indptr - lo),
+                                 shape=(stop - start, self.shape[1]))
+            if self.cache_blocks:
+                self._matrices[start] = mat
+        return mat
+
+    def matvec(self, x):
+        """``A @ x``: for each node, the sum of ``x`` over its out-neighbours."""
+        y = np.empty(self.shape[0])
+        for start, stop in self._blocks:
+            y[start:stop] = self._block(start, stop) @ x
+        return y
+
+    def rmatvec(self, x):
+        """``A.T @ x``: for each node, the sum of ``x`` over its in-neighbours."""
+        y = np.zeros(self.shape[1])
+        for start, stop in self._blocks:
+            y += self._block(start, stop).T @ x[start:stop]
+        return y
+
+
+def power_iteration(step, x0, tol=1e-6, max_iter=100):
+    """Iterate ``x <- step(x)`` until the L1 change drops below ``n * tol``.
+
+    Returns ``(x, iterations)``; raises ``nx.PowerIterationFailedConvergence``
+    like the NetworkX solvers do.
+    """
+    x = x0
+    n = len(x0)
+    for i in range(1, max_iter + 1):
+        x_next = step(x)
+        if np.abs(x_next - x).sum() < n * tol:
+            return x_next, i
+        x = x_next
+    raise nx.PowerIterationFailedConvergence(max_iter)
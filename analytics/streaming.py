@@ -0,0 +1,455 @@
+"""Bounded-memory statistics of edge lists too large for the exact path.
+
+``stream_statistics`` reads the edge file a few times (``ingest``'s chunk
+parser) and never builds the graph:
+
+1. **Counting pass.**  Edges and self-loops are counted exactly.  Distinct
+   nodes and distinct vote receivers go into HyperLogLog sketches, and
+   in/out degrees into count-min sketches.  Degrees are also counted
+   exactly (sorted IDs + counts) for as long as that fits the budget.
+   Otherwise the degree distribution is estimated on a bottom-k hash
+   sample of nodes, queried against the count-min sketches.
+2. **Pair-sampling pass** (Doulion).  Each node pair is kept with
+   probability ``p`` by hashing it, so both directions of a vote are kept
+   or dropped together.  Reciprocated pairs in the sample give
+   reciprocity.  Triangles and wedges of the sample, scaled by ``p^-3`` and
+   ``p^-2``, give the triangle count and transitivity of the undirected
+   view, with the variance of Tsourakakis et al.:
+   ``T (p^-3 - 1) + 2 k (p^-1 - 1)``, where ``k`` counts triangle pairs
+   sharing an edge.
+3. **HyperANF passes**, only when the exact node index fits.  Every node
+   keeps a small HyperLogLog counter of the nodes within ``t`` hops, and
+   each pass over the edges merges neighbouring counters.  The summed
+   counts give the neighbourhood function, hence the average distance and
+   the effective diameter of the undirected view.  Error bars come from
+   independent register groups.
+
+Each result is an ``Estimate`` carrying a ``z``-level half-width (zero when
+exact).  ``exact_plan`` predicts, from the file size and a prefix, whether
+the exact NetworkX path would exceed ``EXACT_MAX_BYTES`` or
+``EXACT_MAX_SECONDS``.  Duplicate lines are assumed absent, as in SNAP
+edge lists.
+"""
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.sparse as sps
+
+from analytics.closeness import Z_95
+from analytics.ingest import DEFAULT_CHUNK_BYTES, iter_edge_chunks
+
+DEFAULT_BUDGET = int(os.environ.get("WIKIVOTE_STREAMING_MB", "256")) << 20
+EXACT_MAX_BYTES = int(os.environ.get("WIKIVOTE_EXACT_MAX_MB", "4096")) << 20
+EXACT_MAX_SECONDS = float(os.environ.get("WIKIVOTE_EXACT_MAX_SECONDS", "120"))
+
+# Cost model of the exact path (NetworkX DiGraph + clustering), fitted on Wiki-Vote
+_NX_BYTES_PER_NODE = 600
+_NX_BYTES_PER_EDGE = 250
+_SECONDS_PER_EDGE = 2e-5
+_SECONDS_PER_WEDGE = 1.8e-6
+
+_ANF_GROUPS = 4
+_ANF_MAX_HOPS = 64
+_PAIR_BUDGET = 1 << 22
+
+
+@dataclass(frozen=True)
+class Estimate:
+    value: float
+    error: float = 0.0      # half-width of the interval, 0 when exact
+
+    @property
+    def exact(self):
+        return self.error == 0
+
+    def scale(self, factor):
+        return Estimate(self.value * factor, self.error * factor)
+
+    def __format__(self, spec):
+        if self.exact:
+            return format(self.value, spec)
+        return f"{format(self.value, spec)} ± {format(self.error, spec)}"
+
+
+# ----------------------------------------------------------------------
+# Hashing and sketches
+# ----------------------------------------------------------------------
+def _hash(keys, seed=0):
+    """splitmix64 of integer keys, as uint64."""
+    with np.errstate(over="ignore"):
+        z = np.asarray(keys).astype(np.uint64) + np.uint64((0x9E3779B97F4A7C15 * (seed + 1)) % (1 << 64))
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def _hll_alpha(m):
+    return {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+
+
+def _hll_split(keys, b, seed):
+    """Register index and rank (leading zeros + 1) of each key."""
+    h = _hash(keys, seed)
+    idx = (h >> np.uint64(64 - b)).astype(np.int64)
+    rest = (h << np.uint64(b)) >> np.uint64(b)
+    # floor(log2) from the float exponent; rest == 0 gets the maximum rank
+    _, exp = np.frexp(rest.astype(np.float64))
+    rank = np.where(rest > 0, 64 - b - exp + 1, 64 - b + 1)
+    return idx, rank.astype(np.uint8)
+
+
+def _hll_count(registers):
+    """HyperLogLog estimate along the last axis (with linear counting for small sets)."""
+    m = registers.shape[-1]
+    raw = _hll_alpha(m) * m * m / np.sum(np.exp2(-registers.astype(np.float64)), axis=-1)
+    zeros = np.sum(registers == 0, axis=-1)
+    small = (raw <= 2.5 * m) & (zeros > 0)
+    linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where(small, linear, raw)
+
+
+class HyperLogLog:
+    def __init__(self, b=14, seed=0):
+        self.b = b
+        self.seed = seed
+        self.registers = np.zeros(1 << b, dtype=np.uint8)
+
+    def add(self, keys):
+        idx, rank = _hll_split(keys, self.b, self.seed)
+        np.maximum.at(self.registers, idx, rank)
+
+    @property
+    def rse(self):
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def count(self):
+        return float(_hll_count(self.registers))
+
+
+class CountMin:
+    """Count-min sketch: overestimates by at most ``epsilon * total`` w.p. ``1 - delta``."""
+
+    def __init__(self, width, depth=4, seed=0):
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.seed = seed
+        self.total = 0
+
+    @property
+    def epsilon(self):
+        return np.e / self.table.shape[1]
+
+    @property
+    def delta(self):
+        return np.exp(-self.table.shape[0])
+
+    def add(self, keys):
+        depth, width = self.table.shape
+        for r in range(depth):
+            self.table[r] += np.bincount((_hash(keys, self.seed + r) % np.uint64(width)).astype(np.int64),
+                                         minlength=width)
+        self.total += len(keys)
+
+    def query(self, keys):
+        depth, width = self.table.shape
+        return np.min([self.table[r][(_hash(keys, self.seed + r) % np.uint64(width)).astype(np.int64)]
+                       for r in range(depth)], axis=0)
+
+
+# ----------------------------------------------------------------------
+# Result
+# ----------------------------------------------------------------------
+@dataclass
+class StreamingStats:
+    edges: int
+    self_loops: int
+    nodes: Estimate
+    zero_in_degree: Estimate
+    max_in_degree: Estimate
+    max_out_degree: Estimate
+    degree_sample: np.ndarray   # total degree of every node, or of a node sample
+    degree_error: float         # count-min half-width of each sampled degree (0 = exact)
+    sample_fraction: float
+    reciprocity: Estimate
+    triangles: Estimate
+    transitivity: Estimate
+    neighbourhood: np.ndarray = None     # pairs within t hops, t = 0, 1, ...
+    avg_distance: Estimate = None
+    effective_diameter: Estimate = None
+    passes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def density(self):
+        n = self.nodes.value
+        value = self.edges / (n * (n - 1)) if n > 1 else 0.0
+        return Estimate(value, value * self.nodes.error / n * 2 if n > 1 else 0.0)
+
+    @property
+    def mean_degree(self):
+        n = self.nodes.value
+        value = 2 * self.edges / n if n else 0.0
+        return Estimate(value, value * self.nodes.error / n if n else 0.0)
+
+
+# ----------------------------------------------------------------------
+# Passes
+# ----------------------------------------------------------------------
+def _accumulate(ids, counts, new_ids, keys, values):
+    """``counts`` over ``ids`` moved onto ``new_ids`` (a superset), plus ``values`` at ``keys``."""
+    out = np.zeros(len(new_ids), dtype=np.int64)
+    out[np.searchsorted(new_ids, ids)] = counts
+    out[np.searchsorted(new_ids, keys)] += values
+    return out
+
+
+def _counting_pass(path, budget, seed, chunk_bytes, sample_nodes):
+    state = {
+        "edges": 0, "self_loops": 0,
+        "hll_all": HyperLogLog(seed=seed), "hll_dst": HyperLogLog(seed=seed),
+        # Two sketches of depth 4, an eighth of the budget
+        "cm_out": CountMin(max(1024, budget // 8 // 64), seed=seed),
+        "cm_in": CountMin(max(1024, budget // 8 // 64), seed=seed + 100),
+        "ids": np.empty(0, dtype=np.int64), "out_degree": np.empty(0, dtype=np.int64),
+        "in_degree": np.empty(0, dtype=np.int64),
+        "sample": np.empty(0, dtype=np.int64), "heavy": np.empty(0, dtype=np.int64),
+    }
+    for rows in iter_edge_chunks(path, chunk_bytes):
+        src, dst = rows[:, 0], rows[:, 1]
+        state["edges"] += len(src)
+        state["self_loops"] += int((src == dst).sum())
+        for sketch, keys in ((state["hll_all"], src), (state["hll_all"], dst), (state["hll_dst"], dst),
+                             (state["cm_out"], src), (state["cm_in"], dst)):
+            sketch.add(keys)
+        u_src, c_src = np.unique(src, return_counts=True)
+        u_dst, c_dst = np.unique(dst, return_counts=True)
+        seen = np.union1d(u_src, u_dst)
+        # Exact degrees while three int64 arrays per node fit half the budget
+        if state["ids"] is not None:
+            ids = np.union1d(state["ids"], seen)
+            if 24 * len(ids) > budget // 2:
+                state["ids"] = state["out_degree"] = state["in_degree"] = None
+            else:
+                state["out_degree"] = _accumulate(state["ids"], state["out_degree"], ids, u_src, c_src)
+                state["in_degree"] = _accumulate(state["ids"], state["in_degree"], ids, u_dst, c_dst)
+                state["ids"] = ids
+        # Bottom-k hash sample of nodes and per-chunk heavy hitters, used once exact counts are dropped
+        seen = np.union1d(state["sample"], seen)
+        state["sample"] = seen[np.argsort(_hash(seen, seed + 7), kind="stable")[:sample_nodes]]
+        heavy = np.union1d(state["heavy"], np.concatenate([u_src[np.argsort(-c_src)[:64]],
+                                                           u_dst[np.argsort(-c_dst)[:64]]]))
+        if len(heavy) > 4096:
+            score = state["cm_out"].query(heavy) + state["cm_in"].query(heavy)
+            heavy = np.sort(heavy[np.argsort(-score)[:1024]])
+        state["heavy"] = heavy
+    return state
+
+
+def _sampled_pairs(path, p, seed, chunk_bytes):
+    """Node pairs kept with probability ``p``: ``(a, b, dirs)``, ``a < b``, dirs bit 1 = a->b, 2 = b->a."""
+    threshold = np.uint64(min(p, 1.0) * 18446744073709549568.0)
+    keys, dirs = [], []
+    for rows in iter_edge_chunks(path, chunk_bytes):
+        src, dst = rows[:, 0], rows[:, 1]
+        keep = src != dst
+        src, dst = src[keep], dst[keep]
+        a, b = np.minimum(src, dst), np.maximum(src, dst)
+        with np.errstate(over="ignore"):
+            h = _hash(_hash(a, seed + 11) ^ b.astype(np.uint64), seed + 13)
+        kept = h <= threshold if p < 1 else np.ones(len(a), dtype=bool)
+        keys.append(np.stack([a[kept], b[kept]], axis=1))
+        dirs.append(np.where(src[kept] < dst[kept], 1, 2).astype(np.int8))
+    if not keys:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.int8)
+    pairs, dirs = np.concatenate(keys), np.concatenate(dirs)
+    uniq, inverse = np.unique(pairs, axis=0, return_inverse=True)
+    merged = np.zeros(len(uniq), dtype=np.int8)
+    np.bitwise_or.at(merged, inverse.ravel(), dirs)
+    return uniq[:, 0], uniq[:, 1], merged
+
+
+def _triangles(a, b):
+    """Triangles, triangle pairs sharing an edge, and wedges of an undirected edge set."""
+    nodes, inv = np.unique(np.concatenate([a, b]), return_inverse=True)
+    n = len(nodes)
+    u, v = inv[:len(a)], inv[len(a):]
+    A = sps.csr_matrix((np.ones(2 * len(u)), (np.concatenate([u, v]), np.concatenate([v, u]))), shape=(n, n))
+    degree = np.diff(A.indptr).astype(np.float64)
+    wedges = float((degree * (degree - 1) / 2).sum())
+    # Row blocks bounded by the size of the two-hop product
+    cost = np.cumsum(A @ degree) if n else np.zeros(0)
+    cuts = np.searchsorted(cost, np.arange(_PAIR_BUDGET, cost[-1], _PAIR_BUDGET)) if n else []
+    triangles = shared = 0.0
+    for rows in np.split(np.arange(n), cuts):
+        if not len(rows):
+            continue
+        block = A[rows]
+        per_edge = block.multiply(block @ A).tocsr().data   # triangles on each edge
+        triangles += per_edge.sum()
+        shared += (per_edge * (per_edge - 1) / 2).sum()
+    # Each triangle is seen on 6 directed edges, each edge twice
+    return triangles / 6, shared / 2, wedges
+
+
+def _anf_pass(path, index, counters, chunk_bytes):
+    new = counters.copy()
+    for rows in iter_edge_chunks(path, chunk_bytes):
+        u, v = index(rows[:, 0]), index(rows[:, 1])
+        keep = u != v
+        src = np.concatenate([u[keep], v[keep]])
+        dst = np.concatenate([v[keep], u[keep]])
+        order = np.argsort(src, kind="stable")
+        src, dst = src[order], dst[order]
+        starts = np.flatnonzero(np.r_[True, src[1:] != src[:-1]])
+        if not len(starts):
+            continue
+        best = np.maximum.reduceat(counters[dst], starts, axis=0)
+        np.maximum(new[src[starts]], best, out=best)
+        new[src[starts]] = best
+    return new
+
+
+def _distance_stats(curves, z):
+    """Average distance and 90% effective diameter from neighbourhood functions (rows = groups)."""
+    grow = np.diff(curves, axis=-1).clip(min=0)
+    total = grow.sum(axis=-1)
+    hops = np.arange(1, curves.shape[-1])
+    avg = (grow * hops).sum(axis=-1) / np.maximum(total, 1e-12)
+    # Interpolated hop count reaching 90% of the reachable pairs
+    frac = np.cumsum(grow, axis=-1) / np.maximum(total, 1e-12)[..., None]
+    eff = []
+    for row in np.atleast_2d(frac):
+        t = int(np.searchsorted(row, 0.9))
+        lo = row[t - 1] if t > 0 else 0.0
+        eff.append(t + (0.9 - lo) / max(row[t] - lo, 1e-12) if t < len(row) else float(len(row)))
+    return np.asarray(avg), np.asarray(eff)
+
+
+def _hyper_anf(path, ids, budget, seed, chunk_bytes, z):
+    n = len(ids)
+    per_node = budget // 2 // max(n, 1)
+    if per_node < 16:
+        return None
+    b = int(min(8, np.log2(per_node)))
+    m = 1 << b
+    counters = np.zeros((n, m), dtype=np.uint8)
+    reg, rank = _hll_split(ids, b, seed + 17)
+    counters[np.arange(n), reg] = rank
+
+    def index(x):
+        return np.searchsorted(ids, x)
+
+    def totals(c):
+        groups = c.reshape(n, _ANF_GROUPS, m // _ANF_GROUPS)
+        return float(_hll_count(c).sum()), _hll_count(groups).sum(axis=0) * _ANF_GROUPS
+    full, groups = totals(counters)
+    curve, group_curves = [full], [groups]
+    passes = 0
+    while passes < _ANF_MAX_HOPS:
+        new = _anf_pass(path, index, counters, chunk_bytes)
+        passes += 1
+        if np.array_equal(new, counters):
+            break
+        counters = new
+        full, groups = totals(counters)
+        curve.append(full)
+        group_curves.append(groups)
+    curve = np.asarray(curve)
+    group_curves = np.asarray(group_curves).T
+    avg, eff = _distance_stats(curve, z)
+    g_avg, g_eff = _distance_stats(group_curves, z)
+    k = _ANF_GROUPS
+    return (curve, Estimate(float(avg), z * float(g_avg.std(ddof=1)) / np.sqrt(k)),
+            Estimate(float(eff[0]), z * float(g_eff.std(ddof=1)) / np.sqrt(k)), passes)
+
+
+def stream_statistics(path, budget=DEFAULT_BUDGET, seed=0, z=Z_95, chunk_bytes=DEFAULT_CHUNK_BYTES,
+                      sample_nodes=100_000, distances=True):
+    """``StreamingStats`` of the edge list at ``path`` using about ``budget`` bytes."""
+    start = time.perf_counter()
+    state = _counting_pass(path, budget, seed, chunk_bytes, sample_nodes)
+    edges, self_loops = state["edges"], state["self_loops"]
+    hll_all, hll_dst = state["hll_all"], state["hll_dst"]
+    cm_out, cm_in = state["cm_out"], state["cm_in"]
+    exact = state["ids"] is not None
+    if exact:
+        ids, out_deg, in_deg = state["ids"], state["out_degree"], state["in_degree"]
+        n = len(ids)
+        nodes = Estimate(n)
+        zero_in = Estimate(int((in_deg == 0).sum()))
+        max_in = Estimate(int(in_deg.max()) if n else 0)
+        max_out = Estimate(int(out_deg.max()) if n else 0)
+        degree_sample, degree_error = out_deg + in_deg, 0.0
+    else:
+        n_all, n_dst = hll_all.count(), hll_dst.count()
+        nodes = Estimate(n_all, z * hll_all.rse * n_all)
+        zero_in = Estimate(max(n_all - n_dst, 0.0), z * hll_all.rse * np.hypot(n_all, n_dst))
+        heavy = state["heavy"]
+        max_in = Estimate(float(cm_in.query(heavy).max()), cm_in.epsilon * cm_in.total)
+        max_out = Estimate(float(cm_out.query(heavy).max()), cm_out.epsilon * cm_out.total)
+        sample = state["sample"]
+        degree_sample = cm_out.query(sample) + cm_in.query(sample)
+        degree_error = (cm_out.epsilon + cm_in.epsilon) * edges
+
+    # Pair sample sized to the budget (about 64 bytes per sampled pair)
+    p = min(1.0, budget / 64 / max(edges, 1))
+    a, b, dirs = _sampled_pairs(path, p, seed, chunk_bytes)
+    mutual_pairs = float((dirs == 3).sum())
+    mutual = 2 * mutual_pairs / p
+    reciprocity = Estimate(mutual / edges if edges else 0.0,
+                           z * 2 * np.sqrt(mutual_pairs * (1 - p)) / p / edges if edges else 0.0)
+    t_s, k_s, w_s = _triangles(a, b)
+    t_hat = t_s / p ** 3
+    var = t_hat * (p ** -3 - 1) + 2 * (k_s / p ** 5) * (1 / p - 1)
+    triangles = Estimate(t_hat, z * np.sqrt(max(var, 0.0)))
+    w_hat = w_s / p ** 2
+    transitivity = Estimate(3 * t_hat / w_hat if w_hat else 0.0, 3 * triangles.error / w_hat if w_hat else 0.0)
+
+    stats = StreamingStats(
+        edges=edges, self_loops=self_loops, nodes=nodes, zero_in_degree=zero_in,
+        max_in_degree=max_in, max_out_degree=max_out, degree_sample=np.asarray(degree_sample),
+        degree_error=float(degree_error), sample_fraction=p, reciprocity=reciprocity,
+        triangles=triangles, transitivity=transitivity, passes=2,
+    )
+    if distances and exact:
+        anf = _hyper_anf(path, state["ids"], budget, seed, chunk_bytes, z)
+        if anf is not None:
+            stats.neighbourhood, stats.avg_distance, stats.effective_diameter, extra = anf
+            stats.passes += extra
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+# ----------------------------------------------------------------------
+# Exact-path feasibility
+# ----------------------------------------------------------------------
+@dataclass
+class ExactPlan:
+    edges: int
+    nodes: int
+    bytes: int
+    seconds: float
+
+    @property
+    def feasible(self):
+        return self.bytes <= EXACT_MAX_BYTES and self.seconds <= EXACT_MAX_SECONDS
+
+
+def exact_plan(path, prefix_bytes=1 << 20):
+    """Predicted size and run time of the exact path, from the file size and a prefix.
+
+    Nodes are extrapolated linearly from the prefix, which overestimates
+    them, so the prediction errs on the side of streaming.
+    """
+    size = os.path.getsize(path)
+    rows = next(iter_edge_chunks(path, prefix_bytes), np.empty((0, 2), dtype=np.int64))
+    with open(path, "rb") as f:
+        head = f.read(prefix_bytes)
+    parsed = head[:head.rfind(b"\n") + 1] if len(head) == prefix_bytes else head
+    scale = size / max(len(parsed), 1)
+    edges = int(len(rows) * scale)
+    nodes = int(min(len(np.unique(rows[:, :2])) * scale, 2 * edges))
+    return ExactPlan(edges=edges, nodes=nodes,
+                     bytes=edges * _NX_BYTES_PER_EDGE + nodes * _NX_BYTES_PER_NODE,
+                     seconds=edges * _SECONDS_PER_EDGE + _SECONDS_PER_WEDGE * edges * edges / max(nodes, 1))
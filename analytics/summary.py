@@ -0,0 +1,235 @@
+"""Whole-graph summary statistics from one streaming pass over the edges.
+
+``summarize`` visits every edge block once and accumulates, per block,
+in/out degree counts, self-loops, reciprocated edges (a vectorized
+``has_edges`` lookup of each reversed edge) and weak-component labels
+(``union_edges`` settles each block's unions before moving on).  Only
+strongly connected components need the adjacency as a whole and are
+counted with SciPy afterwards.  Everything the dashboard shows -- density,
+reciprocity, degree mean/median/std/max, silent voters, giant component --
+is derived from these accumulators by ``GraphSummary``.
+
+``GraphSummary.append`` folds a batch of new edges into the accumulators
+without another pass over the existing ones: the summarized graph is only
+probed for the new edges and their reverses.  The edges appended so far
+travel with the summary (``appended``, a small ``CompactGraph``), so
+chained appends against the same base graph never count an edge twice.
+Appends can merge strong components through paths in the old graph, so
+``strong_components`` is ``None`` on an appended summary until it is
+recomputed.
+"""
+import json
+import os
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from analytics.components import strong_component_labels, union_edges
+from analytics.graph import BLOCK_NNZ, CompactGraph
+
+_ARRAYS = ("ids", "in_degree", "out_degree", "labels")
+_SCALARS = ("self_loops", "mutual_edges", "strong_components")
+
+
+@dataclass(eq=False)
+class GraphSummary:
+    ids: np.ndarray
+    in_degree: np.ndarray
+    out_degree: np.ndarray
+    labels: np.ndarray          # weak-component root of each node
+    self_loops: int
+    mutual_edges: int           # directed edges whose reverse exists (self-loops excluded)
+    strong_components: int = None
+    appended: CompactGraph = None   # edges added by ``append`` since ``summarize``
+
+    # ------------------------------------------------------------------
+    # Derived statistics
+    # ------------------------------------------------------------------
+    @property
+    def nodes(self):
+        return len(self.ids)
+
+    @property
+    def edges(self):
+        return int(self.out_degree.sum())
+
+    @property
+    def density(self):
+        n = self.nodes
+        return self.edges / (n * (n - 1)) if n > 1 else 0.0
+
+    @property
+    def reciprocity(self):
+        return self.mutual_edges / self.edges if self.edges else 0.0
+
+    @property
+    def degree(self):
+        return self.in_degree + self.out_degree
+
+    @property
+    def mean_degree(self):
+        return float(self.degree.mean()) if self.nodes else 0.0
+
+    @property
+    def median_degree(self):
+        return float(np.median(self.degree)) if self.nodes else 0.0
+
+    @property
+    def std_degree(self):
+        return float(self.degree.std()) if self.nodes else 0.0
+
+    @property
+    def max_degree(self):
+        return int(self.degree.max()) if self.nodes else 0
+
+    @property
+    def max_in_degree(self):
+        return int(self.in_degree.max()) if self.nodes else 0
+
+    @property
+    def max_out_degree(self):
+        return int(self.out_degree.max()) if self.nodes else 0
+
+    @property
+    def zero_in_degree(self):
+        return int((self.in_degree == 0).sum())
+
+    @property
+    def weak_components(self):
+        return int((self.labels == np.arange(self.nodes)).sum())
+
+    @property
+    def largest_weak_component(self):
+        return int(np.bincount(self.labels).max()) if self.nodes else 0
+
+    def as_dict(self):
+        """Plain scalars, as written to ``summary.json``."""
+        return {
+            "nodes": self.nodes, "edges": self.edges, "density": self.density,
+            "reciprocity": self.reciprocity, "self_loops": int(self.self_loops),
+            "mutual_edges": int(self.mutual_edges),
+            "mean_degree": self.mean_degree, "median_degree": self.median_degree,
+            "std_degree": self.std_degree, "max_degree": self.max_degree,
+            "max_in_degree": self.max_in_degree, "max_out_degree": self.max_out_degree,
+            "zero_in_degree": self.zero_in_degree, "weak_components": self.weak_components,
+            "largest_weak_component": self.largest_weak_component,
+            "strong_components": self.strong_components,
+        }
+
+    # ------------------------------------------------------------------
+    # Incremental update
+    # ------------------------------------------------------------------
+    def append(self, graph, src, dst):
+        """Summary after adding the edges ``src -> dst`` (original IDs).
+
+        ``graph`` is the graph the summary was computed on by
+        ``summarize``; pass the same one to every chained append.  Edges
+        it already has, edges appended before, and duplicates inside the
+        batch are ignored.
+        """
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        ids = np.union1d(self.ids, np.concatenate([src, dst]))
+        n = len(ids)
+        old = np.searchsorted(ids, self.ids)
+        in_degree = np.zeros(n, dtype=np.int64)
+        out_degree = np.zeros(n, dtype=np.int64)
+        in_degree[old] = self.in_degree
+        out_degree[old] = self.out_degree
+        labels = np.arange(n)
+        labels[old] = old[self.labels]
+
+        # New, distinct edges in compact indices of the grown node set
+        keys = np.unique(np.searchsorted(ids, src).astype(np.uint64) * np.uint64(n)
+                         + np.searchsorted(ids, dst).astype(np.uint64))
+        s = (keys // np.uint64(n)).astype(np.int64)
+        d = (keys % np.uint64(n)).astype(np.int64)
+        new = ~self._has_edges(graph, ids[s], ids[d])
+        s, d = s[new], d[new]
+
+        in_degree += np.bincount(d, minlength=n)
+        out_degree += np.bincount(s, minlength=n)
+        loop = s == d
+        # A reverse already in the graph makes both edges mutual; a reverse
+        # in the batch is counted when the loop reaches that edge
+        rev_old = self._has_edges(graph, ids[d], ids[s]) & ~loop
+        rev_new = np.isin(d.astype(np.uint64) * np.uint64(n) + s.astype(np.uint64),
+                          s.astype(np.uint64) * np.uint64(n) + d.astype(np.uint64)) & ~loop
+        old_src, old_dst = self._appended_edges()
+        appended = CompactGraph.from_edges(np.concatenate([old_src, ids[s]]),
+                                           np.concatenate([old_dst, ids[d]]))
+        return replace(self, ids=ids, in_degree=in_degree, out_degree=out_degree,
+                       labels=union_edges(labels, s, d),
+                       self_loops=self.self_loops + int(loop.sum()),
+                       mutual_edges=self.mutual_edges + 2 * int(rev_old.sum()) + int(rev_new.sum()),
+                       strong_components=None, appended=appended)
+
+    def _has_edges(self, graph, src_ids, dst_ids):
+        found = _in_graph(graph, src_ids, dst_ids)
+        if self.appended is not None:
+            found |= _in_graph(self.appended, src_ids, dst_ids)
+        return found
+
+    def _appended_edges(self):
+        """Appended edges as original-ID arrays (empty before any append)."""
+        if self.appended is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        src, dst = self.appended.edges()
+        return self.appended.ids[src], self.appended.ids[dst]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self, directory):
+        """Write ``summary.json`` (readable scalars) and ``summary.npz`` (accumulators)."""
+        arrays = {name: getattr(self, name) for name in _ARRAYS}
+        if self.appended is not None:
+            arrays["appended_src"], arrays["appended_dst"] = self._appended_edges()
+        np.savez(os.path.join(directory, "summary.npz"), **arrays)
+        with open(os.path.join(directory, "summary.json"), "w") as f:
+            json.dump(self.as_dict(), f)
+
+    @classmethod
+    def load(cls, directory):
+        with np.load(os.path.join(directory, "summary.npz")) as data:
+            arrays = {name: data[name] for name in _ARRAYS}
+            if "appended_src" in data:
+                arrays["appended"] = CompactGraph.from_edges(data["appended_src"], data["appended_dst"])
+        with open(os.path.join(directory, "summary.json")) as f:
+            scalars = json.load(f)
+        return cls(**arrays, **{name: scalars[name] for name in _SCALARS})
+
+
+def _in_graph(graph, src_ids, dst_ids):
+    """``has_edges`` for original IDs, ``False`` where either end is a new node."""
+    src_ids = np.asarray(src_ids, dtype=np.int64)
+    dst_ids = np.asarray(dst_ids, dtype=np.int64)
+    if not graph.n_nodes:
+        return np.zeros(len(src_ids), dtype=bool)
+    s = np.minimum(np.searchsorted(graph.ids, src_ids), graph.n_nodes - 1)
+    d = np.minimum(np.searchsorted(graph.ids, dst_ids), graph.n_nodes - 1)
+    known = (graph.ids[s] == src_ids) & (graph.ids[d] == dst_ids)
+    found = np.zeros(len(src_ids), dtype=bool)
+    found[known] = graph.has_edges(s[known], d[known])
+    return found
+
+
+def summarize(graph, block_nnz=BLOCK_NNZ):
+    """``GraphSummary`` of a ``CompactGraph`` in one pass over its edge blocks."""
+    n = graph.n_nodes
+    in_degree = np.zeros(n, dtype=np.int64)
+    out_degree = np.zeros(n, dtype=np.int64)
+    labels = np.arange(n)
+    self_loops = mutual = 0
+    for src, dst in graph.iter_edge_blocks(block_nnz):
+        dst = dst.astype(np.int64)
+        in_degree += np.bincount(dst, minlength=n)
+        out_degree += np.bincount(src, minlength=n)
+        loop = src == dst
+        self_loops += int(loop.sum())
+        mutual += int((graph.has_edges(dst, src) & ~loop).sum())
+        labels = union_edges(labels, src, dst)
+    n_strong, _ = strong_component_labels(graph)
+    return GraphSummary(ids=np.asarray(graph.ids), in_degree=in_degree, out_degree=out_degree,
+                        labels=labels, self_loops=self_loops, mutual_edges=mutual,
+                        strong_components=int(n_strong))
@@ -9,6 +9,17 @@ from networkx.algorithms.community import greedy_modularity_communities
 import numpy as np
 from collections import Counter
 import warnings
+from analytics import export
+from analytics.cores import shell_sizes
+from analytics.engine import get_engine, get_registry as shared_registry
+from analytics.figcache import FigureCache
+from analytics import linkpred
+from analytics.ppr import ppr_batch
+from analytics.sampling import SAMPLERS, stratified
+from analytics.significance import STATISTICS
+from analytics.signed import BALANCED, TRIAD_TYPES
+from analytics.streaming import EXACT_MAX_BYTES, EXACT_MAX_SECONDS, exact_plan, stream_statistics
+from analytics.triads import motif_counts
 warnings.filterwarnings('ignore')
 
 # ==========================================
@@ -172,16 +183,80 @@ st.markdown("""
 # ==========================================
 # 2. DATA LOADING (Cached)
 # ==========================================
-@st.cache_data
-def load_data():
+DATASET_DIR = "datasets"
+
+def get_registry():
+    # Shared by every session: per-dataset disk bundles + memory-bounded LRU
+    return shared_registry(DATASET_DIR)
+
+# Display names of the engine's centrality columns
+CENTRALITY_COLUMNS = {
+    'in_degree': 'In-Degree', 'out_degree': 'Out-Degree', 'pagerank': 'PageRank', 'betweenness': 'Betweenness',
+    'hub': 'Hub', 'authority': 'Authority', 'closeness': 'Closeness', 'harmonic': 'Harmonic',
+    'votes_for': 'Votes For', 'votes_against': 'Votes Against', 'approval': 'Approval',
+    'positive_pagerank': 'Positive PageRank', 'net_pagerank': 'Net PageRank',
+}
+
+def dataset_engine(dataset_key):
+    # One cached analytics engine per dataset, the same one main.ipynb and analytics.report use
+    return get_engine(dataset_key, get_registry())
+
+@st.cache_resource
+def get_figure_cache():
+    # Rendered PNG / plotly JSON, shared by every session, bounded by bytes
+    return FigureCache()
+
+def load_data(dataset_key):
     try:
-        # Load dataset - same as notebook
-        G = nx.read_edgelist("Wiki-Vote.txt", create_using=nx.DiGraph(), nodetype=int)
-        return G
+        # Memory-mapped CSR graph shared by every session, cached per dataset (same as the notebook)
+        return get_registry().load(dataset_key).compact
     except FileNotFoundError:
         return None
 
-G = load_data()
+@st.cache_data(show_spinner=False)
+def dataset_plan(dataset_key):
+    # Predicted cost of the exact path, from the file size and its first megabyte
+    return exact_plan(get_registry()[dataset_key].path)
+
+@st.cache_data(show_spinner=False)
+def streaming_statistics(dataset_key):
+    return stream_statistics(get_registry()[dataset_key].path)
+
+@st.cache_data(show_spinner=False)
+def export_nodes(dataset_key, fmt):
+    # Full node-metric table, serialized straight from the NumPy columns the engine already holds
+    engine = dataset_engine(dataset_key)
+    table = export.node_table(engine.compact, community=engine.louvain_labels(),
+                              pagerank_scores=engine.pagerank(), betweenness_scores=engine.betweenness(1000))
+    return export.to_bytes(table.to_batches(), table.schema, fmt), table.slice(0, 10).to_pandas()
+
+@st.cache_data(show_spinner=False)
+def export_edges(dataset_key, fmt):
+    cg = dataset_engine(dataset_key).compact
+    return export.to_bytes(export.edge_batches(cg), export.EDGE_SCHEMA, fmt)
+
+@st.cache_data(show_spinner=False)
+def sample_node_ids(dataset_key, method, size, seed):
+    # Deterministic per (method, size, seed), so reruns reuse the sample
+    cg = load_data(dataset_key)
+    return cg.ids[SAMPLERS[method](cg, size, seed=seed)]
+
+@st.cache_data(show_spinner=False)
+def stratified_node_ids(dataset_key, labels, size, seed):
+    cg = load_data(dataset_key)
+    return cg.ids[stratified(cg, size, seed=seed, strata=labels)]
+
+def select_nodes(engine, dataset_key, method, size, seed=42):
+    # Nodes to draw, highest degree first
+    cg = engine.compact
+    if method == "Top degree":
+        nodes = engine.top(cg.in_degree + cg.out_degree, size)[0].tolist()
+    else:
+        ids = sample_node_ids(dataset_key, method, size, seed)
+        degree = (cg.in_degree + cg.out_degree)[cg.index_of(ids)]
+        nodes = ids[np.argsort(-degree, kind="stable")].tolist()
+    return nodes
+
 
 # Enhanced Sidebar Navigation
 with st.sidebar:
@@ -195,21 +270,159 @@ with st.sidebar:
          "📈 Network Statistics", 
          "👑 Power & Roles (Centrality)", 
          "🎨 Visualizations (Graphs)",
-         "🌐 Community Detection"],
+         "🌐 Community Detection",
+         "🔮 Recommendations",
+         "📦 Export Data"],
         label_visibility="collapsed")
     
     st.markdown("---")
-    st.markdown("""
+    registry = get_registry()
+    dataset_key = st.selectbox("📁 Dataset", registry.keys(), format_func=lambda k: registry[k].name)
+    try:
+        plan = dataset_plan(dataset_key)
+        # Forced on when the exact path would exceed the configured limits
+        streaming = st.checkbox("⚡ Streaming estimates", value=not plan.feasible, disabled=not plan.feasible,
+                                help=f"Exact path needs ~{plan.bytes / 2**20:,.0f} MB and ~{plan.seconds:,.0f} s "
+                                     f"(limits: {EXACT_MAX_BYTES >> 20:,} MB, {EXACT_MAX_SECONDS:,.0f} s)")
+        if streaming:
+            summary = None
+            stats_line = f"~{plan.edges:,} edges • streaming estimates"
+        else:
+            summary = registry.summary(dataset_key)
+            stats_line = f"{summary.nodes:,} nodes • {summary.edges:,} edges"
+    except FileNotFoundError:
+        streaming = False
+        summary = None
+        stats_line = "Edge list not found"
+    st.markdown(f"""
     <div style='background-color: rgba(255,255,255,0.1); padding: 15px; border-radius: 8px; color: white;'>
         <p style='margin: 0; font-weight: 600;'>📁 Dataset</p>
-        <p style='margin: 5px 0 0 0; font-size: 13px;'>Wikipedia Admin Elections</p>
-        <p style='margin: 5px 0 0 0; font-size: 12px; opacity: 0.8;'>7,115 nodes • 103,689 edges</p>
+        <p style='margin: 5px 0 0 0; font-size: 13px;'>{registry[dataset_key].name}</p>
+        <p style='margin: 5px 0 0 0; font-size: 12px; opacity: 0.8;'>{stats_line}</p>
     </div>
     """, unsafe_allow_html=True)
     
     st.markdown("---")
     st.markdown("<p style='color: #e0e0e0; text-align: center; font-size: 11px;'>Made with ❤️ using Streamlit</p>", unsafe_allow_html=True)
 
+graph = None if streaming else load_data(dataset_key)
+engine = None if graph is None else dataset_engine(dataset_key)
+figure_cache = get_figure_cache()
+fingerprint = registry[dataset_key].fingerprint if graph is not None else None
+
+# Per-session results belong to the dataset they were computed on
+if st.session_state.get("dataset_key") != dataset_key:
+    st.session_state.pop("centrality_df", None)
+    st.session_state.dataset_key = dataset_key
+
+# ==========================================
+# STREAMING MODE (dataset beyond the exact path's limits)
+# ==========================================
+if streaming:
+    with st.spinner("🔄 Streaming over the edge list..."):
+        stream = streaming_statistics(dataset_key)
+    approx_note = f"""
+    <div class='warning-box'>
+        <strong>≈ Streaming estimates.</strong> The exact analysis of this dataset is predicted to need
+        ~{plan.bytes / 2**20:,.0f} MB and ~{plan.seconds:,.0f} s (limits: {EXACT_MAX_BYTES >> 20:,} MB, {EXACT_MAX_SECONDS:,.0f} s),
+        so these values come from {stream.passes} bounded-memory passes over the edge file
+        ({stream.sample_fraction * 100:.1f}% of node pairs sampled). "±" marks 95% intervals.
+    </div>
+    """
+    
+    if page == "🏠 Overview":
+        st.markdown("<div class='big-font'>🗳️ Wikipedia Voting Network Analysis</div>", unsafe_allow_html=True)
+        st.markdown("<h3 style='color: #666; font-weight: 400;'>Understanding Power, Trust, and Community in Digital Democracy</h3>", unsafe_allow_html=True)
+        st.markdown(approx_note, unsafe_allow_html=True)
+        
+        st.markdown("#### 🔢 Network Overview (≈)")
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("👥 Total Users", f"{stream.nodes:,.0f}", help="HyperLogLog count of distinct users")
+        c2.metric("🗳️ Total Votes", f"{stream.edges:,}", help="Exact line count")
+        c3.metric("🔗 Network Density", f"{stream.density:.5f}")
+        c4.metric("🤫 Silent Voters", f"{stream.zero_in_degree:,.0f}", help="Users minus distinct vote receivers")
+        
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown("#### ⚡ Quick Statistics (≈)")
+        col_a, col_b, col_c = st.columns(3)
+        with col_a:
+            st.markdown(f"""
+            <div class='insight-box'>
+                <h4>📈 Degree Insights</h4>
+                <p><strong>Average Degree:</strong> {stream.mean_degree.scale(0.5):.2f} connections</p>
+                <p><strong>Max Votes Received:</strong> {stream.max_in_degree:,.0f}</p>
+                <p><strong>Max Votes Cast:</strong> {stream.max_out_degree:,.0f}</p>
+            </div>
+            """, unsafe_allow_html=True)
+        with col_b:
+            st.markdown(f"""
+            <div class='insight-box'>
+                <h4>🤝 Reciprocity</h4>
+                <p><strong>Mutual Votes:</strong> {stream.reciprocity.scale(100):.2f}%</p>
+                <p><em>Estimated from the votes inside sampled pairs of users.</em></p>
+            </div>
+            """, unsafe_allow_html=True)
+        with col_c:
+            st.markdown(f"""
+            <div class='insight-box'>
+                <h4>🔺 Triangles</h4>
+                <p><strong>Triangles:</strong> {stream.triangles:,.0f}</p>
+                <p><strong>Transitivity (undirected):</strong> {stream.transitivity:.4f}</p>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    elif page == "📈 Network Statistics":
+        st.markdown("<div class='big-font'>📈 Advanced Network Statistics</div>", unsafe_allow_html=True)
+        st.markdown(approx_note, unsafe_allow_html=True)
+        
+        st.markdown("### 🤝 Social Structure (≈)")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("🤝 Reciprocity", f"{stream.reciprocity.scale(100):.2f}%")
+        col2.metric("🔺 Transitivity (undirected)", f"{stream.transitivity:.4f}", help="Doulion edge-sampling estimate")
+        col3.metric("🔻 Triangles", f"{stream.triangles:,.0f}")
+        
+        st.markdown("### 🌍 Distance Metrics (≈)")
+        if stream.avg_distance is None:
+            st.info("The per-user distance counters do not fit the streaming memory budget (`WIKIVOTE_STREAMING_MB`).")
+        else:
+            col1, col2 = st.columns(2)
+            col1.metric("📏 Avg Path Length", f"{stream.avg_distance:.2f} steps", help="HyperANF estimate over connected pairs")
+            col2.metric("🎯 Effective Diameter (90%)", f"{stream.effective_diameter:.2f} steps",
+                        help="Steps needed to reach 90% of the reachable pairs")
+            fig_anf = px.line(x=np.arange(len(stream.neighbourhood)), y=stream.neighbourhood, markers=True,
+                              labels={'x': 'Steps', 'y': 'Pairs within reach'}, title='Neighbourhood Function')
+            fig_anf.update_layout(height=400)
+            st.plotly_chart(fig_anf, use_container_width=True)
+        
+        st.markdown("### 📊 Degree Distribution (≈)")
+        if stream.degree_error:
+            st.caption(f"Count-min estimates for a hash sample of {len(stream.degree_sample):,} users "
+                       f"(each degree within +{stream.degree_error:,.0f} with high probability)")
+        degree_values, degree_freq = np.unique(stream.degree_sample, return_counts=True)
+        fig_deg = go.Figure(go.Scatter(x=degree_values, y=degree_freq, mode='markers',
+                                       marker=dict(size=8, color='#764ba2', opacity=0.6)))
+        fig_deg.update_layout(title="Degree Distribution (Log-Log Scale)", xaxis_title="Degree (log scale)",
+                              yaxis_title="Frequency (log scale)", xaxis_type="log", yaxis_type="log", height=400)
+        st.plotly_chart(fig_deg, use_container_width=True)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("#### 📊 Basic Properties")
+            st.metric("Nodes", f"{stream.nodes:,.0f}")
+            st.metric("Edges", f"{stream.edges:,}")
+            st.metric("Density", f"{stream.density:.6f}")
+        with col2:
+            st.markdown("#### 🔢 Degree Statistics")
+            st.metric("Mean Degree", f"{stream.mean_degree:.2f}")
+            st.metric("Median Degree", f"{np.median(stream.degree_sample):.0f}")
+            st.metric("Self-loops", f"{stream.self_loops:,}")
+    
+    else:
+        st.warning("⚡ This dataset is in streaming mode: only **Overview** and **Network Statistics** are available, as estimates. "
+                   "Untick *Streaming estimates* in the sidebar (when allowed) or raise `WIKIVOTE_EXACT_MAX_MB` / "
+                   "`WIKIVOTE_EXACT_MAX_SECONDS` to run the exact analyses.")
+    st.stop()
+
 # ==========================================
 # PAGE 1: HOME (Clean, No Visualizations)
 # ==========================================
@@ -217,8 +430,8 @@ if page == "🏠 Overview":
     st.markdown("<div class='big-font'>🗳️ Wikipedia Voting Network Analysis</div>", unsafe_allow_html=True)
     st.markdown("<h3 style='color: #666; font-weight: 400;'>Understanding Power, Trust, and Community in Digital Democracy</h3>", unsafe_allow_html=True)
     
-    if G is None:
-        st.error("❌ Error: 'Wiki-Vote.txt' not found. Please place the file in the folder.")
+    if graph is None:
+        st.error(f"❌ Error: '{registry[dataset_key].path}' not found. Please place the file in the folder.")
         st.stop()
 
     st.markdown("<br>", unsafe_allow_html=True)
@@ -227,14 +440,13 @@ if page == "🏠 Overview":
     st.markdown("#### 🔢 Network Overview")
     c1, c2, c3, c4 = st.columns(4)
     
-    c1.metric("👥 Total Users", f"{G.number_of_nodes():,}", help="Total number of Wikipedia users in the network")
-    c2.metric("🗳️ Total Votes", f"{G.number_of_edges():,}", help="Total voting interactions")
-    c3.metric("🔗 Network Density", f"{nx.density(G):.5f}", help="How interconnected the network is (0=sparse, 1=complete)")
+    c1.metric("👥 Total Users", f"{summary.nodes:,}", help="Total number of Wikipedia users in the network")
+    c2.metric("🗳️ Total Votes", f"{summary.edges:,}", help="Total voting interactions")
+    c3.metric("🔗 Network Density", f"{summary.density:.5f}", help="How interconnected the network is (0=sparse, 1=complete)")
     
-    # Calculate simple isolated stats
-    in_degrees = [d for n, d in G.in_degree()]
-    zeros = in_degrees.count(0)
-    c4.metric("🤫 Silent Voters", f"{zeros:,}", delta=f"{zeros/len(in_degrees)*100:.1f}%", delta_color="off", help="Users who received no votes")
+    # All header figures come from the dataset's cached one-pass summary
+    zeros = summary.zero_in_degree
+    c4.metric("🤫 Silent Voters", f"{zeros:,}", delta=f"{zeros/summary.nodes*100:.1f}%", delta_color="off", help="Users who received no votes")
 
     # Interactive Quick Stats
     st.markdown("<br>", unsafe_allow_html=True)
@@ -243,8 +455,8 @@ if page == "🏠 Overview":
     col_a, col_b, col_c = st.columns(3)
     
     with col_a:
-        avg_degree = G.number_of_edges() / G.number_of_nodes()
-        max_degree = max(dict(G.degree()).values())
+        avg_degree = summary.edges / summary.nodes
+        max_degree = summary.max_degree
         st.markdown(f"""
         <div class='insight-box'>
             <h4>📈 Degree Insights</h4>
@@ -255,7 +467,7 @@ if page == "🏠 Overview":
         """, unsafe_allow_html=True)
     
     with col_b:
-        reciprocity = nx.reciprocity(G)
+        reciprocity = summary.reciprocity
         st.markdown(f"""
         <div class='insight-box'>
             <h4>🤝 Reciprocity</h4>
@@ -266,11 +478,8 @@ if page == "🏠 Overview":
     
     with col_c:
         # Get largest component size
-        if G.is_directed():
-            largest_wcc = len(max(nx.weakly_connected_components(G), key=len))
-        else:
-            largest_wcc = len(max(nx.connected_components(G), key=len))
-        connectivity_pct = (largest_wcc / G.number_of_nodes()) * 100
+        largest_wcc = summary.largest_weak_component
+        connectivity_pct = (largest_wcc / summary.nodes) * 100
         
         st.markdown(f"""
         <div class='insight-box'>
@@ -328,18 +537,18 @@ elif page == "📊 Node Degree Analysis":
     </div>
     """, unsafe_allow_html=True)
     
-    # Calculate degrees
-    in_degrees = dict(G.in_degree())
-    out_degrees = dict(G.out_degree())
+    # Degree arrays over the dataset's users
+    in_degrees = engine.compact.in_degree
+    out_degrees = engine.compact.out_degree
     
     # Basic Statistics
     st.markdown("### 📈 Degree Statistics")
     col1, col2, col3, col4 = st.columns(4)
     
-    avg_in = np.mean(list(in_degrees.values()))
-    avg_out = np.mean(list(out_degrees.values()))
-    max_in = max(in_degrees.values())
-    max_out = max(out_degrees.values())
+    avg_in = in_degrees.mean()
+    avg_out = out_degrees.mean()
+    max_in = int(in_degrees.max())
+    max_out = int(out_degrees.max())
     
     col1.metric("📥 Avg In-Degree", f"{avg_in:.2f}", help="Average votes received per user")
     col2.metric("📤 Avg Out-Degree", f"{avg_out:.2f}", help="Average votes cast per user")
@@ -355,7 +564,7 @@ elif page == "📊 Node Degree Analysis":
         st.markdown("#### Top 15 Most Voted Users (Highest In-Degree)")
         st.caption("These users are the most trusted and popular in the network")
         
-        top_in = sorted(in_degrees.items(), key=lambda x: x[1], reverse=True)[:15]
+        top_in = zip(*engine.top(in_degrees, 15))
         df_top_in = pd.DataFrame(top_in, columns=['User ID', 'Votes Received'])
         df_top_in['Rank'] = range(1, len(df_top_in) + 1)
         df_top_in = df_top_in[['Rank', 'User ID', 'Votes Received']]
@@ -377,7 +586,7 @@ elif page == "📊 Node Degree Analysis":
         st.markdown("#### Top 15 Most Active Voters (Highest Out-Degree)")
         st.caption("These users are the most engaged, casting the most votes")
         
-        top_out = sorted(out_degrees.items(), key=lambda x: x[1], reverse=True)[:15]
+        top_out = zip(*engine.top(out_degrees, 15))
         df_top_out = pd.DataFrame(top_out, columns=['User ID', 'Votes Cast'])
         df_top_out['Rank'] = range(1, len(df_top_out) + 1)
         df_top_out = df_top_out[['Rank', 'User ID', 'Votes Cast']]
@@ -400,84 +609,88 @@ elif page == "📊 Node Degree Analysis":
         st.caption("Visualizing the 'rich-get-richer' phenomenon in social networks")
         
         # Get degree sequences
-        in_degree_sequence = list(in_degrees.values())
-        out_degree_sequence = list(out_degrees.values())
-        
-        # Create distribution plots
-        fig = plt.figure(figsize=(16, 10))
-        
-        # In-Degree Linear
-        ax1 = plt.subplot(2, 3, 1)
-        in_counts = Counter(in_degree_sequence)
-        degrees = sorted(in_counts.keys())
-        counts = [in_counts[d] for d in degrees]
-        ax1.bar(degrees[:50], counts[:50], color='#667eea', alpha=0.7, edgecolor='black')
-        ax1.set_xlabel('In-Degree (Votes Received)', fontsize=11, fontweight='bold')
-        ax1.set_ylabel('Number of Users', fontsize=11, fontweight='bold')
-        ax1.set_title('In-Degree Distribution (Linear)', fontsize=13, fontweight='bold')
-        ax1.grid(True, alpha=0.3)
-        
-        # In-Degree Log-Log
-        ax2 = plt.subplot(2, 3, 2)
-        ax2.loglog(degrees, counts, 'o', color='#667eea', alpha=0.6, markersize=6)
-        ax2.set_xlabel('In-Degree [log]', fontsize=11, fontweight='bold')
-        ax2.set_ylabel('Frequency [log]', fontsize=11, fontweight='bold')
-        ax2.set_title('In-Degree Distribution (Log-Log - Power Law)', fontsize=13, fontweight='bold')
-        ax2.grid(True, alpha=0.3)
-        
-        # Out-Degree Linear
-        ax3 = plt.subplot(2, 3, 4)
-        out_counts = Counter(out_degree_sequence)
-        out_degrees_sorted = sorted(out_counts.keys())
-        out_counts_sorted = [out_counts[d] for d in out_degrees_sorted]
-        ax3.bar(out_degrees_sorted[:50], out_counts_sorted[:50], color='#f093fb', alpha=0.7, edgecolor='black')
-        ax3.set_xlabel('Out-Degree (Votes Cast)', fontsize=11, fontweight='bold')
-        ax3.set_ylabel('Number of Users', fontsize=11, fontweight='bold')
-        ax3.set_title('Out-Degree Distribution (Linear)', fontsize=13, fontweight='bold')
-        ax3.grid(True, alpha=0.3)
-        
-        # Out-Degree Log-Log
-        ax4 = plt.subplot(2, 3, 5)
-        ax4.loglog(out_degrees_sorted, out_counts_sorted, 'o', color='#f093fb', alpha=0.6, markersize=6)
-        ax4.set_xlabel('Out-Degree [log]', fontsize=11, fontweight='bold')
-        ax4.set_ylabel('Frequency [log]', fontsize=11, fontweight='bold')
-        ax4.set_title('Out-Degree Distribution (Log-Log - Power Law)', fontsize=13, fontweight='bold')
-        ax4.grid(True, alpha=0.3)
-        
-        # Combined comparison
-        ax5 = plt.subplot(2, 3, 3)
-        ax5.hist([in_degree_sequence, out_degree_sequence], bins=50, label=['In-Degree', 'Out-Degree'],
-                 color=['#667eea', '#f093fb'], alpha=0.6, edgecolor='black')
-        ax5.set_xlabel('Degree', fontsize=11, fontweight='bold')
-        ax5.set_ylabel('Frequency', fontsize=11, fontweight='bold')
-        ax5.set_title('In vs Out Degree Comparison', fontsize=13, fontweight='bold')
-        ax5.legend()
-        ax5.grid(True, alpha=0.3)
-        
-        # Statistical summary box
-        ax6 = plt.subplot(2, 3, 6)
-        ax6.axis('off')
-        summary_text = f"""
-        STATISTICAL SUMMARY
-        
-        In-Degree:
-        • Mean: {np.mean(in_degree_sequence):.2f}
-        • Median: {np.median(in_degree_sequence):.2f}
-        • Std Dev: {np.std(in_degree_sequence):.2f}
-        • Max: {max(in_degree_sequence)}
-        
-        Out-Degree:
-        • Mean: {np.mean(out_degree_sequence):.2f}
-        • Median: {np.median(out_degree_sequence):.2f}
-        • Std Dev: {np.std(out_degree_sequence):.2f}
-        • Max: {max(out_degree_sequence)}
-        """
-        ax6.text(0.1, 0.5, summary_text, fontsize=11, family='monospace',
-                bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5),
-                verticalalignment='center')
-        
-        plt.tight_layout()
-        st.pyplot(fig)
+        in_degree_sequence = in_degrees.tolist()
+        out_degree_sequence = out_degrees.tolist()
+        
+        def draw_degree_distributions():
+            # Create distribution plots
+            fig = plt.figure(figsize=(16, 10))
+            
+            # In-Degree Linear
+            ax1 = plt.subplot(2, 3, 1)
+            in_counts = Counter(in_degree_sequence)
+            degrees = sorted(in_counts.keys())
+            counts = [in_counts[d] for d in degrees]
+            ax1.bar(degrees[:50], counts[:50], color='#667eea', alpha=0.7, edgecolor='black')
+            ax1.set_xlabel('In-Degree (Votes Received)', fontsize=11, fontweight='bold')
+            ax1.set_ylabel('Number of Users', fontsize=11, fontweight='bold')
+            ax1.set_title('In-Degree Distribution (Linear)', fontsize=13, fontweight='bold')
+            ax1.grid(True, alpha=0.3)
+            
+            # In-Degree Log-Log
+            ax2 = plt.subplot(2, 3, 2)
+            ax2.loglog(degrees, counts, 'o', color='#667eea', alpha=0.6, markersize=6)
+            ax2.set_xlabel('In-Degree [log]', fontsize=11, fontweight='bold')
+            ax2.set_ylabel('Frequency [log]', fontsize=11, fontweight='bold')
+            ax2.set_title('In-Degree Distribution (Log-Log - Power Law)', fontsize=13, fontweight='bold')
+            ax2.grid(True, alpha=0.3)
+            
+            # Out-Degree Linear
+            ax3 = plt.subplot(2, 3, 4)
+            out_counts = Counter(out_degree_sequence)
+            out_degrees_sorted = sorted(out_counts.keys())
+            out_counts_sorted = [out_counts[d] for d in out_degrees_sorted]
+            ax3.bar(out_degrees_sorted[:50], out_counts_sorted[:50], color='#f093fb', alpha=0.7, edgecolor='black')
+            ax3.set_xlabel('Out-Degree (Votes Cast)', fontsize=11, fontweight='bold')
+            ax3.set_ylabel('Number of Users', fontsize=11, fontweight='bold')
+            ax3.set_title('Out-Degree Distribution (Linear)', fontsize=13, fontweight='bold')
+            ax3.grid(True, alpha=0.3)
+            
+            # Out-Degree Log-Log
+            ax4 = plt.subplot(2, 3, 5)
+            ax4.loglog(out_degrees_sorted, out_counts_sorted, 'o', color='#f093fb', alpha=0.6, markersize=6)
+            ax4.set_xlabel('Out-Degree [log]', fontsize=11, fontweight='bold')
+            ax4.set_ylabel('Frequency [log]', fontsize=11, fontweight='bold')
+            ax4.set_title('Out-Degree Distribution (Log-Log - Power Law)', fontsize=13, fontweight='bold')
+            ax4.grid(True, alpha=0.3)
+            
+            # Combined comparison
+            ax5 = plt.subplot(2, 3, 3)
+            ax5.hist([in_degree_sequence, out_degree_sequence], bins=50, label=['In-Degree', 'Out-Degree'],
+                     color=['#667eea', '#f093fb'], alpha=0.6, edgecolor='black')
+            ax5.set_xlabel('Degree', fontsize=11, fontweight='bold')
+            ax5.set_ylabel('Frequency', fontsize=11, fontweight='bold')
+            ax5.set_title('In vs Out Degree Comparison', fontsize=13, fontweight='bold')
+            ax5.legend()
+            ax5.grid(True, alpha=0.3)
+            
+            # Statistical summary box
+            ax6 = plt.subplot(2, 3, 6)
+            ax6.axis('off')
+            summary_text = f"""
+            STATISTICAL SUMMARY
+            
+            In-Degree:
+            • Mean: {np.mean(in_degree_sequence):.2f}
+            • Median: {np.median(in_degree_sequence):.2f}
+            • Std Dev: {np.std(in_degree_sequence):.2f}
+            • Max: {max(in_degree_sequence)}
+            
+            Out-Degree:
+            • Mean: {np.mean(out_degree_sequence):.2f}
+            • Median: {np.median(out_degree_sequence):.2f}
+            • Std Dev: {np.std(out_degree_sequence):.2f}
+            • Max: {max(out_degree_sequence)}
+            """
+            ax6.text(0.1, 0.5, summary_text, fontsize=11, family='monospace',
+                    bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5),
+                    verticalalignment='center')
+            
+            plt.tight_layout()
+            return fig
+        
+        st.image(figure_cache.png(page, {"figure": "degree distributions"}, fingerprint, draw_degree_distributions),
+                 use_column_width=True)
         
         st.markdown("""
         <div class='success-box'>
@@ -509,15 +722,15 @@ elif page == "📈 Network Statistics":
         col1, col2, col3 = st.columns(3)
         
         # Reciprocity
-        reciprocity = nx.reciprocity(G)
+        reciprocity = summary.reciprocity
         col1.metric("🤝 Reciprocity", f"{reciprocity*100:.2f}%", help="Percentage of mutual voting relationships")
         
         # Clustering
-        transitivity = nx.transitivity(G)
+        transitivity = engine.transitivity()
         col2.metric("🔺 Transitivity", f"{transitivity:.4f}", help="Global clustering coefficient")
         
         # Average clustering coefficient
-        avg_clustering = nx.average_clustering(G)
+        avg_clustering = engine.average_clustering()
         col3.metric("📊 Avg Clustering", f"{avg_clustering:.4f}", help="Average local clustering coefficient")
         
         st.markdown("<br>", unsafe_allow_html=True)
@@ -537,8 +750,8 @@ elif page == "📈 Network Statistics":
         
         # Reciprocity visualization
         st.markdown("#### 🔄 Reciprocity Breakdown")
-        mutual_edges = sum(1 for u, v in G.edges() if G.has_edge(v, u)) / 2
-        one_way_edges = G.number_of_edges() - (mutual_edges * 2)
+        mutual_edges = summary.mutual_edges / 2
+        one_way_edges = summary.edges - summary.mutual_edges
         
         fig_reciprocity = go.Figure(data=[go.Pie(
             labels=['Mutual Votes', 'One-Way Votes'],
@@ -551,45 +764,181 @@ elif page == "📈 Network Statistics":
             height=400
         )
         st.plotly_chart(fig_reciprocity, use_container_width=True)
+        
+        # Null-model significance
+        st.markdown("#### 🎲 Are These Values Unusual? (Null-Model Test)")
+        st.caption("Each statistic compared with randomized copies of the network in which every user keeps their in- and out-degree")
+        
+        col_n, col_run = st.columns([3, 1])
+        n_null = col_n.select_slider("Randomized graphs:", options=[10, 20, 50], value=20,
+                                     help="More graphs = sharper p-values; results are saved per dataset")
+        run_null = col_run.button("🎲 Run Null Models")
+        if run_null or engine.has_null_ensemble(n_null):
+            with st.spinner(f"🔄 Rewiring and re-measuring {n_null} random graphs..."):
+                ensemble = engine.null_ensemble(n_null)
+            null_labels = {'reciprocity': 'Reciprocity', 'transitivity': 'Transitivity',
+                           'assortativity': 'Assortativity (out → in)', 'modularity': 'Modularity (Louvain)'}
+            df_null = pd.DataFrame({
+                'Statistic': [null_labels[s] for s in STATISTICS],
+                'Observed': ensemble.observed,
+                'Random Mean': ensemble.mean,
+                'Random Std': ensemble.std,
+                'z-score': ensemble.z,
+                'p-value': ensemble.p_value
+            })
+            st.dataframe(df_null.round(4), use_container_width=True, hide_index=True)
+            
+            verdicts = "".join(
+                f"<li><strong>{row['Statistic']}:</strong> {row['Observed']:.4f} vs. {row['Random Mean']:.4f} at random - "
+                + (f"{'higher' if row['z-score'] > 0 else 'lower'} than chance (z = {row['z-score']:.1f}, p ≤ {row['p-value']:.3f})"
+                   if abs(row['z-score']) >= 2 else "within the random range")
+                + "</li>"
+                for _, row in df_null.iterrows()
+            )
+            st.markdown(f"""
+            <div class='insight-box'>
+                <h4>🎯 Against {ensemble.n_null} degree-preserving random graphs:</h4>
+                <ul>{verdicts}</ul>
+                <p>p-values are empirical, so the smallest possible value is 1/({ensemble.n_null} + 1).</p>
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.info("👆 Run the null models once; the comparison is then saved for this dataset.")
+        
+        # Triad census
+        st.markdown("#### 🔺 Triad Census")
+        st.caption("Every group of three users falls into one of 16 directed patterns (Holland & Leinhardt)")
+        
+        census_mode = st.radio("Census:", ["Exact", "Sampled (10% of nodes)", "Sampled (1% of nodes)"], horizontal=True,
+                               help="Sampling estimates the closed triads from a fraction of nodes, with 95% intervals")
+        fraction = {"Exact": 1.0, "Sampled (10% of nodes)": 0.1, "Sampled (1% of nodes)": 0.01}[census_mode]
+        with st.spinner("🔄 Counting triads..."):
+            census = engine.triad_census(fraction)
+        
+        df_triads = pd.DataFrame({'Triad Type': census.names, 'Count': census.counts, '± (95%)': census.ci})
+        fig_triads = go.Figure(go.Bar(
+            x=df_triads['Triad Type'], y=df_triads['Count'],
+            error_y=dict(type='data', array=df_triads['± (95%)'], visible=fraction < 1),
+            marker_color='#764ba2'
+        ))
+        fig_triads.update_layout(title="Directed Triad Census (log scale)", xaxis_title="Triad Type",
+                                 yaxis_title="Count", yaxis_type="log", height=500)
+        st.plotly_chart(fig_triads, use_container_width=True)
+        
+        motifs = motif_counts(census)
+        col1, col2, col3 = st.columns(3)
+        col1.metric("➡️ Transitive Triples", f"{motifs['Transitive triples']:,.0f}", help="i→j, j→k and i→k")
+        col2.metric("🔁 Cyclic Triads", f"{motifs['Cyclic triads']:,.0f}", help="Directed 3-cycles i→j→k→i")
+        col3.metric("🤝 Fully Reciprocated", f"{motifs['Fully reciprocated triangles (300)']:,.0f}", help="Three users who all voted for each other")
+        
+        with st.expander("📋 Full census table"):
+            st.dataframe(df_triads if fraction < 1 else df_triads.drop(columns='± (95%)'),
+                         use_container_width=True, hide_index=True)
+        
+        st.markdown("""
+        <div class='insight-box'>
+            <h4>🔍 Reading the census</h4>
+            <p>Transitive triples vastly outnumber cycles: votes flow "down" a ranking rather than around in circles,
+            the same <strong>hierarchy</strong> that the low reciprocity points to.</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Structural balance (signed datasets only)
+        if engine.compact.is_signed:
+            st.markdown("#### ⚖️ Structural Balance")
+            st.caption("Triangles classified by the sign of each pair's votes (support outweighing opposition = +)")
+            
+            with st.spinner("🔄 Classifying signed triangles..."):
+                balance = engine.balance_census()
+            
+            col1, col2, col3 = st.columns(3)
+            col1.metric("⚖️ Balanced Triangles", f"{balance.balanced_fraction*100:.1f}%", help="+++ and +-- triangles")
+            col2.metric("➕ Supportive Pairs", f"{balance.positive_pairs:,}")
+            col3.metric("➖ Opposing Pairs", f"{balance.negative_pairs:,}")
+            
+            df_balance = pd.DataFrame({
+                'Triangle': list(TRIAD_TYPES),
+                'Observed': balance.counts,
+                'Expected (shuffled signs)': balance.expected.round(1),
+                'Balanced': ['Yes' if BALANCED[t] else 'No' for t in TRIAD_TYPES]
+            })
+            fig_balance = go.Figure([
+                go.Bar(name='Observed', x=df_balance['Triangle'], y=df_balance['Observed'], marker_color='#667eea'),
+                go.Bar(name='Expected (shuffled signs)', x=df_balance['Triangle'], y=df_balance['Expected (shuffled signs)'], marker_color='#f093fb')
+            ])
+            fig_balance.update_layout(title="Signed Triangles vs. Random Signs", barmode='group',
+                                      xaxis_title="Triangle Signs", yaxis_title="Count", height=400)
+            st.plotly_chart(fig_balance, use_container_width=True)
+            st.dataframe(df_balance, use_container_width=True, hide_index=True)
+            
+            st.markdown("""
+            <div class='insight-box'>
+                <h4>🔍 Reading the balance census</h4>
+                <p>Balance theory expects "the friend of my friend" and "the enemy of my enemy" to be friends:
+                <strong>+++</strong> and <strong>+--</strong> triangles are balanced. More of them than under shuffled
+                signs means votes are structured by alliances rather than cast independently.</p>
+            </div>
+            """, unsafe_allow_html=True)
 
     # --- Tab 2: Distance Metrics ---
     with tab2:
         st.markdown("### 🌍 Small World Analysis")
         st.markdown("Calculating the 'degrees of separation' - how many steps to reach anyone in the network?")
         
-        if st.button("🚀 Run Distance Analysis", type="primary"):
-            with st.spinner("🔄 Extracting Giant Component & Calculating Paths..."):
-                # Extract Giant Component (Undirected view for connectivity)
-                U = G.to_undirected()
-                largest_cc = max(nx.connected_components(U), key=len)
-                subgraph = U.subgraph(largest_cc)
-                
-                st.success(f"✅ Giant Component extracted: {len(subgraph.nodes())} nodes ({len(subgraph.nodes())/G.number_of_nodes()*100:.1f}% of network)")
-                
-                # Metrics
-                diameter = nx.diameter(subgraph)
-                avg_path = nx.average_shortest_path_length(subgraph)
-                radius = nx.radius(subgraph)
-                
+        # Giant component of the undirected view, from the landmark distance index
+        try:
+            with st.spinner("🔄 Building landmark distance index..."):
+                oracle = engine.distance_oracle()
+                diameter, radius, n_bfs = engine.extremal_distances()
+        except ValueError as exc:
+            st.warning(f"⚠️ Distances skipped: {exc}")
+        else:
+            giant_size = int(oracle.giant.sum())
+            avg_path, avg_path_ci, n_sources = oracle.average_distance()
+        
+            st.success(f"✅ Giant Component extracted: {giant_size} nodes ({giant_size/summary.nodes*100:.1f}% of network)")
+        
+            col1, col2, col3 = st.columns(3)
+            col1.metric("🌐 Network Diameter", f"{diameter} steps", help="Longest shortest path in the network")
+            col2.metric("📏 Avg Path Length", f"{avg_path:.2f} ± {avg_path_ci:.2f} steps",
+                        help=f"Average distance between any two nodes, estimated from {n_sources} random sources (95% interval)")
+            col3.metric("⭕ Network Radius", f"{radius} steps", help="Minimum eccentricity in the network")
+            st.caption(f"📇 Index: {oracle.n_landmarks} landmark BFS rows ({oracle.nbytes/1024:,.0f} KB); "
+                       f"diameter and radius settled with {n_bfs} extra BFS")
+        
+            st.markdown("""
+            <div class='success-box'>
+                <h4>✅ Small World Confirmed!</h4>
+                <p>With an average path length of <strong>{:.2f} steps</strong>, this network exhibits the 
+                <strong>"small world"</strong> property - any user can reach any other user through just a few intermediaries.</p>
+                <p>This is similar to the famous "6 degrees of separation" in social networks!</p>
+            </div>
+            """.format(avg_path), unsafe_allow_html=True)
+        
+            # Point-to-point distance query
+            st.markdown("#### 🧭 How Many Steps Between Two Users?")
+            st.caption("Landmark bounds answer instantly; tick exact to settle any gap with a bidirectional BFS")
+            cg = engine.compact
+            col_a, col_b, col_exact = st.columns([2, 2, 1])
+            user_a = int(col_a.number_input("From user ID:", value=int(cg.ids[oracle.landmarks[0]]), step=1))
+            user_b = int(col_b.number_input("To user ID:", value=int(cg.ids[oracle.landmarks[-1]]), step=1))
+            exact = col_exact.checkbox("Exact", help="Bidirectional BFS when the bounds differ")
+            try:
+                u, v = cg.index_of([user_a, user_b])
+            except KeyError:
+                st.error("❌ Both users must exist in this dataset.")
+            else:
+                lower, upper, distance = oracle.query(cg, u, v, exact=exact)
                 col1, col2, col3 = st.columns(3)
-                col1.metric("🌐 Network Diameter", f"{diameter} steps", help="Longest shortest path in the network")
-                col2.metric("📏 Avg Path Length", f"{avg_path:.2f} steps", help="Average distance between any two nodes")
-                col3.metric("⭕ Network Radius", f"{radius} steps", help="Minimum eccentricity in the network")
-                
-                st.markdown("""
-                <div class='success-box'>
-                    <h4>✅ Small World Confirmed!</h4>
-                    <p>With an average path length of <strong>{:.2f} steps</strong>, this network exhibits the 
-                    <strong>"small world"</strong> property - any user can reach any other user through just a few intermediaries.</p>
-                    <p>This is similar to the famous "6 degrees of separation" in social networks!</p>
-                </div>
-                """.format(avg_path), unsafe_allow_html=True)
+                col1.metric("⬇️ Lower Bound", "∞" if np.isinf(lower) else f"{lower:.0f} steps")
+                col2.metric("⬆️ Upper Bound", "∞" if np.isinf(upper) else f"{upper:.0f} steps")
+                col3.metric("📏 Distance", "—" if distance is None else "∞ (not connected)" if np.isinf(distance) else f"{distance:.0f} steps")
 
     # --- Tab 3: Distribution ---
     with tab3:
         st.markdown("### 📊 Degree Distribution Analysis")
         
-        degrees = [d for n, d in G.degree()]
+        degrees = summary.degree.tolist()
         
         # Create interactive plotly figure
         fig = go.Figure()
@@ -614,7 +963,6 @@ elif page == "📈 Network Statistics":
         st.plotly_chart(fig, use_container_width=True)
         
         # Log-Log plot
-        from collections import Counter
         degree_counts = Counter(degrees)
         degrees_sorted = sorted(degree_counts.keys())
         counts = [degree_counts[d] for d in degrees_sorted]
@@ -649,6 +997,62 @@ elif page == "📈 Network Statistics":
             • This is characteristic of real-world social networks!
         </div>
         """, unsafe_allow_html=True)
+        
+        # Degree correlations
+        st.markdown("### 🔗 Degree Correlations")
+        st.caption("Do active voters vote for popular candidates? Degrees at the two ends of every vote, compared")
+        
+        correlations = engine.degree_correlations()
+        degree_pairs = {"Out → In": ("out", "in"), "Out → Out": ("out", "out"),
+                        "In → In": ("in", "in"), "In → Out": ("in", "out")}
+        for col, (pair_label, (x, y)) in zip(st.columns(4), degree_pairs.items()):
+            col.metric(f"r ({pair_label})", f"{correlations.coefficient(x, y):+.4f}",
+                       help=f"Correlation of the voter's {x}-degree with the candidate's {y}-degree over all votes")
+        
+        pair_label = st.radio("Degree pair (voter → candidate):", list(degree_pairs), horizontal=True)
+        x, y = degree_pairs[pair_label]
+        col_knn, col_jdm = st.columns(2)
+        
+        k, knn = correlations.knn(x, y)
+        fig_knn = go.Figure(go.Scatter(
+            x=k, y=knn,
+            mode='markers',
+            marker=dict(size=7, color='#667eea', opacity=0.6)
+        ))
+        fig_knn.update_layout(
+            title=f"k_nn(k): Mean Candidate {y.title()}-Degree",
+            xaxis_title=f"Voter {x}-degree k (log scale)",
+            yaxis_title=f"Mean candidate {y}-degree (log scale)",
+            xaxis_type="log",
+            yaxis_type="log",
+            height=450
+        )
+        col_knn.plotly_chart(fig_knn, use_container_width=True)
+        
+        labels, jdm = correlations.joint_degree_matrix(x, y)
+        fig_jdm = go.Figure(go.Heatmap(
+            z=np.log10(jdm + 1), x=labels, y=labels, customdata=jdm,
+            colorscale='Viridis', colorbar=dict(title='log10(votes + 1)'),
+            hovertemplate=f"Voter {x}-degree %{{y}}<br>Candidate {y}-degree %{{x}}<br>%{{customdata:,}} votes<extra></extra>"
+        ))
+        fig_jdm.update_layout(
+            title="Joint Degree Matrix (log2 bins)",
+            xaxis_title=f"Candidate {y}-degree",
+            yaxis_title=f"Voter {x}-degree",
+            height=450
+        )
+        col_jdm.plotly_chart(fig_jdm, use_container_width=True)
+        
+        r_out_in = correlations.coefficient("out", "in")
+        st.markdown(f"""
+        <div class='insight-box'>
+            <h4>🔍 Active voters and popular candidates</h4>
+            <p>r (Out → In) = <strong>{r_out_in:+.4f}</strong>: the busiest voters lean towards
+            {'candidates who receive <strong>fewer</strong> votes overall' if r_out_in < 0 else 'the <strong>most-voted</strong> candidates'}.
+            A falling k_nn(k) curve tells the same story degree by degree (<em>disassortative</em> mixing,
+            typical of hub-and-spoke networks); a rising one means like votes for like (<em>assortative</em>).</p>
+        </div>
+        """, unsafe_allow_html=True)
     
     # --- Tab 4: Network Properties ---
     with tab4:
@@ -658,33 +1062,31 @@ elif page == "📈 Network Statistics":
         
         with col1:
             st.markdown("#### 📊 Basic Properties")
-            st.metric("Nodes", f"{G.number_of_nodes():,}")
-            st.metric("Edges", f"{G.number_of_edges():,}")
-            st.metric("Density", f"{nx.density(G):.6f}")
+            st.metric("Nodes", f"{summary.nodes:,}")
+            st.metric("Edges", f"{summary.edges:,}")
+            st.metric("Density", f"{summary.density:.6f}")
             st.metric("Is Directed", "Yes ✓")
             
         with col2:
             st.markdown("#### 🔢 Degree Statistics")
-            degrees_list = [d for n, d in G.degree()]
-            st.metric("Mean Degree", f"{np.mean(degrees_list):.2f}")
-            st.metric("Median Degree", f"{np.median(degrees_list):.0f}")
-            st.metric("Std Deviation", f"{np.std(degrees_list):.2f}")
-            st.metric("Max Degree", f"{max(degrees_list):,}")
+            st.metric("Mean Degree", f"{summary.mean_degree:.2f}")
+            st.metric("Median Degree", f"{summary.median_degree:.0f}")
+            st.metric("Std Deviation", f"{summary.std_degree:.2f}")
+            st.metric("Max Degree", f"{summary.max_degree:,}")
         
         st.markdown("<br>", unsafe_allow_html=True)
         
         # Component analysis
         st.markdown("#### 🌐 Component Analysis")
         
-        if G.is_directed():
-            num_weakly_cc = nx.number_weakly_connected_components(G)
-            num_strongly_cc = nx.number_strongly_connected_components(G)
-            
-            col_a, col_b = st.columns(2)
-            col_a.metric("Weakly Connected Components", num_weakly_cc)
-            col_b.metric("Strongly Connected Components", num_strongly_cc)
-            
-            st.info("**Weakly Connected:** Nodes connected by any path (ignoring direction). **Strongly Connected:** Nodes with directed paths in both directions.")
+        num_weakly_cc = summary.weak_components
+        num_strongly_cc = summary.strong_components
+        
+        col_a, col_b = st.columns(2)
+        col_a.metric("Weakly Connected Components", num_weakly_cc)
+        col_b.metric("Strongly Connected Components", num_strongly_cc)
+        
+        st.info("**Weakly Connected:** Nodes connected by any path (ignoring direction). **Strongly Connected:** Nodes with directed paths in both directions.")
 
 # ==========================================
 # PAGE 3: POWER & ROLES (Centrality)
@@ -698,34 +1100,32 @@ elif page == "👑 Power & Roles (Centrality)":
         with st.spinner("🔄 Calculating Centrality Metrics (PageRank, Betweenness, Closeness)..."):
             progress_bar = st.progress(0)
             
-            # Use actual degree counts (integers) instead of normalized centrality
-            in_degree = dict(G.in_degree())
-            progress_bar.progress(25)
+            # Each metric is memoized by the engine; centrality() then collects them
+            engine.pagerank()
+            progress_bar.progress(40)
             
-            pagerank = nx.pagerank(G, alpha=0.85)
+            engine.hits()
             progress_bar.progress(50)
             
-            betweenness = nx.betweenness_centrality(G, k=1000)  # Sample for speed
-            progress_bar.progress(75)
-            
-            # Use actual degree counts (integers) instead of normalized centrality
-            out_degree = dict(G.out_degree())
-            progress_bar.progress(100)
+            engine.betweenness(1000)  # Sample for speed
+            progress_bar.progress(70)
             
-            # Scale PageRank and Betweenness by 100,000 to get whole numbers
-           # pagerank = {k: int(v * 100000) for k, v in pagerank.items()}
-           # betweenness = {k: int(v * 100000) for k, v in betweenness.items()}
+            engine.closeness(256)  # Sample for speed
+            progress_bar.progress(90)
             
-            st.session_state.centrality_df = pd.DataFrame({
-                'In-Degree': in_degree,
-                'Out-Degree': out_degree,
-                'PageRank': pagerank,
-                'Betweenness': betweenness
-            })
+            # Signed datasets add approval and PageRank over support / net of opposition
+            centrality_df = pd.DataFrame(engine.centrality(betweenness_k=1000, closeness_k=256),
+                                         index=pd.Index(engine.compact.ids)).rename(columns=CENTRALITY_COLUMNS)
+            progress_bar.progress(100)
+            st.session_state.centrality_df = centrality_df
     
     df_metrics = st.session_state.centrality_df
+    signed = 'Approval' in df_metrics.columns
     
     # Explanation
+    signed_notes = """
+            <li><strong>Approval:</strong> Share of support among the for/against votes you received</li>
+            <li><strong>Positive / Net PageRank:</strong> PageRank over support votes only, and minus the same over oppose votes</li>""" if signed else ""
     st.markdown("""
     <div class='insight-box'>
         <h4>🎯 Understanding Centrality Metrics:</h4>
@@ -734,22 +1134,24 @@ elif page == "👑 Power & Roles (Centrality)":
             <li><strong>PageRank:</strong> Quality of connections - being voted by important people</li>
             <li><strong>Betweenness:</strong> Bridge role - how often you connect different groups</li>
             <li><strong>Out-Degree:</strong> Activity level - actual number of people you voted for</li>
+            <li><strong>Hub (HITS):</strong> Good judge - votes for the users that good judges vote for</li>
+            <li><strong>Authority (HITS):</strong> Endorsed candidate - voted for by the best judges</li>
+            <li><strong>Closeness / Harmonic:</strong> Reach - how few steps others need to get to you</li>{}
         </ul>
     </div>
-    """, unsafe_allow_html=True)
+    """.format(signed_notes), unsafe_allow_html=True)
     
     st.markdown("<br>", unsafe_allow_html=True)
     
     # Top Rankings with Interactive Charts
-    tab1, tab2, tab3, tab4 = st.tabs(["👑 Most Popular", "⭐ Most Influential", "🌉 Best Brokers", "🗳️ Most Active"])
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs(["👑 Most Popular", "⭐ Most Influential", "🌉 Best Brokers", "🗳️ Most Active", "🧭 Top Hubs", "🎯 Top Authorities", "📡 Most Central", "🧅 Core Structure"])
     
     with tab1:
         st.markdown("### 🏆 Top 15 by In-Degree (Vote Count)")
         st.caption("Users with the most direct votes received - the most popular/trusted")
         
         top_in = df_metrics.nlargest(15, 'In-Degree')
-        top_in_reset = top_in.reset_index()
-        top_in_reset.columns = ['User ID', 'In-Degree', 'Out-Degree', 'PageRank', 'Betweenness']
+        top_in_reset = top_in.reset_index().rename(columns={'index': 'User ID'})
         
         fig1 = px.bar(top_in_reset, x='User ID', y='In-Degree',
                       title='Top 15 Users by In-Degree (Vote Count)',
@@ -760,34 +1162,56 @@ elif page == "👑 Power & Roles (Centrality)":
         fig1.update_layout(height=500)
         st.plotly_chart(fig1, use_container_width=True)
         
-        st.dataframe(top_in_reset[['User ID', 'In-Degree']], use_container_width=True, hide_index=True)
+        st.dataframe(top_in_reset[['User ID', 'In-Degree'] + (['Votes For', 'Votes Against', 'Approval'] if signed else [])],
+                     use_container_width=True, hide_index=True)
+        
+        if signed:
+            st.markdown("### ✅ Top 15 by Approval")
+            min_votes = st.slider("Minimum for/against votes received:", 1, 50, 10,
+                                  help="Ratios over a handful of votes are noisy")
+            top_ap = df_metrics[df_metrics['Votes For'] + df_metrics['Votes Against'] >= min_votes].nlargest(15, ['Approval', 'Votes For'])
+            top_ap_reset = top_ap.reset_index().rename(columns={'index': 'User ID'})
+            
+            fig_ap = px.bar(top_ap_reset, x='User ID', y='Approval',
+                            title='Top 15 Users by Approval Ratio',
+                            color='Approval',
+                            color_continuous_scale='Greens',
+                            text='Votes For')
+            fig_ap.update_traces(texttemplate='%{text:.0f} for', textposition='outside')
+            fig_ap.update_layout(height=500, xaxis_type='category')
+            st.plotly_chart(fig_ap, use_container_width=True)
+            
+            st.dataframe(top_ap_reset[['User ID', 'Approval', 'Votes For', 'Votes Against']], use_container_width=True, hide_index=True)
     
     with tab2:
-        st.markdown("### ⭐ Top 15 by PageRank")
+        pr_column = 'PageRank'
+        if signed:
+            pr_over = st.radio("PageRank over:", ["All votes", "Support votes", "Support minus opposition"], horizontal=True)
+            pr_column = {"All votes": 'PageRank', "Support votes": 'Positive PageRank',
+                         "Support minus opposition": 'Net PageRank'}[pr_over]
+        st.markdown(f"### ⭐ Top 15 by {pr_column}")
         st.caption("Users with the highest quality connections - true influencers")
         
-        top_pr = df_metrics.nlargest(15, 'PageRank')
-        top_pr_reset = top_pr.reset_index()
-        top_pr_reset.columns = ['User ID', 'In-Degree', 'Out-Degree', 'PageRank', 'Betweenness']
+        top_pr = df_metrics.nlargest(15, pr_column)
+        top_pr_reset = top_pr.reset_index().rename(columns={'index': 'User ID'})
         
-        fig2 = px.bar(top_pr_reset, x='User ID', y='PageRank',
-                      title='Top 15 Users by PageRank Score',
-                      color='PageRank',
+        fig2 = px.bar(top_pr_reset, x='User ID', y=pr_column,
+                      title=f'Top 15 Users by {pr_column} Score',
+                      color=pr_column,
                       color_continuous_scale='Viridis',
-                      text='PageRank')
+                      text=pr_column)
         fig2.update_traces(texttemplate='%{text:.0f}', textposition='outside')
         fig2.update_layout(height=500)
         st.plotly_chart(fig2, use_container_width=True)
         
-        st.dataframe(top_pr_reset[['User ID', 'PageRank']], use_container_width=True, hide_index=True)
+        st.dataframe(top_pr_reset[['User ID', pr_column] + (['Approval'] if signed else [])], use_container_width=True, hide_index=True)
     
     with tab3:
         st.markdown("### 🌉 Top 15 by Betweenness Centrality")
         st.caption("Users who bridge different communities - the connectors")
         
         top_bt = df_metrics.nlargest(15, 'Betweenness')
-        top_bt_reset = top_bt.reset_index()
-        top_bt_reset.columns = ['User ID', 'In-Degree', 'Out-Degree', 'PageRank', 'Betweenness']
+        top_bt_reset = top_bt.reset_index().rename(columns={'index': 'User ID'})
         
         fig3 = px.bar(top_bt_reset, x='User ID', y='Betweenness',
                       title='Top 15 Users by Betweenness Score',
@@ -805,8 +1229,7 @@ elif page == "👑 Power & Roles (Centrality)":
         st.caption("Most active voters - highly engaged users (votes cast)")
         
         top_out = df_metrics.nlargest(15, 'Out-Degree')
-        top_out_reset = top_out.reset_index()
-        top_out_reset.columns = ['User ID', 'In-Degree', 'Out-Degree', 'PageRank', 'Betweenness']
+        top_out_reset = top_out.reset_index().rename(columns={'index': 'User ID'})
         
         fig4 = px.bar(top_out_reset, x='User ID', y='Out-Degree',
                       title='Top 15 Users by Out-Degree (Vote Count)',
@@ -818,6 +1241,166 @@ elif page == "👑 Power & Roles (Centrality)":
         st.plotly_chart(fig4, use_container_width=True)
         
         st.dataframe(top_out_reset[['User ID', 'Out-Degree']], use_container_width=True, hide_index=True)
+    
+    with tab5:
+        st.markdown("### 🧭 Top 15 Hubs (HITS)")
+        st.caption("Voters whose ballots point at the strongest candidates - the best judges")
+        
+        top_hub = df_metrics.nlargest(15, 'Hub')
+        top_hub_reset = top_hub.reset_index().rename(columns={'index': 'User ID'})
+        
+        fig5 = px.bar(top_hub_reset, x='User ID', y='Hub',
+                      title='Top 15 Users by Hub Score',
+                      color='Hub',
+                      color_continuous_scale='Teal',
+                      text='Out-Degree')
+        fig5.update_traces(texttemplate='%{text:.0f} votes', textposition='outside')
+        fig5.update_layout(height=500)
+        st.plotly_chart(fig5, use_container_width=True)
+        
+        st.dataframe(top_hub_reset[['User ID', 'Hub', 'Out-Degree']], use_container_width=True, hide_index=True)
+    
+    with tab6:
+        st.markdown("### 🎯 Top 15 Authorities (HITS)")
+        st.caption("Candidates endorsed by the best hubs - support from the voters who matter")
+        
+        top_auth = df_metrics.nlargest(15, 'Authority')
+        top_auth_reset = top_auth.reset_index().rename(columns={'index': 'User ID'})
+        
+        fig6 = px.bar(top_auth_reset, x='User ID', y='Authority',
+                      title='Top 15 Users by Authority Score',
+                      color='Authority',
+                      color_continuous_scale='Magenta',
+                      text='In-Degree')
+        fig6.update_traces(texttemplate='%{text:.0f} votes', textposition='outside')
+        fig6.update_layout(height=500)
+        st.plotly_chart(fig6, use_container_width=True)
+        
+        st.dataframe(top_auth_reset[['User ID', 'Authority', 'In-Degree']], use_container_width=True, hide_index=True)
+    
+    with tab7:
+        st.markdown("### 📡 Closeness & Harmonic Centrality")
+        st.caption("Users the rest of the network reaches in the fewest steps - the broadcasters")
+        
+        col_k, col_mode = st.columns(2)
+        n_sources = col_k.select_slider("Sampled BFS sources (k):", options=[64, 128, 256, 512, 1024, 2048], value=256,
+                                        help="More sources = tighter confidence intervals, more computation")
+        mode = col_mode.radio("Mode:", ["Sampled estimate (95% CI)", "Exact top-15 (pruned BFS)"], horizontal=True)
+        
+        cg = engine.compact
+        if mode.startswith("Sampled"):
+            est = engine.closeness(n_sources)
+            df_close = pd.DataFrame({
+                'User ID': cg.ids,
+                'Closeness': est.closeness,
+                'Closeness ± (95%)': est.closeness_ci,
+                'Harmonic': est.harmonic,
+                'Harmonic ± (95%)': est.harmonic_ci
+            }).nlargest(15, 'Harmonic')
+            
+            fig7 = go.Figure(go.Bar(
+                x=df_close['User ID'].astype(str), y=df_close['Harmonic'],
+                error_y=dict(type='data', array=df_close['Harmonic ± (95%)']),
+                marker_color='#667eea'
+            ))
+            fig7.update_layout(title=f'Top 15 Users by Harmonic Centrality (estimated from {est.n_sources} sources)',
+                               xaxis_title='User ID', yaxis_title='Harmonic Centrality', height=500)
+            st.plotly_chart(fig7, use_container_width=True)
+            
+            st.dataframe(df_close, use_container_width=True, hide_index=True)
+        else:
+            with st.spinner("🔄 Searching for the exact top 15 (pruned BFS)..."):
+                nodes, scores, n_pruned = engine.top_harmonic(15)
+            
+            df_exact = pd.DataFrame({
+                'Rank': range(1, len(nodes) + 1),
+                'User ID': cg.ids[nodes],
+                'Harmonic (exact)': scores,
+                'Votes Received': cg.in_degree[nodes]
+            })
+            
+            fig7 = px.bar(df_exact, x=df_exact['User ID'].astype(str), y='Harmonic (exact)',
+                          title='Exact Top 15 Users by Harmonic Centrality',
+                          labels={'x': 'User ID'},
+                          color='Harmonic (exact)',
+                          color_continuous_scale='Blues')
+            fig7.update_layout(height=500)
+            st.plotly_chart(fig7, use_container_width=True)
+            
+            st.dataframe(df_exact, use_container_width=True, hide_index=True)
+            st.caption(f"✂️ {n_pruned:,} of {cg.n_nodes:,} users were ruled out without a full BFS")
+    
+    with tab8:
+        st.markdown("### 🧅 k-Core Decomposition")
+        st.caption("Peeling away the periphery: the k-core is the largest group where everyone keeps at least k ties inside it")
+        
+        core_mode = st.radio("Core type:", ["Total (in + out)", "In-core (votes received)", "Out-core (votes cast)"], horizontal=True)
+        mode_key = {"Total": "total", "In-core": "in", "Out-core": "out"}[core_mode.split(" (")[0]]
+        
+        cg = engine.compact
+        core = engine.core_numbers(mode_key)
+        shells = shell_sizes(core)
+        degeneracy = int(core.max()) if len(core) else 0
+        
+        col1, col2, col3 = st.columns(3)
+        col1.metric("🧅 Max Core (k)", degeneracy, help="Deepest shell - every member has at least k ties inside it")
+        col2.metric("💎 Innermost Core", f"{int(shells[-1]):,} users")
+        col3.metric("📚 Non-empty Shells", int((shells > 0).sum()))
+        
+        df_shells = pd.DataFrame({'Core Number (k)': np.arange(len(shells)), 'Users': shells})
+        df_shells = df_shells[df_shells['Users'] > 0]
+        fig8 = px.bar(df_shells, x='Core Number (k)', y='Users',
+                      title='Shell Sizes: Users per Core Number',
+                      color='Users',
+                      color_continuous_scale='Purples')
+        fig8.update_layout(height=500)
+        st.plotly_chart(fig8, use_container_width=True)
+        
+        inner = np.flatnonzero(core == degeneracy)
+        df_inner = pd.DataFrame({
+            'User ID': cg.ids[inner],
+            'Votes Received': cg.in_degree[inner],
+            'Votes Cast': cg.out_degree[inner]
+        }).nlargest(15, 'Votes Received')
+        st.markdown(f"#### 💎 Innermost {degeneracy}-Core (top 15 by votes received)")
+        st.dataframe(df_inner, use_container_width=True, hide_index=True)
+        
+        st.markdown("### 🏰 Rich-Club Coefficient")
+        st.caption("Do the best-connected users preferentially connect to each other? φ(k) = density among users with degree > k")
+        
+        n_null = st.select_slider("Rewired null graphs:", options=[4, 8, 16, 32], value=8,
+                                  help="Degree-preserving rewirings used to normalize the curve")
+        if st.button("🚀 Compute Rich-Club Curve", type="primary"):
+            with st.spinner(f"🔄 Rewiring {n_null} null graphs in parallel..."):
+                phi, phi_null, phi_null_std = engine.rich_club(n_null)
+            
+            ks = np.arange(len(phi))
+            defined = ~np.isnan(phi)
+            rho = np.divide(phi, phi_null, out=np.full(len(phi), np.nan), where=phi_null > 0)
+            
+            fig_rc = go.Figure()
+            fig_rc.add_trace(go.Scatter(x=ks[defined], y=phi[defined], mode='lines', name='Observed φ(k)',
+                                        line=dict(color='#667eea', width=3)))
+            fig_rc.add_trace(go.Scatter(x=ks[defined], y=phi_null[defined], mode='lines', name='Rewired φ_rand(k)',
+                                        line=dict(color='#f093fb', dash='dash'),
+                                        error_y=dict(type='data', array=phi_null_std[defined], visible=True, thickness=0.5)))
+            fig_rc.update_layout(title='Rich-Club Coefficient vs Degree-Preserving Null Model',
+                                 xaxis_title='Degree threshold k', yaxis_title='φ(k)', xaxis_type='log', height=500)
+            st.plotly_chart(fig_rc, use_container_width=True)
+            
+            fig_rho = go.Figure(go.Scatter(x=ks[defined], y=rho[defined], mode='lines', line=dict(color='#764ba2', width=3)))
+            fig_rho.add_hline(y=1, line_dash='dot', line_color='gray')
+            fig_rho.update_layout(title='Normalized Rich-Club Coefficient ρ(k) = φ(k) / φ_rand(k)',
+                                  xaxis_title='Degree threshold k', yaxis_title='ρ(k)', xaxis_type='log', height=500)
+            st.plotly_chart(fig_rho, use_container_width=True)
+            
+            st.markdown("""
+            <div class='insight-box'>
+                <h4>🔍 Reading the curve</h4>
+                <p><strong>ρ(k) > 1</strong> means users with more than k connections are more tightly knit than their degrees alone
+                would explain - an elite "club". <strong>ρ(k) ≈ 1</strong> means their density is just a side effect of being hubs.</p>
+            </div>
+            """, unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown("---")
@@ -866,7 +1449,16 @@ elif page == "🎨 Visualizations (Graphs)":
     st.markdown("<div class='big-font'>🎨 Network Visualizations</div>", unsafe_allow_html=True)
     st.markdown("<p style='color: #666; font-size: 18px;'>Visual exploration of network structure and patterns</p>", unsafe_allow_html=True)
     
-    tab_v1, tab_v2, tab_v3 = st.tabs(["🕸️ Network Graph", "🔥 Matrix Heatmap", "📍 Interactive 3D"])
+    # Node selection shared by all views
+    col_sel, col_seed = st.columns([3, 1])
+    selection = col_sel.selectbox("Node selection:", ["Top degree"] + list(SAMPLERS),
+                                  help="Top degree shows only the elite core; samplers give a representative picture of the whole network")
+    sample_seed = int(col_seed.number_input("Sample seed:", value=42, step=1))
+    sampled = selection != "Top degree"
+    if sampled:
+        st.caption(f"🎲 Sampling: {selection.lower()} (seed {sample_seed}) - sparser than the elite core, so larger samples draw at the same cost")
+    
+    tab_v1, tab_v2, tab_v3, tab_v4 = st.tabs(["🕸️ Network Graph", "🔥 Matrix Heatmap", "📍 Interactive 3D", "🗺️ Whole-Network Map"])
     
     # --- Graph Viz ---
     with tab_v1:
@@ -874,63 +1466,67 @@ elif page == "🎨 Visualizations (Graphs)":
         st.caption("Nodes sized by votes received, colored by community, labeled with user IDs")
         
         # Size selector
-        top_n = st.slider("Select number of top nodes to visualize:", 20, 150, 100, 10)
-        
-        # Filter Top N
-        top_nodes = sorted(G.degree, key=lambda x: x[1], reverse=True)[:top_n]
-        nodes_list = [n for n, d in top_nodes]
-        subgraph = G.subgraph(nodes_list)
+        top_n = st.slider("Select number of nodes to visualize:", 20, 400 if sampled else 150, 100, 10)
         
-        # Layout
         layout_type = st.selectbox("Select Layout Algorithm:", 
                                     ["Spring (Force-directed)", "Circular", "Kamada-Kawai"])
         
-        if layout_type == "Spring (Force-directed)":
-            pos = nx.spring_layout(subgraph, seed=42, k=0.5, iterations=50)
-        elif layout_type == "Circular":
-            pos = nx.circular_layout(subgraph)
-        else:
-            pos = nx.kamada_kawai_layout(subgraph)
-        
-        # Draw
-        fig, ax = plt.subplots(figsize=(16, 16))
-        
-        # Community colors
-        try:
-            communities = list(greedy_modularity_communities(subgraph.to_undirected()))
-            color_map = {}
-            for i, comm in enumerate(communities):
-                for node in comm:
-                    color_map[node] = i
-            node_colors = [color_map.get(n, 0) for n in subgraph.nodes()]
-        except:
-            node_colors = ['#667eea'] * len(subgraph.nodes())
-        
-        # Draw edges first (in background)
-        nx.draw_networkx_edges(subgraph, pos, alpha=0.15, edge_color='gray', 
-                               width=0.5, arrows=True, arrowsize=8, 
-                               arrowstyle='->', connectionstyle='arc3,rad=0.1')
-        
-        # Draw nodes
-        node_sizes = [subgraph.in_degree(n) * 50 + 100 for n in subgraph.nodes()]
-        nx.draw_networkx_nodes(subgraph, pos, node_size=node_sizes,
-                               node_color=node_colors, cmap=plt.cm.tab10, 
-                               alpha=0.8, edgecolors='black', linewidths=1.5)
-        
-        # Draw labels for top 30 nodes only
-        if top_n <= 50:
-            nx.draw_networkx_labels(subgraph, pos, font_size=9, 
-                                   font_color='black', font_weight='bold')
-        else:
-            top_30_nodes = nodes_list[:30]
-            labels = {n: n for n in top_30_nodes if n in subgraph.nodes()}
-            nx.draw_networkx_labels(subgraph, pos, labels=labels, font_size=8,
-                                   font_color='black', font_weight='bold')
+        def draw_network():
+            # Filter Top N (or sample)
+            nodes_list = select_nodes(engine, dataset_key, selection, top_n, sample_seed)
+            subgraph = engine.subgraph(nodes_list)
+            view_label = f"{selection} Sample of {top_n} Users" if sampled else f"Top {top_n} Users"
+            
+            # Layout
+            if layout_type == "Spring (Force-directed)":
+                pos = nx.spring_layout(subgraph, seed=42, k=0.5, iterations=50)
+            elif layout_type == "Circular":
+                pos = nx.circular_layout(subgraph)
+            else:
+                pos = nx.kamada_kawai_layout(subgraph)
+            
+            # Draw
+            fig, ax = plt.subplots(figsize=(16, 16))
+            
+            # Community colors
+            try:
+                communities = list(greedy_modularity_communities(subgraph.to_undirected()))
+                color_map = {}
+                for i, comm in enumerate(communities):
+                    for node in comm:
+                        color_map[node] = i
+                node_colors = [color_map.get(n, 0) for n in subgraph.nodes()]
+            except:
+                node_colors = ['#667eea'] * len(subgraph.nodes())
+            
+            # Draw edges first (in background)
+            nx.draw_networkx_edges(subgraph, pos, alpha=0.15, edge_color='gray', 
+                                   width=0.5, arrows=True, arrowsize=8, 
+                                   arrowstyle='->', connectionstyle='arc3,rad=0.1')
+            
+            # Draw nodes
+            node_sizes = [subgraph.in_degree(n) * 50 + 100 for n in subgraph.nodes()]
+            nx.draw_networkx_nodes(subgraph, pos, node_size=node_sizes,
+                                   node_color=node_colors, cmap=plt.cm.tab10, 
+                                   alpha=0.8, edgecolors='black', linewidths=1.5)
+            
+            # Draw labels for top 30 nodes only
+            if top_n <= 50:
+                nx.draw_networkx_labels(subgraph, pos, font_size=9, 
+                                       font_color='black', font_weight='bold')
+            else:
+                top_30_nodes = nodes_list[:30]
+                labels = {n: n for n in top_30_nodes if n in subgraph.nodes()}
+                nx.draw_networkx_labels(subgraph, pos, labels=labels, font_size=8,
+                                       font_color='black', font_weight='bold')
+            
+            plt.title(f"Network Visualization: {view_label}", fontsize=20, fontweight='bold', pad=20)
+            plt.axis('off')
+            plt.tight_layout()
+            return fig
         
-        plt.title(f"Network Visualization: Top {top_n} Users", fontsize=20, fontweight='bold', pad=20)
-        plt.axis('off')
-        plt.tight_layout()
-        st.pyplot(fig)
+        graph_params = {"figure": "network", "selection": selection, "seed": sample_seed, "n": top_n, "layout": layout_type}
+        st.image(figure_cache.png(page, graph_params, fingerprint, draw_network), use_column_width=True)
         
         st.markdown("""
         <div class='success-box'>
@@ -948,115 +1544,198 @@ elif page == "🎨 Visualizations (Graphs)":
         st.markdown("### 🔥 Adjacency Matrix Heatmap")
         st.caption("Visual representation of voting patterns - who voted for whom")
         
-        matrix_size = st.slider("Matrix size (top N users):", 20, 50, 30, 5)
-        
-        top_n_matrix = sorted(G.degree, key=lambda x: x[1], reverse=True)[:matrix_size]
-        nodes_matrix = [n for n, d in top_n_matrix]
-        sub_matrix = G.subgraph(nodes_matrix)
-        matrix = nx.to_pandas_adjacency(sub_matrix, dtype=int)
+        matrix_size = st.slider("Matrix size (N users):", 20, 50, 30, 5)
+        
+        cg = engine.compact
+        
+        def draw_heatmap():
+            nodes_matrix = select_nodes(engine, dataset_key, selection, matrix_size, sample_seed)
+            fig2, ax2 = plt.subplots(figsize=(14, 12))
+            if cg.is_signed:
+                # Shift signs to 1..3 so an absent vote stays a sparse 0, then blank it out
+                idx = cg.index_of(nodes_matrix)
+                codes = cg.to_csr(signed=True)
+                codes.data = codes.data.astype(np.int8) + 2
+                values = codes[idx][:, idx].toarray().astype(float) - 2
+                values[values < -1] = np.nan
+                matrix = pd.DataFrame(values, index=nodes_matrix, columns=nodes_matrix)
+                sns.heatmap(matrix, cmap="RdYlGn", vmin=-1, vmax=1, center=0,
+                           cbar_kws={'label': 'Vote (+1 = Support, 0 = Neutral, -1 = Oppose)', 'ticks': [-1, 0, 1]},
+                           square=True, linewidths=0.3, linecolor='white', annot=False, cbar=True, ax=ax2)
+                ax2.set_facecolor('#f0f0f0')
+            else:
+                sub_matrix = engine.subgraph(nodes_matrix)
+                matrix = nx.to_pandas_adjacency(sub_matrix, dtype=int)
+                sns.heatmap(matrix, cmap="RdYlBu_r", cbar_kws={'label': 'Vote (1=Yes, 0=No)'}, 
+                           square=True, linewidths=0.3, linecolor='white',
+                           annot=False, fmt='d', cbar=True)
+            plt.xlabel("Candidate (Voted For)", fontsize=12, fontweight='bold')
+            plt.ylabel("Voter (Voting User)", fontsize=12, fontweight='bold')
+            plt.title(f"Voting Matrix: {selection + ' Sample of' if sampled else 'Top'} {matrix_size} Users", fontsize=16, fontweight='bold', pad=15)
+            plt.tight_layout()
+            return fig2
         
-        fig2, ax2 = plt.subplots(figsize=(14, 12))
-        sns.heatmap(matrix, cmap="RdYlBu_r", cbar_kws={'label': 'Vote (1=Yes, 0=No)'}, 
-                   square=True, linewidths=0.3, linecolor='white',
-                   annot=False, fmt='d', cbar=True)
-        plt.xlabel("Candidate (Voted For)", fontsize=12, fontweight='bold')
-        plt.ylabel("Voter (Voting User)", fontsize=12, fontweight='bold')
-        plt.title(f"Voting Matrix: Top {matrix_size} Users", fontsize=16, fontweight='bold', pad=15)
-        plt.tight_layout()
-        st.pyplot(fig2)
+        heatmap_params = {"figure": "heatmap", "selection": selection, "seed": sample_seed, "n": matrix_size}
+        st.image(figure_cache.png(page, heatmap_params, fingerprint, draw_heatmap), use_column_width=True)
         
+        cell_notes = """
+                <li><strong>Green / Yellow / Red Cells:</strong> The row user supported / was neutral on / opposed the column user</li>
+                <li><strong>Grey Cells:</strong> No vote relationship</li>""" if cg.is_signed else """
+                <li><strong>Red Cells:</strong> A vote exists from row user to column user</li>
+                <li><strong>Blue Cells:</strong> No vote relationship</li>"""
         st.markdown("""
         <div class='insight-box'>
             <strong>📊 How to Read:</strong>
             <ul>
                 <li><strong>Rows:</strong> Voters (who is voting)</li>
-                <li><strong>Columns:</strong> Candidates (who receives votes)</li>
-                <li><strong>Red Cells:</strong> A vote exists from row user to column user</li>
-                <li><strong>Blue Cells:</strong> No vote relationship</li>
+                <li><strong>Columns:</strong> Candidates (who receives votes)</li>{}
             </ul>
         </div>
-        """, unsafe_allow_html=True)
+        """.format(cell_notes), unsafe_allow_html=True)
     
     # --- 3D Interactive ---
     with tab_v3:
         st.markdown("### 📍 Interactive 3D Network Visualization")
         st.caption("Explore the network in 3D space - rotate, zoom, and interact!")
         
-        n_nodes_3d = st.slider("Number of nodes for 3D visualization:", 30, 100, 50, 10)
-        
-        # Get top nodes
-        top_3d = sorted(G.degree, key=lambda x: x[1], reverse=True)[:n_nodes_3d]
-        nodes_3d = [n for n, d in top_3d]
-        sub_3d = G.subgraph(nodes_3d)
-        
-        # 3D spring layout
-        pos_3d = nx.spring_layout(sub_3d, dim=3, seed=42, k=0.5)
-        
-        # Extract coordinates
-        x_nodes = [pos_3d[node][0] for node in sub_3d.nodes()]
-        y_nodes = [pos_3d[node][1] for node in sub_3d.nodes()]
-        z_nodes = [pos_3d[node][2] for node in sub_3d.nodes()]
-        
-        # Node sizes based on degree
-        node_sizes_3d = [sub_3d.degree(n) * 3 for n in sub_3d.nodes()]
-        
-        # Create edges
-        edge_x = []
-        edge_y = []
-        edge_z = []
-        
-        for edge in sub_3d.edges():
-            x0, y0, z0 = pos_3d[edge[0]]
-            x1, y1, z1 = pos_3d[edge[1]]
-            edge_x.extend([x0, x1, None])
-            edge_y.extend([y0, y1, None])
-            edge_z.extend([z0, z1, None])
-        
-        # Create 3D plot
-        fig_3d = go.Figure()
-        
-        # Add edges
-        fig_3d.add_trace(go.Scatter3d(
-            x=edge_x, y=edge_y, z=edge_z,
-            mode='lines',
-            line=dict(color='rgba(125,125,125,0.3)', width=1),
-            hoverinfo='none',
-            showlegend=False
-        ))
+        n_nodes_3d = st.slider("Number of nodes for 3D visualization:", 30, 300 if sampled else 100, 50, 10)
         
-        # Add nodes
-        fig_3d.add_trace(go.Scatter3d(
-            x=x_nodes, y=y_nodes, z=z_nodes,
-            mode='markers+text',
-            marker=dict(
-                size=node_sizes_3d,
-                color=node_sizes_3d,
-                colorscale='Viridis',
-                showscale=True,
-                colorbar=dict(title="Degree"),
-                line=dict(color='white', width=0.5)
-            ),
-            text=[str(node) for node in sub_3d.nodes()],
-            textposition="top center",
-            textfont=dict(size=8),
-            hovertemplate='<b>User %{text}</b><br>Degree: %{marker.size:.0f}<extra></extra>',
-            showlegend=False
-        ))
-        
-        fig_3d.update_layout(
-            title=f"3D Network Visualization: Top {n_nodes_3d} Users",
-            scene=dict(
-                xaxis=dict(showbackground=False, showticklabels=False, title=''),
-                yaxis=dict(showbackground=False, showticklabels=False, title=''),
-                zaxis=dict(showbackground=False, showticklabels=False, title='')
-            ),
-            height=700,
-            hovermode='closest'
-        )
+        def build_3d():
+            # Get top nodes (or sample)
+            nodes_3d = select_nodes(engine, dataset_key, selection, n_nodes_3d, sample_seed)
+            sub_3d = engine.subgraph(nodes_3d)
+            
+            # 3D spring layout
+            pos_3d = nx.spring_layout(sub_3d, dim=3, seed=42, k=0.5)
+            
+            # Extract coordinates
+            x_nodes = [pos_3d[node][0] for node in sub_3d.nodes()]
+            y_nodes = [pos_3d[node][1] for node in sub_3d.nodes()]
+            z_nodes = [pos_3d[node][2] for node in sub_3d.nodes()]
+            
+            # Node sizes based on degree
+            node_sizes_3d = [sub_3d.degree(n) * 3 for n in sub_3d.nodes()]
+            
+            # Create edges
+            edge_x = []
+            edge_y = []
+            edge_z = []
+            
+            for edge in sub_3d.edges():
+                x0, y0, z0 = pos_3d[edge[0]]
+                x1, y1, z1 = pos_3d[edge[1]]
+                edge_x.extend([x0, x1, None])
+                edge_y.extend([y0, y1, None])
+                edge_z.extend([z0, z1, None])
+            
+            # Create 3D plot
+            fig_3d = go.Figure()
+            
+            # Add edges
+            fig_3d.add_trace(go.Scatter3d(
+                x=edge_x, y=edge_y, z=edge_z,
+                mode='lines',
+                line=dict(color='rgba(125,125,125,0.3)', width=1),
+                hoverinfo='none',
+                showlegend=False
+            ))
+            
+            # Add nodes
+            fig_3d.add_trace(go.Scatter3d(
+                x=x_nodes, y=y_nodes, z=z_nodes,
+                mode='markers+text',
+                marker=dict(
+                    size=node_sizes_3d,
+                    color=node_sizes_3d,
+                    colorscale='Viridis',
+                    showscale=True,
+                    colorbar=dict(title="Degree"),
+                    line=dict(color='white', width=0.5)
+                ),
+                text=[str(node) for node in sub_3d.nodes()],
+                textposition="top center",
+                textfont=dict(size=8),
+                hovertemplate='<b>User %{text}</b><br>Degree: %{marker.size:.0f}<extra></extra>',
+                showlegend=False
+            ))
+            
+            fig_3d.update_layout(
+                title=f"3D Network Visualization: {selection + ' Sample of' if sampled else 'Top'} {n_nodes_3d} Users",
+                scene=dict(
+                    xaxis=dict(showbackground=False, showticklabels=False, title=''),
+                    yaxis=dict(showbackground=False, showticklabels=False, title=''),
+                    zaxis=dict(showbackground=False, showticklabels=False, title='')
+                ),
+                height=700,
+                hovermode='closest'
+            )
+            return fig_3d
+        
+        params_3d = {"figure": "3d", "selection": selection, "seed": sample_seed, "n": n_nodes_3d}
+        fig_3d = figure_cache.plotly(page, params_3d, fingerprint, build_3d)
         
         st.plotly_chart(fig_3d, use_container_width=True)
         
         st.info("💡 **Tip:** Click and drag to rotate, scroll to zoom, double-click to reset view!")
+    
+    # --- Spectral map of every node ---
+    with tab_v4:
+        st.markdown("### 🗺️ Whole-Network Map (Spectral Embedding)")
+        st.caption("Every user placed once by the eigenvectors of the normalized Laplacian - similar neighbourhoods land close together")
+        
+        with st.spinner("🔄 Computing spectral coordinates (once per dataset)..."):
+            embedding = engine.spectral_coordinates()
+            communities_all = engine.louvain_labels()
+            pr_all = engine.pagerank()
+        cg = engine.compact
+        coords = embedding["coords"]
+        
+        col_dim, col_color = st.columns(2)
+        map_dim = col_dim.radio("View:", ["2D", "3D"], horizontal=True)
+        color_by = col_color.radio("Colour by:", ["Community", "Votes Received", "PageRank"], horizontal=True)
+        
+        col_f1, col_f2, col_f3 = st.columns(3)
+        min_votes = col_f1.slider("Min votes received:", 0, int(min(cg.in_degree.max(), 200)), 0)
+        pr_top = col_f2.slider("Top PageRank (%):", 1, 100, 100)
+        community_sizes_all = np.bincount(communities_all[communities_all >= 0])
+        largest = np.argsort(-community_sizes_all)[:10]
+        chosen = col_f3.multiselect("Communities:", [int(c) for c in largest],
+                                    format_func=lambda c: f"#{c} ({community_sizes_all[c]:,} users)",
+                                    help="Leave empty to show every community")
+        
+        show = ~np.isnan(coords[:, 0]) & (cg.in_degree >= min_votes)
+        show &= pr_all >= np.percentile(pr_all, 100 - pr_top)
+        if chosen:
+            show &= np.isin(communities_all, chosen)
+        idx = np.flatnonzero(show)
+        
+        if color_by == "Community":
+            colors, colorscale, color_title = communities_all[idx], 'Turbo', "Community"
+        elif color_by == "Votes Received":
+            colors, colorscale, color_title = np.log1p(cg.in_degree[idx]), 'Viridis', "log(1 + votes)"
+        else:
+            colors, colorscale, color_title = np.log10(pr_all[idx]), 'Plasma', "log10(PageRank)"
+        
+        hover = [f"User {u}<br>Votes received: {d}<br>PageRank: {p:.2e}<br>Community: {c}"
+                 for u, d, p, c in zip(cg.ids[idx], cg.in_degree[idx], pr_all[idx], communities_all[idx])]
+        marker = dict(size=4 if map_dim == "2D" else 2.5, color=colors, colorscale=colorscale, opacity=0.8,
+                      showscale=color_by != "Community", colorbar=dict(title=color_title))
+        
+        # WebGL traces: Scattergl in 2D, Scatter3d is WebGL-rendered already
+        if map_dim == "2D":
+            fig_map = go.Figure(go.Scattergl(x=coords[idx, 0], y=coords[idx, 1], mode='markers',
+                                             marker=marker, text=hover, hoverinfo='text'))
+            fig_map.update_layout(xaxis=dict(visible=False), yaxis=dict(visible=False))
+        else:
+            fig_map = go.Figure(go.Scatter3d(x=coords[idx, 0], y=coords[idx, 1], z=coords[idx, 2], mode='markers',
+                                             marker=marker, text=hover, hoverinfo='text'))
+            fig_map.update_layout(scene=dict(xaxis=dict(visible=False), yaxis=dict(visible=False), zaxis=dict(visible=False)))
+        fig_map.update_layout(title=f"Spectral Map: {len(idx):,} of {cg.n_nodes:,} Users", height=700)
+        st.plotly_chart(fig_map, use_container_width=True)
+        
+        n_outside = int(np.isnan(coords[:, 0]).sum())
+        st.caption(f"📐 Laplacian eigenvalues used: {', '.join(f'{v:.4f}' for v in embedding['eigenvalues'])}"
+                   f" • {n_outside:,} users outside the giant component are not placed")
 
 # ==========================================
 # PAGE 5: COMMUNITY DETECTION
@@ -1075,65 +1754,147 @@ elif page == "🌐 Community Detection":
     
     st.markdown("<br>", unsafe_allow_html=True)
     
-    # Run community detection
+    community_view = st.selectbox("Nodes to visualize:", ["Top 100 by degree", "Stratified by community (100)"],
+                                  help="Stratified sampling draws members from every community, not just the hubs")
+    
+    # Run community detection (the partition and its statistics persist per dataset)
     if st.button("🚀 Detect Communities", type="primary"):
+        st.session_state.communities_detected = True
+    
+    if st.session_state.get("communities_detected"):
         with st.spinner("🔄 Running community detection algorithms..."):
-            # Convert to undirected for community detection
-            G_undirected = G.to_undirected()
-            
-            # Greedy modularity communities
-            communities = list(greedy_modularity_communities(G_undirected))
-            
-            # Calculate modularity
-            modularity = nx.community.modularity(G_undirected, communities)
-            
-            st.success(f"✅ Found {len(communities)} communities with modularity score of {modularity:.4f}")
-            
-            # Display community stats
-            col1, col2, col3 = st.columns(3)
-            col1.metric("🏘️ Total Communities", len(communities))
-            col2.metric("📊 Modularity Score", f"{modularity:.4f}", help="Higher is better (0-1 scale)")
-            col3.metric("👥 Largest Community", max(len(c) for c in communities))
-            
-            st.markdown("<br>", unsafe_allow_html=True)
-            
-            # Community sizes
-            st.markdown("### 📊 Community Size Distribution")
-            
-            community_sizes = [len(c) for c in communities]
-            community_df = pd.DataFrame({
-                'Community ID': range(1, len(communities) + 1),
-                'Size': community_sizes
-            }).sort_values('Size', ascending=False).reset_index(drop=True)
-            
-            fig_comm = px.bar(community_df.head(20), x='Community ID', y='Size',
-                             title='Top 20 Communities by Size',
-                             color='Size',
-                             color_continuous_scale='Turbo',
-                             text='Size')
-            fig_comm.update_traces(textposition='outside')
-            fig_comm.update_layout(height=500)
-            st.plotly_chart(fig_comm, use_container_width=True)
+            report = engine.communities()
+        modularity = report.modularity
+        community_sizes = report.size
+        
+        st.success(f"✅ Found {report.n_communities} communities with modularity score of {modularity:.4f}")
+        
+        # Display community stats
+        col1, col2, col3 = st.columns(3)
+        col1.metric("🏘️ Total Communities", report.n_communities)
+        col2.metric("📊 Modularity Score", f"{modularity:.4f}", help="Higher is better (0-1 scale)")
+        col3.metric("👥 Largest Community", int(community_sizes.max()))
+        
+        st.markdown("<br>", unsafe_allow_html=True)
+        
+        # Community sizes
+        st.markdown("### 📊 Community Size Distribution")
+        
+        community_df = pd.DataFrame({
+            'Community ID': np.arange(1, report.n_communities + 1),
+            'Size': community_sizes
+        }).sort_values('Size', ascending=False).reset_index(drop=True)
+        
+        fig_comm = px.bar(community_df.head(20), x='Community ID', y='Size',
+                         title='Top 20 Communities by Size',
+                         color='Size',
+                         color_continuous_scale='Turbo',
+                         text='Size')
+        fig_comm.update_traces(textposition='outside')
+        fig_comm.update_layout(height=500)
+        st.plotly_chart(fig_comm, use_container_width=True)
+        
+        # Per-community statistics
+        st.markdown("### 🏆 Community Profiles")
+        st.caption("Density: share of possible internal votes cast • Conductance: boundary votes over volume (lower = more self-contained) • "
+                   "Reciprocity: share of internal votes returned")
+        
+        stats_df = pd.DataFrame({
+            'Community ID': np.arange(1, report.n_communities + 1),
+            'Size': community_sizes,
+            'Internal Votes': report.internal_edges,
+            'Density': report.density,
+            'Conductance': report.conductance,
+            'Reciprocity': report.reciprocity,
+            'Votes Out': report.cut_out,
+            'Votes In': report.cut_in,
+            'Top Members': [", ".join(str(m) for m in row if m >= 0) for row in report.top_members],
+        }).sort_values('Size', ascending=False).reset_index(drop=True)
+        st.dataframe(stats_df, use_container_width=True, hide_index=True,
+                     column_config={c: st.column_config.NumberColumn(format="%.4f") for c in ('Density', 'Conductance', 'Reciprocity')})
+        
+        # Quotient graph: one node per community, one edge per community pair
+        st.markdown("### 🕸️ Community Vote Graph")
+        st.caption("Each bubble is a community (sized by members, colored by conductance); lines carry the votes between communities")
+        
+        n_shown = st.slider("Communities shown (largest first):", min_value=2, max_value=max(2, report.n_communities),
+                            value=min(30, max(2, report.n_communities)))
+        
+        def build_quotient():
+            shown = np.argsort(-community_sizes, kind="stable")[:n_shown]
+            keep = np.isin(report.quotient_src, shown) & np.isin(report.quotient_dst, shown)
+            q_src, q_dst, q_w = report.quotient_src[keep], report.quotient_dst[keep], report.quotient_weight[keep]
             
-            # Show top communities
-            st.markdown("### 🏆 Largest Communities")
-            st.dataframe(community_df.head(10), use_container_width=True, hide_index=True)
+            # Layout on the undirected, log-weighted quotient graph
+            Q = nx.Graph()
+            Q.add_nodes_from(shown.tolist())
+            for a, b, w in zip(q_src.tolist(), q_dst.tolist(), q_w.tolist()):
+                prev = Q.get_edge_data(a, b, {"weight": 0})["weight"]
+                Q.add_edge(a, b, weight=prev + w)
+            for a, b, data in Q.edges(data=True):
+                data["weight"] = np.log1p(data["weight"])
+            pos = nx.spring_layout(Q, seed=42, weight="weight")
             
-            # Visualize communities
-            st.markdown("### 🎨 Community Visualization")
-            st.caption("Top 100 nodes colored by community membership")
+            fig_q = go.Figure()
+            # Edge width in four classes of vote volume
+            pair_votes = {(a, b): w for a, b, w in zip(q_src.tolist(), q_dst.tolist(), q_w.tolist())}
+            undirected = {}
+            for (a, b), w in pair_votes.items():
+                undirected[tuple(sorted((a, b)))] = undirected.get(tuple(sorted((a, b))), 0) + w
+            if undirected:
+                edges_w = np.array(list(undirected.values()))
+                cuts = np.quantile(edges_w, [0.5, 0.8, 0.95])
+                for cls, width in enumerate([0.5, 1.5, 3, 6]):
+                    xs, ys = [], []
+                    for (a, b), w in undirected.items():
+                        if np.searchsorted(cuts, w, side="right") == cls:
+                            xs += [pos[a][0], pos[b][0], None]
+                            ys += [pos[a][1], pos[b][1], None]
+                    fig_q.add_trace(go.Scatter(x=xs, y=ys, mode='lines', hoverinfo='skip', showlegend=False,
+                                               line=dict(width=width, color='rgba(120,120,120,0.5)')))
+                # Invisible midpoints carry the vote counts in both directions
+                mid = list(undirected)
+                fig_q.add_trace(go.Scatter(
+                    x=[(pos[a][0] + pos[b][0]) / 2 for a, b in mid],
+                    y=[(pos[a][1] + pos[b][1]) / 2 for a, b in mid],
+                    mode='markers', marker=dict(size=6, opacity=0), showlegend=False,
+                    hovertext=[f"#{a + 1} → #{b + 1}: {pair_votes.get((a, b), 0):,} votes<br>"
+                               f"#{b + 1} → #{a + 1}: {pair_votes.get((b, a), 0):,} votes" for a, b in mid],
+                    hoverinfo='text'))
             
-            # Get top 100 nodes
-            top_100 = sorted(G.degree, key=lambda x: x[1], reverse=True)[:100]
-            nodes_100 = [n for n, d in top_100]
-            sub_100 = G.subgraph(nodes_100).to_undirected()
+            conductance = report.conductance
+            fig_q.add_trace(go.Scatter(
+                x=[pos[c][0] for c in shown], y=[pos[c][1] for c in shown],
+                mode='markers+text', text=[f"#{c + 1}" for c in shown], textposition='top center',
+                marker=dict(size=12 + 40 * np.sqrt(community_sizes[shown] / community_sizes.max()),
+                            color=conductance[shown], colorscale='Viridis', showscale=True,
+                            colorbar=dict(title='Conductance'), line=dict(width=1, color='black')),
+                hovertext=[f"Community #{c + 1}<br>Members: {community_sizes[c]:,}<br>"
+                           f"Internal density: {report.density[c]:.4f}<br>Conductance: {conductance[c]:.3f}<br>"
+                           f"Reciprocity: {report.reciprocity[c]:.3f}" for c in shown],
+                hoverinfo='text', showlegend=False))
+            fig_q.update_layout(title=f"Votes Between the {len(shown)} Largest Communities", height=650,
+                                xaxis=dict(visible=False), yaxis=dict(visible=False))
+            return fig_q
+        
+        st.plotly_chart(figure_cache.plotly(page, {"figure": "quotient", "shown": n_shown}, fingerprint, build_quotient),
+                        use_container_width=True)
+        
+        # Visualize communities
+        st.markdown("### 🎨 Community Visualization")
+        st.caption(f"{community_view} nodes colored by community membership")
+        
+        def draw_communities():
+            # Get top 100 nodes (or a community-stratified sample)
+            cg = engine.compact
+            if community_view == "Top 100 by degree":
+                nodes_100 = select_nodes(engine, dataset_key, "Top degree", 100)
+            else:
+                nodes_100 = stratified_node_ids(dataset_key, report.labels, 100, 42).tolist()
+            sub_100 = engine.subgraph(nodes_100).to_undirected()
             
             # Get communities for these nodes
-            node_to_community = {}
-            for idx, comm in enumerate(communities):
-                for node in comm:
-                    if node in nodes_100:
-                        node_to_community[node] = idx
+            node_to_community = dict(zip(nodes_100, report.labels[cg.index_of(nodes_100)].tolist()))
             
             # Layout and draw
             pos = nx.spring_layout(sub_100, seed=42, k=0.5, iterations=50)
@@ -1149,19 +1910,218 @@ elif page == "🌐 Community Detection":
                                   node_color=node_colors, cmap=plt.cm.tab20,
                                   alpha=0.8, edgecolors='black', linewidths=1.5)
             
-            plt.title("Community Structure: Top 100 Users", fontsize=20, fontweight='bold', pad=20)
+            plt.title(f"Community Structure: {community_view}", fontsize=20, fontweight='bold', pad=20)
             plt.axis('off')
             plt.tight_layout()
-            st.pyplot(fig_viz)
+            return fig_viz
+        
+        st.image(figure_cache.png(page, {"figure": "communities", "view": community_view}, fingerprint, draw_communities),
+                 use_column_width=True)
+        
+        st.markdown(f"""
+        <div class='success-box'>
+            <strong>🎯 Key Findings:</strong>
+            <ul>
+                <li>The network naturally divides into <strong>{report.n_communities} communities</strong></li>
+                <li>Modularity score of <strong>{modularity:.4f}</strong> indicates {'strong' if modularity > 0.4 else 'moderate'} community structure</li>
+                <li>Largest community contains <strong>{int(community_sizes.max())} members</strong></li>
+                <li>Different colors in the visualization represent different communities</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+# ==========================================
+# PAGE 6: RECOMMENDATIONS (Personalized PageRank)
+# ==========================================
+elif page == "🔮 Recommendations":
+    st.markdown("<div class='big-font'>🔮 Personalized Recommendations</div>", unsafe_allow_html=True)
+    st.markdown("<p style='color: #666; font-size: 18px;'>Who matters most from one user's point of view?</p>", unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class='insight-box'>
+        <h4>🎯 Personalized PageRank</h4>
+        <p>Instead of ranking users for the whole network, Personalized PageRank restarts every random walk at
+        <strong>one chosen user</strong>. The scores answer "who is most influential <em>from this user's perspective</em>".</p>
+        <ul>
+            <li><strong>Forward Push:</strong> deterministic, only explores the neighbourhood that matters</li>
+            <li><strong>Monte Carlo:</strong> simulates random walks, useful as an independent estimate</li>
+            <li><strong>Epsilon:</strong> smaller = more accurate but more work</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    cg = engine.compact
+    ppr_service = engine.ppr_service()
+    
+    col1, col2, col3 = st.columns(3)
+    epsilon = col1.select_slider("Accuracy (epsilon):", options=[1e-3, 1e-4, 1e-5, 1e-6], value=1e-5,
+                                 format_func=lambda x: f"{x:.0e}")
+    method_label = col2.radio("Method:", ["Forward Push", "Monte Carlo"], horizontal=True)
+    method = "push" if method_label == "Forward Push" else "montecarlo"
+    top_k = col3.slider("Number of results:", 5, 50, 15, 5)
+    
+    tab1, tab2, tab3, tab4 = st.tabs(["⭐ Influential for a Voter", "🧭 Similar Candidates", "📦 Batch Mode", "🔗 Likely Future Votes"])
+    
+    with tab1:
+        st.markdown("### ⭐ Most Influential Users for a Voter")
+        st.caption("Random walks follow votes outward from the selected voter")
+        
+        default_voter = int(cg.ids[np.argmax(cg.out_degree)])
+        voter = st.number_input("Voter User ID:", value=default_voter, step=1, key="ppr_voter")
+        
+        try:
+            nodes, scores = ppr_service.query(int(voter), k=top_k, epsilon=epsilon, method=method, direction="out")
+        except KeyError:
+            st.error(f"❌ User {int(voter)} is not in the network.")
+        else:
+            df_ppr = pd.DataFrame({
+                'Rank': range(1, len(nodes) + 1),
+                'User ID': nodes,
+                'PPR Score': scores,
+                'Votes Received': cg.in_degree[cg.index_of(nodes)] if len(nodes) else []
+            })
             
-            st.markdown(f"""
-            <div class='success-box'>
-                <strong>🎯 Key Findings:</strong>
-                <ul>
-                    <li>The network naturally divides into <strong>{len(communities)} communities</strong></li>
-                    <li>Modularity score of <strong>{modularity:.4f}</strong> indicates {'strong' if modularity > 0.4 else 'moderate'} community structure</li>
-                    <li>Largest community contains <strong>{max(community_sizes)} members</strong></li>
-                    <li>Different colors in the visualization represent different communities</li>
-                </ul>
-            </div>
-            """, unsafe_allow_html=True)
\ No newline at end of file
+            fig_ppr = px.bar(df_ppr, x=df_ppr['User ID'].astype(str), y='PPR Score',
+                             title=f'Top {len(df_ppr)} Users from the Perspective of Voter {int(voter)}',
+                             labels={'x': 'User ID'},
+                             color='PPR Score',
+                             color_continuous_scale='Viridis')
+            fig_ppr.update_layout(height=500)
+            st.plotly_chart(fig_ppr, use_container_width=True)
+            
+            st.dataframe(df_ppr, use_container_width=True, hide_index=True)
+    
+    with tab2:
+        st.markdown("### 🧭 Candidates Similar to a Candidate")
+        st.caption("Random walks move between candidates through the voters they share")
+        
+        default_candidate = int(cg.ids[np.argmax(cg.in_degree)])
+        candidate = st.number_input("Candidate User ID:", value=default_candidate, step=1, key="ppr_candidate")
+        
+        try:
+            # Over-fetch, then keep only users who actually received votes
+            nodes, scores = ppr_service.query(int(candidate), k=top_k * 4, epsilon=epsilon, method=method, direction="both")
+        except KeyError:
+            st.error(f"❌ User {int(candidate)} is not in the network.")
+        else:
+            received = cg.in_degree[cg.index_of(nodes)] if len(nodes) else np.array([], dtype=int)
+            mask = received > 0
+            df_similar = pd.DataFrame({
+                'User ID': nodes[mask],
+                'Similarity (PPR)': scores[mask],
+                'Votes Received': received[mask]
+            }).head(top_k)
+            df_similar.insert(0, 'Rank', range(1, len(df_similar) + 1))
+            st.dataframe(df_similar, use_container_width=True, hide_index=True)
+    
+    with tab3:
+        st.markdown("### 📦 Batch Recommendations for the Most Active Voters")
+        st.caption("Computes top-k Personalized PageRank vectors for many voters in parallel")
+        
+        n_seeds = st.slider("Number of voters:", 10, 500, 100, 10)
+        
+        if st.button("🚀 Run Batch", type="primary"):
+            with st.spinner(f"🔄 Computing {n_seeds} Personalized PageRank vectors..."):
+                seeds = np.argsort(-cg.out_degree, kind="stable")[:n_seeds]
+                results = ppr_batch(cg, seeds, k=5, epsilon=epsilon, method=method, direction="out")
+                
+                df_batch = pd.DataFrame({
+                    'Voter ID': cg.ids[seeds],
+                    'Votes Cast': cg.out_degree[seeds],
+                    'Top 5 Recommendations': [", ".join(str(u) for u in cg.ids[results[int(s)][0]]) for s in seeds]
+                })
+                st.success(f"✅ Computed {len(results)} recommendation lists")
+                st.dataframe(df_batch, use_container_width=True, hide_index=True)
+    
+    with tab4:
+        st.markdown("### 🔗 Likely Future Votes (Link Prediction)")
+        st.caption("Scores every user the voter has not voted for yet by the neighbours they share")
+        
+        col_m, col_d = st.columns(2)
+        lp_label = col_m.selectbox("Score:", list(linkpred.METHODS),
+                                   help="Adamic-Adar and resource allocation down-weight shared neighbours who are hubs")
+        lp_direction = col_d.radio("Neighbourhood:", ["Undirected", "Vote paths (u → w → v)"], horizontal=True)
+        direction = "both" if lp_direction == "Undirected" else "out"
+        
+        default_voter = int(cg.ids[np.argmax(cg.out_degree)])
+        lp_voter = st.number_input("Voter User ID:", value=default_voter, step=1, key="lp_voter")
+        
+        try:
+            lp_nodes, lp_scores = linkpred.predict(cg, int(lp_voter), k=top_k, method=linkpred.METHODS[lp_label],
+                                                   direction=direction)
+        except KeyError:
+            st.error(f"❌ User {int(lp_voter)} is not in the network.")
+        else:
+            df_lp = pd.DataFrame({
+                'Rank': range(1, len(lp_nodes) + 1),
+                'Candidate ID': lp_nodes,
+                lp_label: lp_scores,
+                'Votes Received': cg.in_degree[cg.index_of(lp_nodes)] if len(lp_nodes) else []
+            })
+            st.dataframe(df_lp, use_container_width=True, hide_index=True)
+        
+        st.markdown("#### 🧪 Holdout Evaluation")
+        st.caption("Hides 10% of the votes, scores them against as many random non-votes, and times each score")
+        if st.button("🚀 Run Benchmark", type="primary"):
+            with st.spinner("🔄 Scoring held-out votes..."):
+                df_bench = pd.DataFrame([vars(r) for r in engine.link_prediction(direction)])
+            
+            fig_auc = px.bar(df_bench, x='method', y='auc', title='AUC on Held-Out Votes (0.5 = random guessing)',
+                             labels={'method': 'Score', 'auc': 'AUC'},
+                             color='auc', color_continuous_scale='Greens', text='auc')
+            fig_auc.update_traces(texttemplate='%{text:.3f}', textposition='outside')
+            fig_auc.update_layout(height=500, yaxis_range=[0.5, 1])
+            st.plotly_chart(fig_auc, use_container_width=True)
+            
+            st.dataframe(df_bench.rename(columns={'method': 'Score', 'auc': 'AUC',
+                                                  'pairs_per_second': 'Pairs scored / s',
+                                                  'rows_per_second': 'Top-k users / s'}),
+                         use_container_width=True, hide_index=True)
+    
+    stats = ppr_service.cache.stats()
+    st.caption(f"🗂️ Query cache: {stats['entries']}/{stats['maxsize']} entries • {stats['hits']} hits • {stats['misses']} misses")
+
+# ==========================================
+# PAGE 7: EXPORT DATA
+# ==========================================
+elif page == "📦 Export Data":
+    st.markdown("<div class='big-font'>📦 Export Data</div>", unsafe_allow_html=True)
+    st.markdown("<p style='color: #666; font-size: 18px;'>Take the metrics with you: columnar files for pandas, Spark, DuckDB or R</p>", unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class='insight-box'>
+        <h4>📁 What's in the export?</h4>
+        <ul>
+            <li><strong>Node metrics:</strong> in/out-degree, PageRank, betweenness (1,000 sampled sources), clustering, Louvain community, weak & strong component</li>
+            <li><strong>Edge list:</strong> every vote with a flag telling whether it was returned (reciprocal)</li>
+        </ul>
+        <p>Files are written straight from the analysis arrays. For batch jobs use
+        <code>python -m analytics.export DATASET OUT_DIR</code>.</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    fmt = st.radio("Format:", list(export.FORMATS), horizontal=True,
+                   format_func=lambda f: {"parquet": "Parquet", "arrow": "Arrow IPC"}[f])
+    ext = export.FORMATS[fmt]
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### 👤 Node Metrics")
+        with st.spinner("🔄 Computing node metrics..."):
+            node_bytes, preview = export_nodes(dataset_key, fmt)
+        st.download_button("⬇️ Download nodes" + ext, node_bytes, file_name=f"{dataset_key}-nodes{ext}",
+                           mime="application/octet-stream", type="primary")
+        st.caption(f"{len(node_bytes) / 1e6:.2f} MB")
+    
+    with col2:
+        st.markdown("### 🗳️ Edge List")
+        with st.spinner("🔄 Serializing edges..."):
+            edge_bytes = export_edges(dataset_key, fmt)
+        st.download_button("⬇️ Download edges" + ext, edge_bytes, file_name=f"{dataset_key}-edges{ext}",
+                           mime="application/octet-stream", type="primary")
+        st.caption(f"{len(edge_bytes) / 1e6:.2f} MB")
+    
+    st.markdown("### 👀 Preview")
+    st.dataframe(preview, use_container_width=True, hide_index=True)
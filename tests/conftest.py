@@ -0,0 +1,16 @@
+"""The ``graphs`` fixture: small seeded ``(CompactGraph, nx.DiGraph)`` pairs, edge cases included."""
+import pytest
+
+from tests.helpers import make_graph
+
+CASES = {
+    "edgeless": dict(n=12, p=0.0),
+    "sparse": dict(n=60, p=0.05, seed=1),
+    "dense": dict(n=30, p=0.3, seed=2),
+    "loops-and-duplicates": dict(n=40, p=0.1, seed=3, self_loops=6, duplicates=25),
+}
+
+
+@pytest.fixture(params=list(CASES))
+def graphs(request):
+    return make_graph(**CASES[request.param])
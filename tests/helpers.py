@@ -0,0 +1,48 @@
+"""Graph builders and NetworkX references shared by the test modules."""
+import networkx as nx
+import numpy as np
+
+from analytics.graph import CompactGraph
+
+
+def make_graph(n=40, p=0.1, seed=0, self_loops=0, duplicates=0):
+    """``(CompactGraph, nx.DiGraph)`` of a random digraph whose IDs are not ``0..n-1``.
+
+    ``self_loops`` nodes get a loop and ``duplicates`` edges are listed
+    twice; the NetworkX graph holds the same simple edge set.
+    """
+    rng = np.random.default_rng(seed)
+    mask = rng.random((n, n)) < p
+    np.fill_diagonal(mask, False)
+    src, dst = np.nonzero(mask)
+    loops = rng.choice(n, self_loops, replace=False)
+    src, dst = np.concatenate([src, loops]), np.concatenate([dst, loops])
+    if duplicates and len(src):
+        dup = rng.integers(0, len(src), duplicates)
+        src, dst = np.concatenate([src, src[dup]]), np.concatenate([dst, dst[dup]])
+    order = rng.permutation(len(src))
+    ids = 10 + 3 * np.arange(n)
+    cg = CompactGraph.from_edges(ids[src[order]], ids[dst[order]], ids=ids)
+    G = nx.DiGraph()
+    G.add_nodes_from(ids.tolist())
+    G.add_edges_from(zip(ids[src].tolist(), ids[dst].tolist()))
+    return cg, G
+
+
+def as_array(cg, values):
+    """A ``{node_id: value}`` dict as an array over compact nodes."""
+    return np.array([values[i] for i in cg.ids.tolist()], dtype=float)
+
+
+def undirected(G):
+    """Simple undirected ``nx.Graph`` of ``G`` (self-loops dropped), like ``CompactGraph.undirected``."""
+    U = nx.Graph(G.to_undirected())
+    U.remove_edges_from(list(nx.selfloop_edges(U)))
+    return U
+
+
+def write_edges(path, cg, header=""):
+    """Write ``cg`` as a ``src dst`` edge list at ``path`` (a ``pathlib.Path``); returns it as a string."""
+    src, dst = cg.edges()
+    path.write_text(header + "".join(f"{cg.ids[s]} {cg.ids[d]}\n" for s, d in zip(src, dst)))
+    return str(path)
@@ -0,0 +1,49 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from analytics.assortativity import DEGREE_KINDS, degree_assortativity, degree_correlations, log_bin
+
+PAIRS = [(x, y) for x in DEGREE_KINDS for y in DEGREE_KINDS]
+
+
+@pytest.mark.parametrize("x,y", PAIRS)
+def test_coefficients_match_networkx(graphs, x, y):
+    cg, G = graphs
+    correlations = degree_correlations(cg, block_nnz=7)
+    if not cg.n_edges:
+        assert correlations.coefficient(x, y) == degree_assortativity(cg, x, y) == 0.0
+        return
+    expected = nx.degree_assortativity_coefficient(G, x=x, y=y)
+    if not np.isfinite(expected):   # constant degrees: NetworkX divides by zero
+        expected = 0.0
+    assert correlations.coefficient(x, y) == pytest.approx(expected, abs=1e-9)
+    assert degree_assortativity(cg, x, y, block_nnz=5) == pytest.approx(expected, abs=1e-9)
+
+
+@pytest.mark.parametrize("y", DEGREE_KINDS)
+def test_knn_matches_networkx(graphs, y):
+    cg, G = graphs
+    k, knn = degree_correlations(cg).knn("out", y)
+    expected = nx.average_degree_connectivity(G, source="out", target=y)
+    assert np.allclose(knn, [expected[int(d)] for d in k])
+
+
+@pytest.mark.parametrize("x,y", PAIRS)
+def test_joint_degree_matrix_counts_every_edge_once(graphs, x, y):
+    cg, G = graphs
+    labels, jdm = degree_correlations(cg, block_nnz=3).joint_degree_matrix(x, y)
+    dx, dy = getattr(G, f"{x}_degree"), getattr(G, f"{y}_degree")
+    expected = np.zeros_like(jdm)
+    for u, v in G.edges():
+        expected[log_bin(dx(u)), log_bin(dy(v))] += 1
+    assert len(labels) == jdm.shape[0] == jdm.shape[1]
+    assert (jdm == expected).all() and jdm.sum() == G.number_of_edges()
+
+
+def test_round_trip_through_arrays(graphs):
+    cg, _ = graphs
+    correlations = degree_correlations(cg)
+    again = type(correlations).from_arrays(correlations.to_arrays())
+    assert all(np.array_equal(a, b) for a, b in zip(correlations.to_arrays().values(),
+                                                     again.to_arrays().values()))
@@ -0,0 +1,38 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from analytics.centrality import hits, pagerank
+from analytics.spmv import SparseOperator
+from tests.helpers import as_array, make_graph
+
+
+@pytest.mark.parametrize("alpha", [0.85, 0.5])
+def test_pagerank_matches_networkx(graphs, alpha):
+    cg, G = graphs
+    expected = as_array(cg, nx.pagerank(G, alpha=alpha, tol=1e-10, max_iter=500))
+    assert np.allclose(pagerank(cg, alpha=alpha, tol=1e-10, max_iter=500), expected, atol=1e-8)
+
+
+def test_blocked_operator_matches_scipy(graphs):
+    cg, _ = graphs
+    A = cg.to_csr().astype(float)
+    x = np.random.default_rng(0).random(cg.n_nodes)
+    op = SparseOperator(cg, block_nnz=7)
+    assert np.allclose(op.matvec(x), A @ x)
+    assert np.allclose(op.rmatvec(x), A.T @ x)
+
+
+@pytest.mark.parametrize("case", [dict(n=30, p=0.3, seed=2), dict(n=40, p=0.15, seed=6, self_loops=4, duplicates=10)])
+def test_hits_matches_networkx(case):
+    cg, G = make_graph(**case)
+    expected_h, expected_a = nx.hits(G, tol=1e-12, max_iter=1000)
+    h, a = hits(cg, tol=1e-12, max_iter=1000)
+    assert np.allclose(h, as_array(cg, expected_h), atol=1e-6)
+    assert np.allclose(a, as_array(cg, expected_a), atol=1e-6)
+
+
+def test_hits_without_edges_is_zero():
+    cg, _ = make_graph(n=6, p=0.0)
+    h, a = hits(cg)
+    assert not h.any() and not a.any()
@@ -0,0 +1,32 @@
+import networkx as nx
+import numpy as np
+
+from analytics.closeness import estimate, top_k_harmonic
+from tests.helpers import as_array, make_graph
+
+
+def test_every_source_is_exact(graphs):
+    cg, G = graphs
+    est = estimate(cg, k=cg.n_nodes, workers=1)
+    assert np.allclose(est.closeness, as_array(cg, nx.closeness_centrality(G)))
+    assert np.allclose(est.harmonic, as_array(cg, nx.harmonic_centrality(G)))
+    assert not est.closeness_ci.any() and not est.harmonic_ci.any()
+
+
+def test_sampled_intervals_cover_most_nodes():
+    cg, G = make_graph(n=200, p=0.03, seed=7)
+    est = estimate(cg, k=100, seed=1, workers=2)
+    exact = as_array(cg, nx.harmonic_centrality(G))
+    covered = np.abs(est.harmonic - exact) <= est.harmonic_ci + 1e-12
+    assert covered.mean() > 0.85
+
+
+def test_top_k_harmonic_is_exact(graphs):
+    cg, G = graphs
+    exact = as_array(cg, nx.harmonic_centrality(G))
+    k = min(5, cg.n_nodes)
+    nodes, scores, n_pruned = top_k_harmonic(cg, k=k)
+    assert len(nodes) == k
+    assert np.allclose(scores, np.sort(exact)[::-1][:k])
+    assert np.allclose(exact[nodes], scores)
+    assert 0 <= n_pruned <= cg.n_nodes
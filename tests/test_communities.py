@@ -0,0 +1,47 @@
+from collections import Counter
+
+import networkx as nx
+import numpy as np
+
+from analytics.communities import CommunityReport, community_report
+from analytics.export import community_labels
+from tests.helpers import undirected
+
+
+def test_report_matches_brute_force(graphs):
+    cg, G = graphs
+    labels = np.random.default_rng(0).integers(0, 4, cg.n_nodes)
+    labels[:4] = np.arange(4)  # every community is non-empty
+    report = community_report(cg, labels, top=3, block_nnz=7)
+    label = dict(zip(cg.ids.tolist(), labels.tolist()))
+    edges = [(u, v) for u, v in G.edges() if u != v]
+
+    pairs = Counter((label[u], label[v]) for u, v in edges)
+    quotient = dict(zip(zip(report.quotient_src.tolist(), report.quotient_dst.tolist()),
+                        report.quotient_weight.tolist()))
+    assert quotient == {p: w for p, w in pairs.items() if p[0] != p[1]}
+    for c in range(4):
+        assert report.internal_edges[c] == pairs.get((c, c), 0)
+        assert report.internal_mutual[c] == sum(
+            label[u] == label[v] == c and G.has_edge(v, u) for u, v in edges)
+        members = [v for v in G if label[v] == c]
+        best = sorted(members, key=lambda v: (-G.in_degree(v), v))[:3]
+        assert report.top_members[c][:len(best)].tolist() == best
+
+    U = undirected(G)
+    if U.number_of_edges():
+        parts = [{v for v in U if label[v] == c} for c in range(4)]
+        assert np.isclose(report.modularity, nx.community.modularity(U, parts))
+    else:
+        assert report.modularity == 0.0
+
+
+def test_report_round_trips_through_arrays(graphs):
+    cg, G = graphs
+    U = G.to_undirected()
+    labels = community_labels(cg, nx.community.louvain_communities(U, seed=0))
+    report = community_report(cg, labels)
+    back = CommunityReport.from_arrays(report.to_arrays())
+    assert back.modularity == report.modularity
+    assert np.array_equal(back.conductance, report.conductance)
+    assert back.size.sum() == cg.n_nodes
@@ -0,0 +1,66 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from analytics.cores import core_numbers, rich_club, rich_club_null, shell_sizes
+from tests.helpers import as_array, make_graph, undirected
+
+LOOP_FREE = [dict(n=12, p=0.0), dict(n=60, p=0.05, seed=1), dict(n=30, p=0.3, seed=2),
+             dict(n=40, p=0.1, seed=3, duplicates=25)]
+
+
+def _brute_core(G, degree):
+    # Largest k such that the node survives repeatedly removing nodes of degree < k
+    core = dict.fromkeys(G, 0)
+    for k in range(1, max(dict(degree(G)).values(), default=0) + 1):
+        H = G.copy()
+        while True:
+            drop = [v for v, d in degree(H) if d < k]
+            if not drop:
+                break
+            H.remove_nodes_from(drop)
+        for v in H:
+            core[v] = k
+    return core
+
+
+@pytest.mark.parametrize("case", LOOP_FREE)
+def test_total_core_matches_networkx(case):
+    cg, G = make_graph(**case)
+    core = core_numbers(cg, "total")
+    assert np.array_equal(core, as_array(cg, nx.core_number(G)))
+    assert shell_sizes(core).sum() == cg.n_nodes
+
+
+@pytest.mark.parametrize("case", LOOP_FREE)
+@pytest.mark.parametrize("mode", ["in", "out"])
+def test_directed_cores_match_brute_force(case, mode):
+    cg, G = make_graph(**case)
+    degree = (lambda H: H.in_degree()) if mode == "in" else (lambda H: H.out_degree())
+    assert np.array_equal(core_numbers(cg, mode), as_array(cg, _brute_core(G, degree)))
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        core_numbers(make_graph(n=5, p=0.5)[0], "both")
+
+
+def test_rich_club_matches_networkx(graphs):
+    cg, G = graphs
+    U = undirected(G)
+    phi = rich_club(cg)
+    if not U.number_of_edges():
+        return
+    expected = nx.rich_club_coefficient(U, normalized=False)
+    for k, value in expected.items():
+        assert np.isclose(phi[k], value)
+    assert all(np.isnan(phi[k]) for k in range(len(phi)) if k not in expected)
+
+
+def test_rich_club_null_keeps_degree_sequence():
+    cg, _ = make_graph(n=60, p=0.1, seed=13)
+    mean, std = rich_club_null(cg, n_null=4, workers=1)
+    phi = rich_club(cg)
+    # Rewiring keeps every degree, so the curves are defined at the same k
+    assert np.array_equal(np.isnan(mean), np.isnan(phi))
+    assert np.all(std[~np.isnan(std)] >= 0)
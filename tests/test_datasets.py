@@ -0,0 +1,67 @@
+import threading
+
+import numpy as np
+
+from analytics.datasets import DatasetRegistry
+from tests.helpers import make_graph, write_edges
+
+
+def test_load_is_the_mapped_csr_sized_by_its_arrays(tmp_path):
+    cg, _ = make_graph(n=50, p=0.1, seed=10)
+    write_edges(tmp_path / "a.txt", cg)
+    registry = DatasetRegistry(str(tmp_path))
+    loaded = registry.load("a")
+    assert loaded.compact.is_mapped
+    assert np.array_equal(loaded.compact.indices, cg.indices)
+    assert loaded.nbytes == loaded.compact.nbytes
+    assert registry.loaded.nbytes == loaded.compact.nbytes
+
+
+def test_budget_evicts_the_coldest_dataset(tmp_path):
+    for name, seed in (("a", 11), ("b", 12)):
+        write_edges(tmp_path / f"{name}.txt", make_graph(n=50, p=0.1, seed=seed)[0])
+    registry = DatasetRegistry(str(tmp_path), memory_budget=1)
+    registry.load("a")
+    registry.load("b")
+    assert [key for key, _ in registry.loaded.keys()] == ["b"]
+
+
+def test_edited_edge_list_is_reloaded(tmp_path):
+    path = tmp_path / "g.txt"
+    path.write_text("1 2\n2 3\n")
+    registry = DatasetRegistry(str(tmp_path))
+    assert registry.load("g").compact.n_edges == 2
+    with open(path, "a") as f:
+        f.write("3 4\n4 1\n")
+    assert registry.summary("g").edges == 4
+    assert len(registry.loaded) == 0
+    assert registry.load("g").compact.n_edges == 4
+    assert len(registry.loaded) == 1
+
+
+def test_concurrent_artifacts_are_computed_once(tmp_path):
+    write_edges(tmp_path / "a.txt", make_graph(n=20, p=0.1, seed=13)[0])
+    registry = DatasetRegistry(str(tmp_path))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"x": np.arange(1000)}
+
+    threads = [threading.Thread(target=registry.artifact, args=("a", "x", compute)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert np.array_equal(registry.artifact("a", "x", compute)["x"], np.arange(1000))
+    assert not list((tmp_path / ".cache" / "a").glob("*.tmp.npz"))
+
+
+def test_subgraph_matches_networkx(graphs):
+    cg, G = graphs
+    nodes = cg.ids[::2].tolist()
+    sub = cg.subgraph(nodes)
+    assert set(sub.nodes()) == set(nodes)
+    assert set(sub.edges()) == set(G.subgraph(nodes).edges())
+    assert set(cg.to_networkx().edges()) == set(G.edges())
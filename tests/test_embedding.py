@@ -0,0 +1,20 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from analytics.embedding import spectral_embedding
+from tests.helpers import make_graph, undirected
+
+
+@pytest.mark.parametrize("method", ["eigsh", "lobpcg"])
+def test_eigenvalues_match_the_normalized_laplacian(method):
+    cg, G = make_graph(n=80, p=0.08, seed=18, self_loops=3, duplicates=10)
+    U = undirected(G)
+    giant = max(nx.connected_components(U), key=len)
+    L = nx.normalized_laplacian_matrix(U.subgraph(giant)).toarray()
+    expected = np.sort(np.linalg.eigvalsh(L))[1:4]
+    coords, values = spectral_embedding(cg, dim=3, method=method, tol=1e-10)
+    assert np.allclose(values, expected, atol=1e-5)
+    inside = np.isin(cg.ids, list(giant))
+    assert np.isnan(coords[~inside]).all() and np.isfinite(coords[inside]).all()
+    assert np.allclose(np.abs(coords[inside]).max(axis=0), 1.0)
@@ -0,0 +1,77 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from analytics import engine as engine_module
+from analytics.cache import LRUCache
+from analytics.datasets import DatasetRegistry
+from analytics.engine import AnalyticsEngine, get_engine
+from tests.helpers import make_graph, write_edges
+
+
+@pytest.fixture
+def registry(tmp_path):
+    write_edges(tmp_path / "g.txt", make_graph(n=40, p=0.1, seed=21)[0])
+    return DatasetRegistry(str(tmp_path))
+
+
+def test_concurrent_misses_compute_once():
+    cache = LRUCache(maxsize=4)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return len(calls)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == [1] and results == [1] * 8
+
+
+def test_failed_compute_is_retried():
+    cache = LRUCache(maxsize=4)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", fail)
+    assert cache.get_or_compute("k", lambda: 3) == 3
+
+
+def test_memo_is_shared(registry):
+    engine = AnalyticsEngine(registry, "g")
+    assert engine.pagerank() is engine.pagerank()
+    assert engine.centrality()["pagerank"] is engine.pagerank()
+    assert engine.results.hits >= 2
+
+
+def test_artifacts_are_reused_by_a_fresh_engine(registry, monkeypatch):
+    first = AnalyticsEngine(registry, "g").degree_correlations()
+    assert registry.has_artifact("g", "degree-correlations")
+
+    def recompute(graph):
+        raise AssertionError("degree correlations recomputed")
+
+    monkeypatch.setattr(engine_module, "degree_correlations", recompute)
+    again = AnalyticsEngine(registry, "g").degree_correlations()
+    assert np.array_equal(again.r, first.r)
+
+
+def test_get_engine_is_cached_until_the_file_changes(registry, tmp_path):
+    engine = get_engine("g", registry)
+    assert get_engine("g", registry) is engine
+    n_edges = engine.compact.n_edges
+    with open(tmp_path / "g.txt", "a") as f:
+        f.write("1 2\n2 1\n")
+    fresh = get_engine("g", registry)
+    assert fresh is not engine
+    assert fresh.compact.n_edges == engine.compact.n_edges == n_edges + 2
@@ -0,0 +1,66 @@
+import io
+
+import networkx as nx
+import numpy as np
+import pyarrow.parquet as pq
+
+from analytics import export
+from analytics.betweenness import betweenness
+from analytics.clustering import average_clustering, local_clustering, transitivity
+from analytics.components import strong_component_labels, weak_component_labels
+from analytics.engine import get_engine, get_registry
+from tests.helpers import as_array, make_graph, write_edges
+
+
+def _partition(cg, labels):
+    return {frozenset(cg.ids[labels == c].tolist()) for c in np.unique(labels)}
+
+
+def test_exact_betweenness_matches_networkx(graphs):
+    cg, G = graphs
+    expected = as_array(cg, nx.betweenness_centrality(G))
+    assert np.allclose(betweenness(cg, k=cg.n_nodes, workers=1), expected)
+    assert np.allclose(betweenness(cg, k=cg.n_nodes, workers=2), expected)
+
+
+def test_clustering_matches_networkx(graphs):
+    cg, G = graphs
+    assert np.allclose(local_clustering(cg, block_rows=7), as_array(cg, nx.clustering(G)))
+    assert np.isclose(average_clustering(cg), nx.average_clustering(G))
+    assert np.isclose(transitivity(cg, block_rows=7), nx.transitivity(G))
+
+
+def test_components_match_networkx(graphs):
+    cg, G = graphs
+    _, weak = weak_component_labels(cg, block_nnz=5)
+    _, strong = strong_component_labels(cg)
+    assert _partition(cg, weak) == set(map(frozenset, nx.weakly_connected_components(G)))
+    assert _partition(cg, strong) == set(map(frozenset, nx.strongly_connected_components(G)))
+
+
+def test_edge_batches_flag_reciprocated_votes(graphs):
+    cg, G = graphs
+    rows = [row for batch in export.edge_batches(cg, block_nnz=7) for row in zip(*batch.to_pydict().values())]
+    assert {(s, d) for s, d, _ in rows} == set(G.edges())
+    assert all(r == G.has_edge(d, s) for s, d, r in rows)
+
+
+def test_node_table_round_trips_through_parquet(graphs):
+    cg, _ = graphs
+    table = export.node_table(cg, community=np.zeros(cg.n_nodes), betweenness_k=cg.n_nodes, workers=1)
+    back = pq.read_table(io.BytesIO(export.to_bytes(table.to_batches(), table.schema, "parquet")))
+    assert back.num_rows == cg.n_nodes
+    assert back.column("id").to_pylist() == cg.ids.tolist()
+    assert back.column("in_degree").to_pylist() == cg.in_degree.tolist()
+
+
+def test_cli_exports_the_engine_columns(tmp_path):
+    cg, _ = make_graph(n=30, p=0.1, seed=24)
+    write_edges(tmp_path / "g.txt", cg)
+    export.main(["g", str(tmp_path / "out"), "--datasets", str(tmp_path), "--betweenness-samples", "30"])
+    engine = get_engine("g", get_registry(str(tmp_path)))
+    nodes = pq.read_table(tmp_path / "out" / "nodes.parquet")
+    assert np.array_equal(nodes.column("pagerank").to_numpy(), engine.pagerank())
+    assert np.array_equal(nodes.column("betweenness").to_numpy(), engine.betweenness(30))
+    assert np.array_equal(nodes.column("community").to_numpy(), engine.louvain_labels())
+    assert pq.read_table(tmp_path / "out" / "edges.parquet").num_rows == cg.n_edges
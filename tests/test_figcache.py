@@ -0,0 +1,65 @@
+import json
+
+import matplotlib.pyplot as plt
+import plotly.graph_objects as go
+
+from analytics.figcache import FigureCache, figure_key
+
+
+def _draw(calls):
+    def draw():
+        calls.append(1)
+        fig, ax = plt.subplots(figsize=(2, 2))
+        ax.plot([0, 1], [1, 0])
+        return fig
+    return draw
+
+
+def _build(calls):
+    def build():
+        calls.append(1)
+        return go.Figure(go.Bar(x=[1, 2, 3], y=[3, 1, 2]), layout={"title": {"text": "votes"}})
+    return build
+
+
+def test_png_is_rendered_once():
+    cache, calls = FigureCache(), []
+    first = cache.png("degrees", {"bins": 50}, "fp", _draw(calls), dpi=50)
+    again = cache.png("degrees", {"bins": 50}, "fp", _draw(calls), dpi=50)
+    assert first.startswith(b"\x89PNG") and again == first
+    assert calls == [1]
+    assert cache.stats()["hits"] == 1
+
+
+def test_plotly_round_trips_through_json():
+    cache, calls = FigureCache(), []
+    fig = cache.plotly("bars", {}, "fp", _build(calls))
+    again = cache.plotly("bars", {}, "fp", _build(calls))
+    assert calls == [1]
+    assert json.loads(again.to_json()) == json.loads(fig.to_json()) == json.loads(_build([])().to_json())
+    assert list(again.data[0].y) == [3, 1, 2] and again.layout.title.text == "votes"
+
+
+def test_key_changes_with_params_and_fingerprint():
+    key = figure_key("degrees", {"bins": 50, "log": True}, "fp")
+    assert key == figure_key("degrees", {"log": True, "bins": 50}, "fp")
+    assert key != figure_key("degrees", {"bins": 20, "log": True}, "fp")
+    assert key != figure_key("degrees", {"bins": 50, "log": True}, "fp2")
+    assert key != figure_key("heatmap", {"bins": 50, "log": True}, "fp")
+    cache, calls = FigureCache(), []
+    cache.plotly("bars", {}, "fp", _build(calls))
+    cache.plotly("bars", {}, "fp2", _build(calls))
+    cache.plotly("bars", {"n": 1}, "fp2", _build(calls))
+    assert len(calls) == 3
+
+
+def test_entries_are_evicted_at_the_byte_bound():
+    size = len(_build([])().to_json())
+    cache, calls = FigureCache(max_bytes=2 * size), []
+    for fingerprint in ("a", "b", "c"):
+        cache.plotly("bars", {}, fingerprint, _build(calls))
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1 and stats["bytes"] <= 2 * size
+    cache.plotly("bars", {}, "a", _build(calls))   # the coldest entry was dropped
+    cache.plotly("bars", {}, "c", _build(calls))
+    assert len(calls) == 4
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from analytics import graph as graph_module
+from analytics.graph import CompactGraph
+from analytics.ingest import build_csr
+from tests.helpers import make_graph, undirected
+
+
+def _edge_set(cg):
+    src, dst = cg.edges()
+    return set(zip(cg.ids[src].tolist(), cg.ids[dst].tolist()))
+
+
+@pytest.fixture(params=[1 << 24, 5])
+def block_nnz(request, monkeypatch):
+    monkeypatch.setattr(graph_module, "BLOCK_NNZ", request.param)
+    return request.param
+
+
+def test_from_edges_matches_networkx(graphs):
+    cg, G = graphs
+    assert cg.n_nodes == G.number_of_nodes()
+    assert cg.n_edges == G.number_of_edges()
+    assert _edge_set(cg) == set(G.edges())
+    for i in range(cg.n_nodes):
+        assert np.all(np.diff(cg.successors(i)) > 0)
+
+
+def test_degrees_match_networkx(graphs, block_nnz):
+    cg, G = graphs
+    assert cg.out_degree.tolist() == [G.out_degree(v) for v in cg.ids.tolist()]
+    assert cg.in_degree.tolist() == [G.in_degree(v) for v in cg.ids.tolist()]
+
+
+def test_reverse_and_undirected_views(graphs, block_nnz):
+    cg, G = graphs
+    rev = cg.reverse
+    assert _edge_set(rev) == set(G.reverse().edges())
+    und = cg.undirected
+    U = undirected(G)
+    assert _edge_set(und) == {(u, v) for a, b in U.edges() for u, v in ((a, b), (b, a))}
+    for view in (rev, und):
+        for i in range(view.n_nodes):
+            assert np.all(np.diff(view.successors(i)) > 0)
+
+
+def test_reverse_carries_signs(block_nnz):
+    src = np.array([1, 1, 2, 3, 3, 4])
+    dst = np.array([2, 3, 3, 1, 4, 1])
+    signs = np.array([1, -1, 0, 1, -1, -1])
+    cg = CompactGraph.from_edges(src, dst, signs=signs)
+    rev = cg.reverse
+    expected = {(d, s): g for s, d, g in zip(src, dst, signs)}
+    r_src, r_dst = rev.edges()
+    got = {(int(rev.ids[a]), int(rev.ids[b])): int(g) for a, b, g in zip(r_src, r_dst, rev.signs)}
+    assert got == expected
+
+
+def test_has_edges(graphs):
+    cg, G = graphs
+    rng = np.random.default_rng(0)
+    src = rng.integers(0, cg.n_nodes, 200)
+    dst = rng.integers(0, cg.n_nodes, 200)
+    expected = [G.has_edge(int(cg.ids[s]), int(cg.ids[d])) for s, d in zip(src, dst)]
+    assert cg.has_edges(src, dst).tolist() == expected
+
+
+def test_mapped_graph_views_match(tmp_path, block_nnz):
+    cg, _ = make_graph(n=50, p=0.1, seed=8, self_loops=3, duplicates=10)
+    cg.save(tmp_path)
+    mapped = CompactGraph.load(tmp_path)
+    assert mapped.is_mapped
+    for name in ("reverse", "undirected"):
+        a, b = getattr(cg, name), getattr(mapped, name)
+        assert np.array_equal(a.indptr, b.indptr) and np.array_equal(a.indices, b.indices)
+
+
+def test_out_of_core_ingest_matches_in_memory(tmp_path):
+    cg, G = make_graph(n=80, p=0.08, seed=9, self_loops=5, duplicates=40)
+    src, dst = cg.edges()
+    path = tmp_path / "edges.txt"
+    lines = [f"{cg.ids[s]} {cg.ids[d]}" for s, d in zip(src, dst)]
+    path.write_text("# comment\n" + "\n".join(lines + lines[::3]) + "\n")
+    built = build_csr(str(path), str(tmp_path / "csr"), chunk_bytes=64)
+    assert np.array_equal(built.ids, cg.ids)
+    assert np.array_equal(built.indptr, cg.indptr)
+    assert np.array_equal(built.indices, cg.indices)
+    assert not built.is_signed
@@ -0,0 +1,66 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from analytics import report
+from analytics.datasets import DatasetRegistry
+from analytics.engine import AnalyticsEngine
+from analytics.graph import CompactGraph
+from analytics.landmarks import UNREACHABLE, build_oracle, extremal_distances
+from tests.helpers import make_graph, undirected, write_edges
+
+
+def _giant(G):
+    U = undirected(G)
+    return U, U.subgraph(max(nx.connected_components(U), key=len))
+
+
+def test_bounds_contain_the_true_distance(graphs):
+    cg, G = graphs
+    U, _ = _giant(G)
+    oracle = build_oracle(cg, n_landmarks=4, n_sampled=4, workers=1)
+    u, v = np.meshgrid(np.arange(cg.n_nodes), np.arange(cg.n_nodes))
+    lower, upper = oracle.bounds(u.ravel(), v.ravel())
+    lengths = dict(nx.all_pairs_shortest_path_length(U))
+    ids = cg.ids.tolist()
+    exact = np.array([lengths[ids[a]].get(ids[b], np.inf) for a, b in zip(u.ravel(), v.ravel())])
+    assert (lower <= exact).all() and (exact <= upper).all()
+    for a, b in [(0, cg.n_nodes - 1), (1, 2)]:
+        lo, hi, d = oracle.query(cg, a, b, exact=True)
+        assert d == lengths[ids[a]].get(ids[b], np.inf)
+
+
+def test_sampled_rows_are_exact_and_extremes_match(graphs):
+    cg, G = graphs
+    _, giant = _giant(G)
+    oracle = build_oracle(cg, n_landmarks=3, n_sampled=5, workers=1)
+    for landmark, row in zip(oracle.landmarks[oracle.sampled], oracle.dist[oracle.sampled]):
+        lengths = nx.single_source_shortest_path_length(giant, int(cg.ids[landmark]))
+        assert {int(cg.ids[i]): int(d) for i, d in enumerate(row) if d != UNREACHABLE} == lengths
+    diameter, radius, _ = extremal_distances(cg, oracle)
+    assert (diameter, radius) == (nx.diameter(giant), nx.radius(giant))
+
+
+def _path(n):
+    return CompactGraph.from_edges(np.arange(n - 1), np.arange(1, n))
+
+
+def test_long_paths_overflow_the_oracle():
+    with pytest.raises(ValueError):
+        build_oracle(_path(300), workers=1)
+
+
+def test_report_skips_distances_beyond_the_oracle(tmp_path):
+    with open(tmp_path / "chain.txt", "w") as f:
+        f.writelines(f"{i} {i + 1}\n" for i in range(299))
+    engine = AnalyticsEngine(DatasetRegistry(str(tmp_path)), "chain")
+    assert report.jobs(engine, n_null=0)["distances"]() is None
+    assert "Skipped" in report._distances(engine, {})
+
+
+def test_report_distances_of_a_small_graph(tmp_path):
+    cg, G = make_graph(n=60, p=0.05, seed=1)
+    write_edges(tmp_path / "small.txt", cg)
+    engine = AnalyticsEngine(DatasetRegistry(str(tmp_path)), "small")
+    _, giant = _giant(G)
+    assert report.jobs(engine, n_null=0)["distances"]()[:2] == (nx.diameter(giant), nx.radius(giant))
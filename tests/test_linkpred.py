@@ -0,0 +1,52 @@
+import gc
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from analytics import linkpred
+from tests.helpers import make_graph, undirected
+
+NX_SCORES = {
+    "adamic_adar": nx.adamic_adar_index,
+    "resource_allocation": nx.resource_allocation_index,
+    "jaccard": nx.jaccard_coefficient,
+}
+
+
+@pytest.mark.parametrize("method", sorted(linkpred.METHODS.values()))
+def test_pair_scores_match_networkx(graphs, method):
+    cg, G = graphs
+    U = undirected(G)
+    rng = np.random.default_rng(0)
+    src = rng.integers(0, cg.n_nodes, 300)
+    dst = rng.integers(0, cg.n_nodes, 300)
+    keep = src != dst
+    src, dst = src[keep], dst[keep]
+    pairs = list(zip(cg.ids[src].tolist(), cg.ids[dst].tolist()))
+    if method == "common_neighbours":
+        expected = [len(list(nx.common_neighbors(U, u, v))) for u, v in pairs]
+    elif method == "jaccard" and not U.number_of_edges():
+        expected = [0.0] * len(pairs)
+    else:
+        expected = [s for _, _, s in NX_SCORES[method](U, pairs)]
+    assert np.allclose(linkpred.score_pairs(cg, src, dst, method), expected)
+
+
+@pytest.mark.parametrize("direction", ["both", "out"])
+def test_top_k_agrees_with_pair_scores(direction):
+    cg, _ = make_graph(n=60, p=0.08, seed=16, self_loops=4, duplicates=10)
+    cand, scores = linkpred.top_k(cg, k=5, direction=direction, block_cost=50, workers=1)
+    rows = np.repeat(np.arange(cg.n_nodes), 5)[cand.ravel() >= 0]
+    found = cand.ravel()[cand.ravel() >= 0]
+    assert not cg.has_edges(rows, found).any() and not (rows == found).any()
+    again = linkpred.score_pairs(cg, rows, found, "adamic_adar", direction)
+    assert np.allclose(again, scores.ravel()[cand.ravel() >= 0])
+    assert np.all(np.diff(scores, axis=1) <= 0)
+
+
+def test_operand_cache_does_not_keep_graphs_alive():
+    cg, _ = make_graph(n=50, p=0.1, seed=17)
+    linkpred.holdout_benchmark(cg, n_rows=10, workers=1)
+    gc.collect()
+    assert list(linkpred._operand_cache.keys()) == []
@@ -0,0 +1,69 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from analytics.nullmodel import rewire_directed, rewire_undirected
+from analytics.significance import STATISTICS, NullEnsemble, graph_statistics, null_ensemble
+from tests.helpers import make_graph
+
+
+def _simple(cg):
+    src, dst = cg.edges()
+    keep = src != dst
+    return src[keep], dst[keep]
+
+
+def test_directed_rewiring_keeps_degrees_and_stays_simple(graphs):
+    cg, _ = graphs
+    src, dst = _simple(cg)
+    rs, rd = rewire_directed(src, dst, cg.n_nodes, swaps_per_edge=5, seed=1)
+    assert np.array_equal(np.bincount(rs, minlength=cg.n_nodes), np.bincount(src, minlength=cg.n_nodes))
+    assert np.array_equal(np.bincount(rd, minlength=cg.n_nodes), np.bincount(dst, minlength=cg.n_nodes))
+    assert not (rs == rd).any()
+    assert len(set(zip(rs.tolist(), rd.tolist()))) == len(rs)
+    if len(src) > 10:
+        assert set(zip(rs.tolist(), rd.tolist())) != set(zip(src.tolist(), dst.tolist()))
+
+
+def test_undirected_rewiring_keeps_degrees_and_stays_simple(graphs):
+    cg, _ = graphs
+    src, dst = _simple(cg.undirected)
+    u, v = src[src < dst], dst[src < dst]
+    ru, rv = rewire_undirected(u, v, cg.n_nodes, swaps_per_edge=5, seed=2)
+    degree = np.bincount(np.concatenate([u, v]), minlength=cg.n_nodes)
+    assert np.array_equal(np.bincount(np.concatenate([ru, rv]), minlength=cg.n_nodes), degree)
+    assert (ru < rv).all()
+    assert len(set(zip(ru.tolist(), rv.tolist()))) == len(ru)
+
+
+def test_statistics_match_networkx(graphs):
+    cg, G = graphs
+    observed = graph_statistics(cg)
+    if not cg.n_edges:
+        assert observed[:3].tolist() == [0.0, 0.0, 0.0]
+        return
+    assert observed[0] == pytest.approx(nx.overall_reciprocity(G))
+    assert observed[1] == pytest.approx(nx.transitivity(G))
+    expected = nx.degree_assortativity_coefficient(G, x="out", y="in")
+    assert observed[2] == pytest.approx(expected if np.isfinite(expected) else 0.0, abs=1e-9)
+    assert -0.5 <= observed[3] <= 1.0
+
+
+def test_ensemble_is_reproducible_across_workers():
+    cg, _ = make_graph(n=50, p=0.08, seed=4)
+    serial = null_ensemble(cg, n_null=4, workers=1)
+    pooled = null_ensemble(cg, n_null=4, workers=2)
+    assert serial.samples.shape == (4, len(STATISTICS))
+    assert np.allclose(serial.samples, pooled.samples)
+    assert np.allclose(serial.observed, graph_statistics(cg))
+    assert ((serial.p_value >= 1 / 5) & (serial.p_value <= 1)).all()
+
+
+def test_z_scores_and_p_values():
+    ensemble = NullEnsemble(observed=np.array([3.0, 1.0]), samples=np.array([[0.0, 1.0], [2.0, 1.0]]),
+                            swaps_per_edge=10)
+    assert ensemble.z[0] == pytest.approx(2 / np.sqrt(2))
+    assert np.isnan(ensemble.z[1])
+    assert ensemble.p_value.tolist() == [1 / 3, 1.0]
+    again = NullEnsemble.from_arrays(ensemble.to_arrays())
+    assert again.swaps_per_edge == 10 and np.array_equal(again.samples, ensemble.samples)
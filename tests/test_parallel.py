@@ -0,0 +1,103 @@
+import gc
+import os
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from analytics import parallel, shm
+from analytics.graph import CompactGraph
+from tests.helpers import make_graph
+
+
+def _signed_graph(seed=40):
+    cg, _ = make_graph(n=60, p=0.1, seed=seed)
+    src, dst = cg.edges()
+    signs = np.random.default_rng(seed).choice([-1, 0, 1], size=len(src))
+    return CompactGraph.from_edges(cg.ids[src], cg.ids[dst], ids=cg.ids, signs=signs)
+
+
+def _arrays(graph, chunk):
+    und = graph.undirected
+    return [(graph.indptr.copy(), graph.indices.copy(), graph.signs.copy(), und.indices.copy(), int(c))
+            for c in chunk]
+
+
+def _fail(graph, chunk):
+    raise RuntimeError(f"chunk {chunk.tolist()}")
+
+
+def _crash_once(graph, chunk, marker):
+    # The first task to run kills its worker; the retried call finds the marker
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return chunk.tolist()
+
+
+def _crash(graph, chunk):
+    os._exit(1)
+
+
+def _segments(graph):
+    handle = shm.share(graph)
+    return [spec.name for spec in handle.arrays.values() if spec.kind == "shm"]
+
+
+def _exists(name):
+    try:
+        shared_memory.SharedMemory(name=name).close()
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def test_workers_see_the_same_arrays():
+    graph = _signed_graph()
+    graph.undirected  # built views are shared too
+    results = parallel.map_chunks(_arrays, graph, parallel.split(np.arange(4), 4), workers=2)
+    for (indptr, indices, signs, und_indices, _), in results:
+        assert np.array_equal(indptr, graph.indptr)
+        assert np.array_equal(indices, graph.indices)
+        assert np.array_equal(signs, graph.signs)
+        assert np.array_equal(und_indices, graph.undirected.indices)
+
+
+def test_one_worker_runs_in_process():
+    graph = _signed_graph()
+    assert parallel.map_chunks(_arrays, graph, parallel.split(np.arange(4), 2), workers=1)[1][0][4] == 2
+    assert id(graph) not in shm._owned
+
+
+def test_segments_are_unlinked_with_the_graph():
+    graph = _signed_graph(41)
+    parallel.map_chunks(_arrays, graph, parallel.split(np.arange(4), 4), workers=2)
+    names = _segments(graph)
+    assert names and all(_exists(name) for name in names)
+    del graph
+    gc.collect()
+    assert not any(_exists(name) for name in names)
+
+
+def test_segments_are_unlinked_after_a_worker_exception():
+    graph = _signed_graph(42)
+    with pytest.raises(RuntimeError, match="chunk"):
+        parallel.map_chunks(_fail, graph, parallel.split(np.arange(4), 4), workers=2)
+    names = _segments(graph)
+    shm.release(graph)
+    assert names and not any(_exists(name) for name in names)
+    # The pool survives an exception raised by a task
+    assert parallel.map_chunks(_arrays, graph, parallel.split(np.arange(2), 2), workers=2)
+
+
+def test_a_crashed_worker_is_retried_in_a_fresh_pool(tmp_path):
+    graph = _signed_graph(43)
+    chunks = parallel.split(np.arange(4), 4)
+    marker = str(tmp_path / "crashed")
+    assert parallel.map_chunks(_crash_once, graph, chunks, workers=2, marker=marker) == [[0], [1], [2], [3]]
+    assert os.path.exists(marker)
+    with pytest.raises(BrokenProcessPool):
+        parallel.map_chunks(_crash, graph, chunks, workers=2)
+    # The next call gets a working pool again
+    assert parallel.map_chunks(_crash_once, graph, chunks, workers=2, marker=marker) == [[0], [1], [2], [3]]
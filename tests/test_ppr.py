@@ -0,0 +1,57 @@
+import networkx as nx
+import numpy as np
+
+from analytics.cache import LRUCache
+from analytics.ppr import PPRService, forward_push, monte_carlo, ppr_top_k
+from tests.helpers import as_array, make_graph
+
+
+def _exact(cg, G, seed):
+    node = int(cg.ids[seed])
+    return as_array(cg, nx.pagerank(G, alpha=0.85, personalization={node: 1.0}, tol=1e-12, max_iter=1000))
+
+
+def test_forward_push_is_a_lower_bound_within_the_residual(graphs):
+    cg, G = graphs
+    seed = int(np.argmax(cg.out_degree))
+    estimate, residual = forward_push(cg, seed, epsilon=1e-8)
+    exact = _exact(cg, G, seed)
+    assert np.all(estimate <= exact + 1e-9)
+    assert np.abs(exact - estimate).sum() <= residual.sum() + 1e-9
+    assert np.allclose(estimate, exact, atol=1e-5)
+
+
+def test_monte_carlo_matches_networkx(graphs):
+    cg, G = graphs
+    seed = int(np.argmax(cg.out_degree))
+    estimate = monte_carlo(cg, seed, epsilon=1e-4, rng=0)
+    assert np.isclose(estimate.sum(), 1.0)
+    assert np.abs(estimate - _exact(cg, G, seed)).sum() < 0.05
+
+
+def test_monte_carlo_without_edges_is_the_seed():
+    cg, _ = make_graph(n=5, p=0.0)
+    estimate = monte_carlo(cg, 3, epsilon=1e-2, rng=0)
+    assert estimate.tolist() == [0.0, 0.0, 0.0, 1.0, 0.0]
+
+
+def test_top_k_excludes_the_seed_and_is_sorted():
+    cg, G = make_graph(n=60, p=0.05, seed=1)
+    seed = int(np.argmax(cg.out_degree))
+    nodes, scores = ppr_top_k(cg, seed, k=5, epsilon=1e-8)
+    assert seed not in nodes
+    assert np.all(np.diff(scores) <= 0)
+    exact = _exact(cg, G, seed)
+    exact[seed] = 0.0
+    assert np.allclose(scores, np.sort(exact)[::-1][:5], atol=1e-5)
+
+
+def test_service_cache_keys_on_the_dataset_fingerprint():
+    cache = LRUCache(maxsize=8)
+    a, _ = make_graph(n=30, p=0.2, seed=4)
+    b, _ = make_graph(n=30, p=0.2, seed=5)
+    node = int(a.ids[0])
+    first = PPRService(a, cache, fingerprint="a").query(node, k=5)
+    second = PPRService(b, cache, fingerprint="b").query(node, k=5)
+    assert len(cache) == 2
+    assert not (np.array_equal(first[0], second[0]) and np.allclose(first[1], second[1]))
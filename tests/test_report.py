@@ -0,0 +1,29 @@
+from analytics import report
+from analytics.datasets import DatasetRegistry
+from analytics.engine import AnalyticsEngine
+from tests.helpers import make_graph, write_edges
+
+
+def test_cli_renders_every_section(tmp_path, capsys):
+    write_edges(tmp_path / "edges.txt", make_graph(n=50, p=0.08, seed=22)[0])
+    out = tmp_path / "report.html"
+    report.main([str(tmp_path / "edges.txt"), str(out), "--datasets", str(tmp_path / "registry"),
+                 "--null", "2", "--workers", "2"])
+    page = out.read_text(encoding="utf-8")
+    for title, section in report.SECTIONS:
+        if section is not report._balance:
+            assert f"<h2>{title}</h2>" in page
+    assert "Structural Balance" not in page
+    assert "<svg" in page and "<script" not in page
+    assert "report written to" in capsys.readouterr().out
+
+
+def test_warm_fills_the_engine_memo(tmp_path):
+    write_edges(tmp_path / "g.txt", make_graph(n=40, p=0.1, seed=23)[0])
+    engine = AnalyticsEngine(DatasetRegistry(str(tmp_path)), "g")
+    work = report.jobs(engine, n_null=0)
+    timings = report.warm(engine, work, workers=4)
+    assert set(timings) == set(work)
+    misses = engine.results.misses
+    report.render(engine, n_null=0)
+    assert engine.results.misses == misses
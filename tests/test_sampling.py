@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from analytics.sampling import SAMPLERS, degree_strata, stratified
+from tests.helpers import make_graph
+
+SIZES = (1, 10, 1000)
+
+
+@pytest.mark.parametrize("sampler", list(SAMPLERS.values()), ids=list(SAMPLERS))
+@pytest.mark.parametrize("size", SIZES)
+def test_samples_are_distinct_valid_nodes(graphs, sampler, size):
+    cg, _ = graphs
+    nodes = sampler(cg, size, seed=3)
+    assert len(nodes) == min(size, cg.n_nodes)
+    assert len(np.unique(nodes)) == len(nodes)
+    assert ((nodes >= 0) & (nodes < cg.n_nodes)).all()
+    assert np.array_equal(nodes, np.sort(nodes))
+
+
+@pytest.mark.parametrize("sampler", list(SAMPLERS.values()), ids=list(SAMPLERS))
+def test_samples_are_deterministic_per_seed(sampler):
+    cg, _ = make_graph(n=200, p=0.02, seed=30)
+    assert np.array_equal(sampler(cg, 40, seed=5), sampler(cg, 40, seed=5))
+    assert any(not np.array_equal(sampler(cg, 40, seed=5), sampler(cg, 40, seed=s)) for s in range(6, 10))
+
+
+@pytest.mark.parametrize("size", (20, 60, 150))
+def test_stratified_is_proportional_with_every_stratum(size):
+    cg, _ = make_graph(n=300, p=0.02, seed=31, self_loops=5)
+    strata = degree_strata(cg)
+    labels, counts = np.unique(strata, return_counts=True)
+    assert size >= len(labels)
+    nodes = stratified(cg, size, seed=1)
+    taken = np.array([(strata[nodes] == label).sum() for label in labels])
+    assert (taken >= 1).all()
+    assert np.abs(taken - counts * size / cg.n_nodes).max() <= 2
+
+
+def test_stratified_by_labels():
+    cg, _ = make_graph(n=100, p=0.05, seed=32)
+    labels = np.arange(cg.n_nodes) % 4
+    nodes = stratified(cg, 20, seed=2, strata=labels)
+    assert np.bincount(labels[nodes]).tolist() == [5, 5, 5, 5]
@@ -0,0 +1,68 @@
+import json
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from analytics.datasets import DatasetRegistry
+from analytics.graph import CompactGraph
+from analytics.ingest import build_csr
+from analytics.signed import approval, balance_census
+from tests.helpers import make_graph
+
+
+def _signed_graph(seed=23):
+    cg, G = make_graph(n=50, p=0.12, seed=seed)
+    src, dst = cg.edges()
+    signs = np.random.default_rng(seed).choice([-1, 0, 1], size=len(src), p=[0.3, 0.1, 0.6])
+    return cg.ids[src], cg.ids[dst], signs
+
+
+def test_third_column_is_ignored_unless_signed(tmp_path):
+    path = tmp_path / "weighted.txt"
+    path.write_text("1 2 7\n2 3 15\n3 1 1\n")
+    assert not build_csr(str(path), str(tmp_path / "plain")).is_signed
+    with pytest.raises(ValueError, match="-1, 0 or 1"):
+        build_csr(str(path), str(tmp_path / "signed"), signed=True)
+    with pytest.raises(ValueError):
+        CompactGraph.from_edges([1, 2], [2, 3], signs=[7, 15])
+
+
+def test_registry_reads_signs_only_when_flagged(tmp_path):
+    src, dst, signs = _signed_graph()
+    (tmp_path / "votes.txt").write_text("".join(f"{s} {d} {g}\n" for s, d, g in zip(src, dst, signs)))
+    (tmp_path / "signed.json").write_text(json.dumps({"path": "votes.txt", "signed": True}))
+    registry = DatasetRegistry(str(tmp_path))
+    # The JSON-described list is signed; the same file dropped in as *.txt is not described twice
+    assert registry.keys() == ["signed"]
+    signed = registry.load("signed").compact
+    assert signed.is_signed
+    expected = CompactGraph.from_edges(src, dst, signs=signs)
+    assert np.array_equal(np.asarray(signed.signs), expected.signs)
+    key = registry.register(str(tmp_path / "votes.txt"), key="plain")
+    assert not registry.load(key).compact.is_signed
+    assert registry["plain"].fingerprint != registry["signed"].fingerprint
+
+
+def test_approval_and_balance_match_brute_force():
+    src, dst, signs = _signed_graph()
+    cg = CompactGraph.from_edges(src, dst, signs=signs)
+    votes = approval(cg)
+    received = {v: [g for s, d, g in zip(src, dst, signs) if d == v] for v in cg.ids.tolist()}
+    assert votes.received_support.tolist() == [r.count(1) for r in received.values()]
+    assert votes.received_oppose.tolist() == [r.count(-1) for r in received.values()]
+
+    # Pair sign = sign of the summed votes in both directions; zero pairs are left out
+    pair = {}
+    for s, d, g in zip(src.tolist(), dst.tolist(), signs.tolist()):
+        if s != d:
+            key = (min(s, d), max(s, d))
+            pair[key] = pair.get(key, 0) + g
+    S = nx.Graph()
+    S.add_edges_from((u, v, {"sign": np.sign(w)}) for (u, v), w in pair.items() if w)
+    counts = dict.fromkeys(("+++", "++-", "+--", "---"), 0)
+    for tri in (c for c in nx.enumerate_all_cliques(S) if len(c) == 3):
+        negative = sum(S.edges[a, b]["sign"] < 0 for a, b in ((tri[0], tri[1]), (tri[0], tri[2]), (tri[1], tri[2])))
+        counts[("+++", "++-", "+--", "---")[negative]] += 1
+    census = balance_census(cg)
+    assert dict(zip(("+++", "++-", "+--", "---"), census.counts.tolist())) == counts
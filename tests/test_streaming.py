@@ -0,0 +1,89 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from analytics.streaming import CountMin, HyperLogLog, stream_statistics
+from tests.helpers import make_graph, undirected, write_edges
+
+
+def test_hyperloglog_is_within_its_error():
+    for seed in range(3):
+        hll = HyperLogLog(b=12, seed=seed)
+        keys = np.random.default_rng(seed).integers(0, 1 << 40, 50_000)
+        hll.add(keys)
+        hll.add(keys[:1000])  # repeats do not count
+        assert abs(hll.count() - len(np.unique(keys))) <= 3 * hll.rse * len(keys)
+    small = HyperLogLog(b=12)
+    small.add(np.arange(100))
+    assert abs(small.count() - 100) <= 5  # linear counting
+
+
+def test_count_min_never_underestimates():
+    keys = np.random.default_rng(0).zipf(1.5, 20_000) % 5000
+    cm = CountMin(width=256, seed=1)
+    cm.add(keys)
+    uniq, counts = np.unique(keys, return_counts=True)
+    est = cm.query(uniq)
+    assert np.all(est >= counts)
+    assert np.mean(est - counts <= cm.epsilon * cm.total) >= 1 - cm.delta
+
+
+@pytest.mark.parametrize("case", [dict(n=60, p=0.05, seed=1), dict(n=30, p=0.3, seed=2),
+                                  dict(n=40, p=0.1, seed=3, self_loops=6)])
+def test_within_budget_everything_but_distances_is_exact(tmp_path, case):
+    cg, G = make_graph(**case)
+    G.remove_nodes_from([v for v in list(G) if G.degree(v) == 0])  # not in the edge list
+    stats = stream_statistics(write_edges(tmp_path / "e.txt", cg, header="# src dst\n"), chunk_bytes=64, distances=False)
+    U = undirected(G)
+    assert stats.edges == G.number_of_edges()
+    assert stats.self_loops == nx.number_of_selfloops(G)
+    assert stats.nodes.exact and stats.nodes.value == G.number_of_nodes()
+    assert stats.zero_in_degree.value == sum(d == 0 for _, d in G.in_degree())
+    assert stats.max_in_degree.value == max(d for _, d in G.in_degree())
+    assert sorted(stats.degree_sample) == sorted(d for _, d in G.degree())
+    assert stats.sample_fraction == 1.0
+    mutual = sum(1 for u, v in G.edges() if u != v and G.has_edge(v, u))
+    assert stats.reciprocity.exact and np.isclose(stats.reciprocity.value, mutual / G.number_of_edges())
+    assert stats.triangles.value == sum(nx.triangles(U).values()) / 3
+    assert np.isclose(stats.transitivity.value, nx.transitivity(U))
+
+
+def test_sketches_take_over_beyond_the_budget(tmp_path):
+    cg, G = make_graph(n=3000, p=0.002, seed=20)
+    G.remove_nodes_from([v for v in list(G) if G.degree(v) == 0])
+    stats = stream_statistics(write_edges(tmp_path / "e.txt", cg, header="# src dst\n"), budget=64 << 10, chunk_bytes=4096,
+                              distances=False)
+    assert not stats.nodes.exact
+    assert abs(stats.nodes.value - G.number_of_nodes()) <= stats.nodes.error
+    true_in = sum(d == 0 for _, d in G.in_degree())
+    assert abs(stats.zero_in_degree.value - true_in) <= stats.zero_in_degree.error
+    assert stats.max_in_degree.value >= max(d for _, d in G.in_degree())
+    assert stats.max_in_degree.value <= max(d for _, d in G.in_degree()) + stats.max_in_degree.error
+
+
+def test_pair_sampling_is_unbiased(tmp_path):
+    cg, G = make_graph(n=120, p=0.08, seed=22)
+    path = write_edges(tmp_path / "e.txt", cg, header="# src dst\n")
+    U = undirected(G)
+    true = sum(nx.triangles(U).values()) / 3
+    mutual = sum(1 for u, v in G.edges() if G.has_edge(v, u)) / G.number_of_edges()
+    budget = 64 * G.number_of_edges() // 2
+    runs = [stream_statistics(path, budget=budget, seed=s, distances=False) for s in range(30)]
+    assert all(0.4 < r.sample_fraction < 0.6 for r in runs)
+    for name, value in (("triangles", true), ("reciprocity", mutual)):
+        est = np.array([getattr(r, name).value for r in runs])
+        assert abs(est.mean() - value) <= 4 * est.std() / np.sqrt(len(runs))
+        covered = np.mean([abs(getattr(r, name).value - value) <= getattr(r, name).error for r in runs])
+        assert covered >= 0.8
+
+
+def test_hyper_anf_distances(tmp_path):
+    cg, G = make_graph(n=300, p=0.02, seed=21)
+    G.remove_nodes_from([v for v in list(G) if G.degree(v) == 0])
+    stats = stream_statistics(write_edges(tmp_path / "e.txt", cg, header="# src dst\n"))
+    U = undirected(G)
+    lengths = [d for _, row in nx.all_pairs_shortest_path_length(U) for d in row.values() if d]
+    assert stats.neighbourhood[0] == pytest.approx(U.number_of_nodes(), rel=0.1)
+    assert stats.neighbourhood[-1] == pytest.approx(U.number_of_nodes() + len(lengths), rel=0.1)
+    assert stats.avg_distance.value == pytest.approx(np.mean(lengths), rel=0.1)
+    assert stats.effective_diameter.value == pytest.approx(np.quantile(lengths, 0.9), abs=1.0)
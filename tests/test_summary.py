@@ -0,0 +1,45 @@
+import networkx as nx
+import numpy as np
+
+from analytics.graph import CompactGraph
+from analytics.summary import GraphSummary, summarize
+from tests.helpers import make_graph
+
+
+def _assert_same(a, b):
+    assert np.array_equal(a.ids, b.ids)
+    assert np.array_equal(a.in_degree, b.in_degree)
+    assert np.array_equal(a.out_degree, b.out_degree)
+    assert (a.self_loops, a.mutual_edges, a.weak_components) == (b.self_loops, b.mutual_edges, b.weak_components)
+
+
+def test_summary_matches_networkx(graphs):
+    cg, G = graphs
+    s = summarize(cg, block_nnz=7)
+    assert (s.nodes, s.edges) == (G.number_of_nodes(), G.number_of_edges())
+    assert s.self_loops == nx.number_of_selfloops(G)
+    assert s.weak_components == nx.number_weakly_connected_components(G)
+    assert s.strong_components == nx.number_strongly_connected_components(G)
+    assert s.largest_weak_component == max(map(len, nx.weakly_connected_components(G)))
+    mutual = sum(1 for u, v in G.edges() if u != v and G.has_edge(v, u))
+    assert s.mutual_edges == mutual
+    assert np.isclose(s.density, nx.density(G))
+
+
+def test_chained_appends_count_each_edge_once(tmp_path):
+    cg, _ = make_graph(n=40, p=0.1, seed=19)
+    src, dst = cg.edges()
+    old_src, old_dst = cg.ids[src], cg.ids[dst]
+    first_src, first_dst = np.array([500, 10, 13]), np.array([501, 500, 10])
+    # Overlaps the first batch (500 -> 501), reverses it (501 -> 500) and repeats an old edge
+    second_src = np.array([500, 501, old_src[0], 502])
+    second_dst = np.array([501, 500, old_dst[0], 502])
+
+    s = summarize(cg).append(cg, first_src, first_dst)
+    s.save(tmp_path)
+    for summary in (s, GraphSummary.load(tmp_path)):
+        chained = summary.append(cg, second_src, second_dst)
+        merged = CompactGraph.from_edges(np.concatenate([old_src, first_src, second_src]),
+                                         np.concatenate([old_dst, first_dst, second_dst]))
+        _assert_same(chained, summarize(merged))
+        assert chained.strong_components is None
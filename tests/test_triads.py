@@ -0,0 +1,48 @@
+from itertools import permutations
+
+import networkx as nx
+import numpy as np
+
+from analytics.triads import motif_counts, triad_census
+from tests.helpers import make_graph
+
+
+def _simple(G):
+    H = G.copy()
+    H.remove_edges_from(list(nx.selfloop_edges(H)))
+    return H
+
+
+def test_exact_census_matches_networkx(graphs):
+    cg, G = graphs
+    census = triad_census(cg, workers=1)
+    assert census.as_dict() == {k: float(v) for k, v in nx.triadic_census(_simple(G)).items()}
+    assert not census.ci.any()
+
+
+def test_pooled_census_matches_in_process():
+    cg, _ = make_graph(n=60, p=0.1, seed=14)
+    assert np.array_equal(triad_census(cg, workers=2).counts, triad_census(cg, workers=1).counts)
+
+
+def test_motifs_match_brute_force(graphs):
+    cg, G = graphs
+    H = _simple(G)
+    motifs = motif_counts(triad_census(cg, workers=1))
+    triples = [t for t in permutations(H, 3)]
+    transitive = sum(H.has_edge(i, j) and H.has_edge(j, k) and H.has_edge(i, k) for i, j, k in triples)
+    cyclic = sum(H.has_edge(i, j) and H.has_edge(j, k) and H.has_edge(k, i) for i, j, k in triples) / 3
+    assert motifs["Transitive triples"] == transitive
+    assert motifs["Cyclic triads"] == cyclic
+
+
+def test_sampled_census_is_unbiased():
+    cg, G = make_graph(n=50, p=0.15, seed=15)
+    exact = triad_census(cg, workers=1).counts
+    runs = [triad_census(cg, fraction=0.5, seed=s, workers=1) for s in range(40)]
+    mean = np.mean([r.counts for r in runs], axis=0)
+    spread = np.std([r.counts for r in runs], axis=0) / np.sqrt(len(runs))
+    assert np.all(np.abs(mean - exact) <= 4 * spread + 1e-9)
+    covered = np.mean([np.abs(r.counts - exact) <= r.ci + 1e-9 for r in runs])
+    assert covered > 0.8
+    assert np.isclose(sum(runs[0].counts), 50 * 49 * 48 / 6)